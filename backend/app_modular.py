@@ -3,6 +3,8 @@ Main Flask Application - Modular Structure
 AI-Powered HR Management System
 """
 import os
+from pathlib import Path
+from dotenv import load_dotenv
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
@@ -10,6 +12,9 @@ from flask_restful import Api
 from models import db
 from datetime import timedelta
 
+# Settings may live in backend/.env (DATABASE_URL, GEMINI_API_KEY, ...); real environment variables win
+load_dotenv(Path(__file__).parent / ".env")
+
 # Import auth routes
 from routes.auth_routes import LoginResource, RegisterResource, CurrentUserResource
 
@@ -22,7 +27,7 @@ from routes.analytics_routes import (
 
 # Import recruitment routes
 from routes.recruitment_routes import (
-    ResumeUpload, ResumeParseAdvanced, CandidateJobMatcher,
+    ResumeUpload, ResumeIngestionStatus, ResumeParseAdvanced, CandidateJobMatcher,
     InterviewQuestionGenerator, GenerateJobPosting,
     GeneratePolicyDocument, PolicyLocations, WritingTones,
     JobListResource, PostJob, FinalizeJob, UpdateJobStatus,
@@ -32,7 +37,7 @@ from routes.recruitment_routes import (
 
 # Import remaining routes from additional_routes
 from routes.additional_routes import (
-    AskHRChat, EmployeeDashboardSummary,
+    AskHRChat, AskHRChatStream, EmployeeDashboardSummary,
     EmpWellnessResources, EmpWellnessEvents, EmpWellnessRegister,
     HRWellnessResources, HRAbsenceAlerts, HRMilestones, HRAwards, HRBirthdays, HRSurveys,
     LearningPathGenerator, LearningProgress, ModuleCompletion, LearningRolesAndGoals,
@@ -49,6 +54,11 @@ from routes.additional_routes import (
 # Import employee routes
 from routes.employee_routes import EmployeeListResource, PendingEmployeesResource, ApproveEmployeeResource, UpdatePersonalDetailsResource
 
+# Import metrics routes
+from routes.metrics_routes import SqlMetricsResource, LlmMetricsResource
+from utils.llm_telemetry import LLM_TELEMETRY_ENABLED
+from utils.sql_profiler import init_sql_profiler
+
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
@@ -77,11 +87,11 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)  # 7 days expiration
 app.config['UPLOAD_FOLDER'] = 'uploads'
 
 # Initialize extensions
-try:
-    with app.app_context():
-        db.create_all()
-except Exception as e:
-    print("Database initialization failed:", e)
+db.init_app(app)
+jwt = JWTManager(app)
+# Opt-in per-request query counts and slow-query log (SQL_PROFILER_ENABLED=true)
+sql_profiler_enabled = init_sql_profiler(app, db)
+# Tables, indexes and analytics rollups are created by init_db.py, not on import
 
 
 
@@ -126,6 +136,7 @@ api.add_resource(TrainingAnalytics, '/api/analytics/training')
 
 # Recruitment routes
 api.add_resource(ResumeUpload, '/api/recruitment/upload')
+api.add_resource(ResumeIngestionStatus, '/api/recruitment/upload/<string:ingestion_id>')
 api.add_resource(ResumeParseAdvanced, '/api/recruitment/parse')
 api.add_resource(CandidateJobMatcher, '/api/recruitment/match')
 api.add_resource(InterviewQuestionGenerator, '/api/recruitment/questions')
@@ -145,6 +156,7 @@ api.add_resource(HireRejectApplicantResource, '/api/applicants/<int:applicant_id
 
 # HR Chatbot
 api.add_resource(AskHRChat, '/api/askhr/chat')
+api.add_resource(AskHRChatStream, '/api/askhr/chat/stream')
 api.add_resource(ChatHistoryResource, '/api/chat/history')
 api.add_resource(LogChatResource, '/api/chat/log')
 
@@ -212,6 +224,12 @@ api.add_resource(HRLeaveRequestsResource, '/api/hr/leave/requests')
 api.add_resource(LeaveRequestActionResource, '/api/hr/leave/action')
 api.add_resource(EmployeeLeaveStatusResource, '/api/employee/leave/status')
 
+# Metrics routes
+if sql_profiler_enabled:
+    api.add_resource(SqlMetricsResource, '/api/metrics/sql')
+if LLM_TELEMETRY_ENABLED:
+    api.add_resource(LlmMetricsResource, '/api/metrics/llm')
+
 # Serve uploaded files
 from flask import send_from_directory
 
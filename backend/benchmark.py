@@ -0,0 +1,409 @@
+"""
+End-to-end performance benchmark.
+
+Seeds a synthetic SQLite database, swaps Gemini for the deterministic fake backend
+(utils/llm_backends.py) and drives the hot endpoints through Flask's test client:
+ResumeUpload (plus background ingestion), CandidateJobMatcher, JobApplicants,
+AskHRChat (blocking and streamed) and the analytics dashboard. Reports p50/p95 latency, throughput,
+SQL queries (and repeated statement shapes) per request, LLM calls per
+scenario and per-call-site LLM telemetry. Needs no network access.
+
+Usage:
+    python benchmark.py --preset medium --requests 50 --llm-latency-ms 300
+    python benchmark.py --scenarios chat,analytics --concurrency 4 --json results.json
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from generate_dataset import (
+    CHAT_QUESTIONS, ROLES, SKILLS, DatasetGenerator, add_scale_arguments, scale_from_args
+)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SCENARIOS = ["upload", "match", "applicants", "chat", "chat_stream", "chat_history", "analytics"]
+
+ANALYTICS_ENDPOINTS = [
+    "/api/analytics/summary",
+    "/api/analytics/absenteeism-trends",
+    "/api/analytics/retention-risk",
+    "/api/analytics/training-completion",
+    "/api/analytics/departments",
+    "/api/analytics/overview",
+    "/api/analytics/recruitment",
+    "/api/analytics/training",
+]
+
+# ==================== SYNTHETIC DATA ====================
+
+def resume_text(rng, name, department):
+    skills = rng.sample(SKILLS[department], min(5, len(SKILLS[department])))
+    role = rng.choice(ROLES[department])
+    years = rng.randint(1, 12)
+    lines = [
+        name,
+        f"{role} | {name.lower().replace(' ', '.')}@example.com",
+        "",
+        "SUMMARY",
+        f"{role} with {years} years of experience delivering {skills[0]} and {skills[1]} projects.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+    ]
+    for i in range(rng.randint(2, 4)):
+        lines.append(f"{role} at Company {rng.randint(1, 99)} ({2024 - years + i} - {2025 - years + i})")
+        lines.append(f"Built {rng.choice(skills)} services and improved delivery with {rng.choice(skills)}.")
+    lines += ["", "EDUCATION", f"B.Sc. in Computer Science, State University, {2020 - years}"]
+    return "\n".join(lines)
+
+
+def seed_database(db, models, sizes, uploaders=0, seed=42):
+    """Fill an empty database with generate_dataset; returns the ids the scenarios need"""
+    db.create_all()
+    generator = DatasetGenerator(db, models, seed=seed, log=lambda line: None)
+    generator.generate(**sizes)
+
+    # Accounts with no application yet, so every upload is accepted
+    first_id = generator._next_id(models.User)
+    generator._insert(models.User, [{
+        "user_id": first_id + i, "name": f"Uploader {i}", "email": f"uploader{first_id + i}@example.com",
+        "password_hash": "x", "role": "applicant", "is_active": True
+    } for i in range(uploaders)])
+
+    # Scenarios cycle through the open jobs with the most applicants
+    applicant_count = db.func.count(models.Applicant.applicant_id)
+    busiest_jobs = db.session.query(models.Job.job_id)\
+        .join(models.Applicant, models.Applicant.job_id == models.Job.job_id)\
+        .filter(models.Job.status == "Open")\
+        .group_by(models.Job.job_id).order_by(applicant_count.desc()).limit(50).all()
+    return {
+        "hr_user_id": generator.hr_user_ids[0],
+        "employee_user_ids": generator.employee_user_ids,
+        "job_ids": [job_id for job_id, in busiest_jobs] or generator.job_ids,
+        "uploader_user_ids": list(range(first_id, first_id + uploaders)),
+    }
+
+
+def resume_pdf(text):
+    """A minimal single-page PDF with the given text, readable by PyPDF2/pdfplumber"""
+    def escape(line):
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    lines = text.splitlines()[:45]
+    stream = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream",
+    ]
+    out, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out.encode("latin-1")))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out.encode("latin-1"))
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+
+# ==================== MEASUREMENT ====================
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_scenario(name, make_request, count, concurrency, llm):
+    """Issue `count` requests (make_request(i) -> response) and summarize them"""
+    latencies, queries, duplicates, errors = [], [], [], []
+    lock = threading.Lock()
+    calls_before = llm.calls
+
+    def one(i):
+        started = time.perf_counter()
+        response = make_request(i)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        with lock:
+            latencies.append(elapsed)
+            # Set by utils/sql_profiler.py for the request's own statements
+            queries.append(int(response.headers.get("X-DB-Query-Count", 0)))
+            duplicates.append(int(response.headers.get("X-DB-Duplicate-Queries", 0)))
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+    wall_start = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(count):
+            one(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one, range(count)))
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "scenario": name,
+        "requests": count,
+        "errors": len(errors),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "max_ms": round(max(latencies), 2) if latencies else 0.0,
+        "throughput_rps": round(count / wall, 2) if wall else 0.0,
+        "queries_per_request": round(sum(queries) / len(queries), 1) if queries else 0.0,
+        "duplicate_queries": round(sum(duplicates) / len(duplicates), 1) if duplicates else 0.0,
+        "llm_calls": llm.calls - calls_before,
+    }
+
+
+def wait_for_ingestions(app, db, models, ingestion_ids, timeout):
+    """Block until every upload finished its background stages; returns seconds waited"""
+    started = time.perf_counter()
+    pending = set(ingestion_ids)
+    while pending and time.perf_counter() - started < timeout:
+        with app.app_context():
+            for ingestion_id in list(pending):
+                ingestion = db.session.get(models.ResumeIngestion, ingestion_id)
+                if ingestion and ingestion.status in ("completed", "failed", "partial"):
+                    pending.discard(ingestion_id)
+            db.session.remove()
+        if pending:
+            time.sleep(0.05)
+    return time.perf_counter() - started, len(pending)
+
+
+# ==================== MAIN ====================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark hot endpoints against synthetic data and a fake LLM")
+    add_scale_arguments(parser)
+    parser.add_argument("--requests", type=int, default=30, help="requests per scenario (per endpoint for analytics)")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma separated: {','.join(SCENARIOS)}")
+    parser.add_argument("--llm-latency-ms", type=float, default=float(os.getenv("FAKE_LLM_LATENCY_MS", "200")))
+    parser.add_argument("--llm-jitter-ms", type=float, default=float(os.getenv("FAKE_LLM_JITTER_MS", "50")))
+    parser.add_argument("--llm-ms-per-1k-chars", type=float, default=float(os.getenv("FAKE_LLM_MS_PER_1K_CHARS", "5")))
+    parser.add_argument("--llm-error-rate", type=float, default=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")))
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0")))
+    parser.add_argument("--llm-cache", action="store_true", help="keep the in-memory LLM response cache on")
+    parser.add_argument("--cold-response-cache", action="store_true",
+                        help="clear the analytics response cache before every request")
+    parser.add_argument("--ingestion-timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", help="directory for the SQLite file and uploads (default: a temp dir)")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="talentgenie-bench-"))
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "benchmark.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    # Must be set before the app (and the LLM client) is imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["SQL_PROFILER_ENABLED"] = "true"
+    os.environ["LLM_CACHE_PATH"] = ""
+    if not args.llm_cache:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+
+    # Uploads are written relative to the working directory
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(workdir)
+
+    from flask_jwt_extended import create_access_token
+
+    import models
+    from app_modular import app, db
+    from utils import llm_telemetry, response_cache
+    from utils.llm_backends import FakeLLMBackend, set_backend
+
+    llm = FakeLLMBackend(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms,
+                         ms_per_1k_chars=args.llm_ms_per_1k_chars, error_rate=args.llm_error_rate,
+                         rate_limit_rate=args.llm_rate_limit_rate, seed=args.seed)
+    set_backend(llm)
+
+    print(f"Seeding {db_path} ...")
+    seed_started = time.perf_counter()
+    with app.app_context():
+        ids = seed_database(db, models, scale_from_args(args),
+                            uploaders=args.requests if "upload" in scenarios else 0, seed=args.seed)
+        tokens = {
+            user_id: create_access_token(identity=str(user_id), additional_claims={"role": role})
+            for user_id, role in ([(ids["hr_user_id"], "hr")] + [(u, "applicant") for u in ids["uploader_user_ids"]]
+                                  + [(u, "employee") for u in ids["employee_user_ids"]])
+        }
+        job_descriptions = {job.job_id: (job.title, job.jd_text) for job in models.Job.query.all()}
+        # The heaviest assistant user, whose chat pane is the largest
+        chat_user_id = (db.session.query(models.ChatMessage.user_id)
+                        .group_by(models.ChatMessage.user_id)
+                        .order_by(db.func.count(models.ChatMessage.id).desc())
+                        .limit(1).scalar()) or ids["employee_user_ids"][0]
+    print(f"Seeded in {time.perf_counter() - seed_started:.1f}s")
+
+    client = app.test_client()
+    rng = random.Random(args.seed)
+    hr_headers = {"Authorization": f"Bearer {tokens[ids['hr_user_id']]}"}
+    results = []
+
+    if "upload" in scenarios:
+        count = len(ids["uploader_user_ids"])
+        ingestion_ids = []
+
+        def upload(i):
+            user_id = ids["uploader_user_ids"][i]
+            job_id = ids["job_ids"][i % len(ids["job_ids"])]
+            pdf = resume_pdf(resume_text(random.Random(f"{args.seed}:{i}"), f"Uploader {i}", rng.choice(list(ROLES))))
+            response = client.post("/api/recruitment/upload",
+                                   headers={"Authorization": f"Bearer {tokens[user_id]}"},
+                                   data={"job_id": str(job_id), "files[]": (io.BytesIO(pdf), f"resume_{i}.pdf")},
+                                   content_type="multipart/form-data")
+            if response.status_code == 202:
+                ingestion_ids.append(response.get_json()["ingestion_id"])
+            return response
+
+        calls_before = llm.calls
+        result = run_scenario("upload", upload, count, args.concurrency, llm)
+        waited, unfinished = wait_for_ingestions(app, db, models, ingestion_ids, args.ingestion_timeout)
+        result["ingestion_drain_s"] = round(waited, 2)
+        result["ingestion_unfinished"] = unfinished
+        # Parsing and scoring happen in the background stages
+        result["llm_calls"] = llm.calls - calls_before
+        results.append(result)
+
+    if "match" in scenarios:
+        def match(i):
+            job_id = ids["job_ids"][i % len(ids["job_ids"])]
+            title, jd = job_descriptions[job_id]
+            return client.post("/api/recruitment/match", headers=hr_headers,
+                               json={"job_title": title, "job_description": jd, "top_k": 20})
+
+        results.append(run_scenario("match", match, args.requests, args.concurrency, llm))
+
+    if "applicants" in scenarios:
+        def applicants(i):
+            return client.get(f"/api/jobs/{ids['job_ids'][i % len(ids['job_ids'])]}/applicants", headers=hr_headers)
+
+        results.append(run_scenario("applicants", applicants, args.requests, args.concurrency, llm))
+
+    if "chat" in scenarios:
+        def chat(i):
+            # The chatbot answers as the token's user
+            user_id = ids["employee_user_ids"][i % len(ids["employee_user_ids"])]
+            return client.post("/api/askhr/chat", headers={"Authorization": f"Bearer {tokens[user_id]}"},
+                               json={"message": CHAT_QUESTIONS[i % len(CHAT_QUESTIONS)]})
+
+        results.append(run_scenario("chat", chat, args.requests, args.concurrency, llm))
+
+    if "chat_stream" in scenarios:
+        first_chunks = []
+
+        def chat_stream(i):
+            started = time.perf_counter()
+            user_id = ids["employee_user_ids"][i % len(ids["employee_user_ids"])]
+            response = client.post("/api/askhr/chat/stream", headers={"Authorization": f"Bearer {tokens[user_id]}"},
+                                   buffered=False, json={"message": CHAT_QUESTIONS[i % len(CHAT_QUESTIONS)]})
+            for index, _ in enumerate(response.response):
+                if index == 0:
+                    first_chunks.append((time.perf_counter() - started) * 1000.0)
+            response.close()
+            return response
+
+        result = run_scenario("chat_stream", chat_stream, args.requests, args.concurrency, llm)
+        result["first_chunk_p50_ms"] = round(percentile(first_chunks, 50), 2)
+        result["first_chunk_p95_ms"] = round(percentile(first_chunks, 95), 2)
+        results.append(result)
+
+    if "chat_history" in scenarios:
+        def chat_history(i):
+            # Newest page, or the next-older page of the previous request
+            params = {"user_id": chat_user_id, "limit": 50}
+            if i % 2 and cursors:
+                params["cursor"] = cursors[-1]
+            response = client.get("/api/chat/history", headers=hr_headers, query_string=params)
+            cursor = (response.get_json() or {}).get("next_cursor")
+            if cursor:
+                cursors.append(cursor)
+            return response
+
+        cursors = []
+        results.append(run_scenario("chat_history", chat_history, args.requests, args.concurrency, llm))
+
+    if "analytics" in scenarios:
+        for endpoint in ANALYTICS_ENDPOINTS:
+            def analytics(i, endpoint=endpoint):
+                if args.cold_response_cache:
+                    response_cache.clear()
+                return client.get(endpoint, headers=hr_headers)
+
+            results.append(run_scenario(endpoint.rsplit("/", 1)[1], analytics, args.requests,
+                                        args.concurrency, llm))
+
+    llm_sites = llm_telemetry.call_site_stats()
+    print_report(results, args)
+    print_llm_report(llm_sites)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results, "llm_call_sites": llm_sites}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+def print_report(results, args):
+    columns = ["scenario", "requests", "errors", "p50_ms", "p95_ms", "mean_ms", "max_ms",
+               "throughput_rps", "queries_per_request", "duplicate_queries", "llm_calls"]
+    print()
+    print(f"LLM latency {args.llm_latency_ms:.0f}ms (+{args.llm_jitter_ms:.0f}ms jitter), "
+          f"concurrency {args.concurrency}, '{args.preset}' dataset")
+    print("  ".join(f"{c:>20}" if i == 0 else f"{c:>10}" for i, c in enumerate(columns)))
+    for row in results:
+        print("  ".join(f"{str(row[c]):>20}" if i == 0 else f"{str(row[c]):>10}" for i, c in enumerate(columns)))
+        if "ingestion_drain_s" in row:
+            print(f"{'':>20}  background ingestion drained in {row['ingestion_drain_s']}s"
+                  f" ({row['ingestion_unfinished']} unfinished)")
+        if "first_chunk_p50_ms" in row:
+            print(f"{'':>20}  first chunk after p50 {row['first_chunk_p50_ms']} ms, p95 {row['first_chunk_p95_ms']} ms")
+
+
+def print_llm_report(call_sites):
+    if not call_sites:
+        return
+    columns = ["call_site", "calls", "hit_rate", "p50_ms", "p95_ms", "errors", "parse_fail",
+               "retries", "prompt_tok", "resp_tok", "cost_usd"]
+    print()
+    print("  ".join(f"{c:>20}" if i == 0 else f"{c:>10}" for i, c in enumerate(columns)))
+    for site in call_sites:
+        errors = sum(n for outcome, n in site["outcomes"].items() if outcome not in ("ok", "empty"))
+        row = [site["call_site"], site["calls"], site["cache_hit_rate"], site["latency_ms"]["p50"],
+               site["latency_ms"]["p95"], errors, sum(site["parse_failures"].values()), site["retries"],
+               site["prompt_tokens"], site["response_tokens"], f"{site['cost_usd']:.4f}"]
+        print("  ".join(f"{str(v):>20}" if i == 0 else f"{str(v):>10}" for i, v in enumerate(row)))
+
+
+if __name__ == "__main__":
+    main()
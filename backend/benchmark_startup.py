@@ -0,0 +1,110 @@
+"""
+Startup-time benchmark.
+
+Imports app_modular in fresh Python processes (as a worker boot or test
+collection does) and reports the import time and whole-process time, min and
+median over the runs. It also lists which heavy optional libraries were loaded
+by the import; the Gemini SDK, the PDF libraries and pydantic should only load
+on the code paths that use them.
+
+Usage:
+    python benchmark_startup.py --runs 10
+    python benchmark_startup.py --runs 5 --slowest 15 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded lazily by the code paths that need them
+HEAVY_MODULES = ["google.generativeai", "PyPDF2", "pdfplumber", "pydantic", "yaml"]
+
+_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app_modular
+elapsed = time.perf_counter() - started
+print(json.dumps({{"import_seconds": elapsed,
+                  "heavy_loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def run_once(env):
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", _PROBE], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app_modular failed:\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = wall
+    return result
+
+
+def slowest_imports(env, count):
+    """(cumulative microseconds, module) of the slowest imports, from python -X importtime"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app_modular"],
+                          cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure app import (worker boot) time")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--slowest", type=int, default=0, help="also list the N slowest imports")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="talentgenie-startup-") as workdir:
+        env = dict(os.environ)
+        # Importing the app must not need the real database or network
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+        env.setdefault("LLM_BACKEND", "fake")
+        env["LLM_CACHE_PATH"] = ""
+
+        run_once(env)  # warm the filesystem and bytecode caches
+        runs = [run_once(env) for _ in range(args.runs)]
+        slowest = slowest_imports(env, args.slowest) if args.slowest else []
+
+    imports = [r["import_seconds"] for r in runs]
+    processes = [r["process_seconds"] for r in runs]
+    heavy = sorted({m for r in runs for m in r["heavy_loaded"]})
+
+    print(f"import app_modular over {len(runs)} runs")
+    print(f"  import time   min {min(imports) * 1000:8.1f} ms   median {statistics.median(imports) * 1000:8.1f} ms")
+    print(f"  process time  min {min(processes) * 1000:8.1f} ms   median {statistics.median(processes) * 1000:8.1f} ms")
+    print(f"  heavy modules loaded at import: {', '.join(heavy) if heavy else 'none'}")
+    if slowest:
+        print("Slowest imports (cumulative):")
+        for micros, module in slowest:
+            print(f"  {micros / 1000:8.1f} ms  {module}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "runs": runs,
+                "import_ms": {"min": min(imports) * 1000, "median": statistics.median(imports) * 1000},
+                "process_ms": {"min": min(processes) * 1000, "median": statistics.median(processes) * 1000},
+                "heavy_loaded": heavy,
+                "slowest": [{"module": m, "cumulative_ms": us / 1000} for us, m in slowest],
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Bring an existing database's indexes in line with models.py: create the declared
+indexes it is missing and drop the ones listed in RETIRED_INDEXES (renamed or
+removed indexes would otherwise stay behind and slow every write).
+db.create_all() only adds indexes together with new tables, so databases created
+before an index was declared need this once. Safe to re-run.
+
+--drop-stale also drops every other undeclared non-unique ix_* index on the model
+tables, including hand-added ones; review the "Dropping" lines before using it.
+
+Usage:
+    python create_indexes.py [--database-url URL] [--drop-stale]
+"""
+import argparse
+import os
+
+# Indexes models.py used to declare, by table; add an entry when renaming or removing one
+RETIRED_INDEXES = {
+    "chat_messages": ("ix_chat_messages_user_timestamp",),
+    "applicants": ("ix_applicants_job_score", "ix_applicants_user_job"),
+}
+
+
+def _existing_indexes(db, inspector, table_name: str) -> dict:
+    """{index name: unique} for a table; on SQLite read from the pragma, since reflection skips expression indexes"""
+    if db.engine.dialect.name == "sqlite":
+        with db.engine.connect() as conn:
+            rows = conn.exec_driver_sql(f'PRAGMA index_list("{table_name}")').all()
+        return {row[1]: bool(row[2]) for row in rows if not row[1].startswith("sqlite_autoindex")}
+    return {index["name"]: bool(index.get("unique")) for index in inspector.get_indexes(table_name)}
+
+
+def create_missing_indexes(db) -> int:
+    """Create every model index the database lacks (tables must exist); returns how many were created"""
+    from sqlalchemy import inspect
+    from sqlalchemy.exc import IntegrityError
+
+    inspector = inspect(db.engine)
+    created = 0
+    for table in db.metadata.sorted_tables:
+        existing = _existing_indexes(db, inspector, table.name)
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name in existing:
+                continue
+            print(f"Creating {index.name} on {table.name}({', '.join(str(e) for e in index.expressions)})")
+            try:
+                index.create(bind=db.engine)
+            except IntegrityError as e:
+                # A unique index over rows that already repeat; remove the duplicates and re-run
+                print(f"⚠️ Could not create {index.name}: existing rows are not unique ({e.orig})")
+                continue
+            created += 1
+    return created
+
+
+def _drop_index(db, table_name: str, name: str, reason: str):
+    from sqlalchemy.schema import DDL
+
+    print(f"Dropping {name} on {table_name} ({reason})")
+    with db.engine.begin() as conn:
+        conn.execute(DDL(f"DROP INDEX {db.engine.dialect.identifier_preparer.quote(name)}"))
+
+
+def drop_retired_indexes(db) -> int:
+    """Drop the RETIRED_INDEXES the database still has; returns how many were dropped"""
+    from sqlalchemy import inspect
+
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    dropped = 0
+    for table_name, names in RETIRED_INDEXES.items():
+        if table_name not in existing_tables:
+            continue
+        existing = _existing_indexes(db, inspector, table_name)
+        for name in names:
+            if name in existing:
+                _drop_index(db, table_name, name, "retired")
+                dropped += 1
+    return dropped
+
+
+def drop_stale_indexes(db) -> int:
+    """Drop non-unique ix_* indexes on model tables that models.py no longer declares; returns how many were dropped"""
+    from sqlalchemy import inspect
+
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    dropped = 0
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        declared = {index.name for index in table.indexes}
+        for name, unique in _existing_indexes(db, inspector, table.name).items():
+            if not name or not name.startswith("ix_") or unique or name in declared:
+                continue
+            _drop_index(db, table.name, name, "not declared")
+            dropped += 1
+    return dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create missing model indexes and drop retired ones")
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL)")
+    parser.add_argument("--drop-stale", action="store_true",
+                        help="also drop every undeclared non-unique ix_* index on the model tables")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from app_modular import app, db
+
+    with app.app_context():
+        db.create_all()
+        created = create_missing_indexes(db)
+        dropped = drop_retired_indexes(db)
+        if args.drop_stale:
+            dropped += drop_stale_indexes(db)
+        print(f"Index migration complete: {created} created, {dropped} dropped.")
+
+if __name__ == "__main__":
+    main()
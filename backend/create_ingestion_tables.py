@@ -0,0 +1,6 @@
+from app_modular import app, db
+from models import ResumeIngestion, ResumeIngestionFile
+
+with app.app_context():
+    db.create_all()
+    print("Database tables created (including ResumeIngestion and ResumeIngestionFile if missing).")
@@ -0,0 +1,16 @@
+from app_modular import app, db
+from models import ResumeDocument
+from sqlalchemy import text
+
+with app.app_context():
+    db.create_all()
+    print("Database tables created (including ResumeDocument if missing).")
+
+    for column in ("content_hash VARCHAR(64)", "reused BOOLEAN DEFAULT 0"):
+        try:
+            with db.engine.connect() as conn:
+                conn.execute(text(f"ALTER TABLE resume_ingestion_files ADD COLUMN {column}"))
+                conn.commit()
+            print(f"Added '{column.split()[0]}' column to 'resume_ingestion_files' table.")
+        except Exception as e:
+            print(f"Skipping '{column.split()[0]}': {e}")
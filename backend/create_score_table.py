@@ -0,0 +1,6 @@
+from app_modular import app, db
+from models import ResumeJobScore
+
+with app.app_context():
+    db.create_all()
+    print("Database tables created (including ResumeJobScore if missing).")
@@ -0,0 +1,526 @@
+"""
+Synthetic HR dataset generator for scale testing.
+
+Fills the models.py schema at a chosen scale with plausible distributions: skewed
+department sizes, manager hierarchies, a long tail of absence-prone employees, popular
+trainings and jobs, multi-turn chat sessions. Rows are written with batched Core
+INSERTs (executemany) and explicit primary keys, so even the large preset finishes
+in minutes. Data is appended after the current maximum ids of each table.
+
+Usage:
+    python generate_dataset.py --preset small
+    python generate_dataset.py --preset large --database-url sqlite:////tmp/talentgenie_large.db
+    python generate_dataset.py --preset medium --leave-requests 500000 --seed 7
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+
+PRESETS = {
+    "small": dict(employees=500, applicant_users=800, hr_users=5, trainings=40, enrollments=2500,
+                  leave_requests=5000, jobs=200, applicants=2000, policies=40, chat_messages=5000,
+                  performance_logs=1500),
+    "medium": dict(employees=5000, applicant_users=7500, hr_users=20, trainings=150, enrollments=25000,
+                   leave_requests=50000, jobs=2500, applicants=25000, policies=80, chat_messages=50000,
+                   performance_logs=15000),
+    "large": dict(employees=20000, applicant_users=29950, hr_users=50, trainings=300, enrollments=100000,
+                  leave_requests=200000, jobs=10000, applicants=100000, policies=150, chat_messages=200000,
+                  performance_logs=60000),
+}
+
+BATCH_SIZE = 5000
+
+# (name, relative headcount)
+DEPARTMENTS = [
+    ("Engineering", 30), ("Sales", 16), ("Operations", 12), ("Support", 11), ("Marketing", 8),
+    ("Finance", 6), ("Human Resources", 5), ("Design", 5), ("Legal", 3), ("Data Science", 4),
+]
+ROLES = {
+    "Engineering": ["Software Engineer", "Senior Software Engineer", "DevOps Engineer", "QA Engineer"],
+    "Sales": ["Account Executive", "Sales Development Rep", "Sales Manager"],
+    "Operations": ["Operations Analyst", "Logistics Coordinator", "Operations Manager"],
+    "Support": ["Support Engineer", "Customer Success Manager"],
+    "Marketing": ["Marketing Manager", "Content Strategist", "SEO Specialist"],
+    "Finance": ["Financial Analyst", "Accountant", "Payroll Specialist"],
+    "Human Resources": ["HR Specialist", "Recruiter", "HR Business Partner"],
+    "Design": ["Product Designer", "UX Researcher"],
+    "Legal": ["Legal Counsel", "Compliance Officer"],
+    "Data Science": ["Data Scientist", "Data Analyst", "ML Engineer"],
+}
+SKILLS = {
+    "Engineering": ["Python", "Java", "JavaScript", "React", "SQL", "AWS", "Docker", "Kubernetes", "Git", "Linux"],
+    "Sales": ["Negotiation", "CRM", "Salesforce", "Communication", "Prospecting"],
+    "Operations": ["Excel", "Supply Chain", "Process Improvement", "SQL", "Project Management"],
+    "Support": ["Customer Service", "Zendesk", "Troubleshooting", "Communication", "SQL"],
+    "Marketing": ["SEO", "Content Writing", "Google Analytics", "Social Media", "Copywriting"],
+    "Finance": ["Excel", "Financial Modeling", "Accounting", "Payroll", "SAP"],
+    "Human Resources": ["Recruitment", "Onboarding", "Payroll", "Employee Relations", "Communication"],
+    "Design": ["Figma", "User Research", "Prototyping", "Design Systems", "Accessibility"],
+    "Legal": ["Contract Law", "Compliance", "GDPR", "Negotiation", "Risk Assessment"],
+    "Data Science": ["Python", "Machine Learning", "SQL", "Statistics", "Tableau", "Spark"],
+}
+LEAVE_TYPES = [("Vacation", 45), ("Sick", 30), ("Personal", 15), ("Parental", 3), ("Bereavement", 2), ("Unpaid", 5)]
+LEAVE_REASONS = {
+    "Vacation": ["Family vacation", "Holiday trip", "Wedding abroad", "Long weekend"],
+    "Sick": ["Sick with flu", "Medical appointment", "Sick - migraine", "Burnout recovery"],
+    "Personal": ["Personal errand", "Moving house", "Family matter", "Burnout - need rest"],
+    "Parental": ["Parental leave"],
+    "Bereavement": ["Family bereavement"],
+    "Unpaid": ["Extended travel", "Personal project"],
+}
+APPLICANT_STATUSES = [("Applied", 50), ("Screening", 20), ("Interview", 12), ("Rejected", 13), ("Offered", 3), ("Hired", 2)]
+TRAINING_CATEGORIES = ["Technical", "Soft Skills", "Leadership", "Compliance", "Wellness"]
+POLICY_TOPICS = ["Leave", "Remote Work", "Expenses", "Code of Conduct", "Benefits", "Performance",
+                 "Resignation", "Wellness", "Travel", "Security", "Parental Leave", "Overtime"]
+CHAT_QUESTIONS = [
+    "How many vacation days do I have left?", "What is the sick leave policy?",
+    "Can I work remotely on Fridays?", "How do I claim travel expenses?",
+    "What is the notice period for resignation?", "Leave request status",
+    "Are there any wellness programs?", "How does the performance review work?",
+    "Who is my manager?", "When is the next payroll date?",
+]
+FIRST_NAMES = ["Asha", "Ben", "Chen", "Divya", "Elena", "Farid", "Grace", "Hiro", "Isha", "Jonas", "Kemi",
+               "Liam", "Maya", "Nikhil", "Olga", "Pablo", "Qi", "Rosa", "Sam", "Tara", "Umar", "Vera", "Wei", "Yara"]
+LAST_NAMES = ["Kumar", "Lopez", "Mensah", "Novak", "Okafor", "Patel", "Quinn", "Rossi", "Sato", "Tan", "Ueda",
+              "Varga", "Wong", "Xu", "Yilmaz", "Zhou", "Smith", "Garcia", "Muller", "Silva"]
+
+# Shared hash for every generated account; hashing 50k passwords would dominate the run
+DEFAULT_PASSWORD = "password123"
+
+
+def _weighted(rng, pairs):
+    return rng.choices([p[0] for p in pairs], weights=[p[1] for p in pairs])[0]
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _stream(rng, population, weights=None, block=4096):
+    """Endless weighted draws; cumulative weights are built once instead of per draw"""
+    cum_weights = list(itertools.accumulate(weights)) if weights is not None else None
+    while True:
+        if cum_weights is None:
+            yield from (rng.choice(population) for _ in range(block))
+        else:
+            yield from rng.choices(population, cum_weights=cum_weights, k=block)
+
+
+def _leave_days(start, end):
+    # Same rule LeaveRequestResource uses for new requests
+    return 0.5 if start == end else float((end - start).days + 1)
+
+
+class DatasetGenerator:
+    """Builds rows as dicts and writes them with batched executemany INSERTs"""
+
+    def __init__(self, db, models, seed=42, batch_size=BATCH_SIZE, log=print):
+        self.db = db
+        self.m = models
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.today = self.now.date()
+        self.counts = {}
+        self.dept_ids = {}
+        self.employees = []  # (emp_id, user_id, dept_name, manager_id)
+        self.employee_user_ids, self.applicant_user_ids, self.hr_user_ids = [], [], []
+        self.leaves_by_emp = {}
+        self.job_ids = []
+
+    # ---------- plumbing ----------
+
+    def _next_id(self, model):
+        pk = model.__table__.primary_key.columns.values()[0]
+        return (self.db.session.query(self.db.func.max(pk)).scalar() or 0) + 1
+
+    def _insert(self, model, rows):
+        table = model.__table__
+        for start in range(0, len(rows), self.batch_size):
+            self.db.session.execute(table.insert(), rows[start:start + self.batch_size])
+        self.db.session.commit()
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def _reset_sequences(self):
+        """Explicit ids leave Postgres sequences behind; move them past the new rows"""
+        if self.db.engine.dialect.name != "postgresql":
+            return
+        for table_name in self.counts:
+            table = self.db.metadata.tables[table_name]
+            pk = table.primary_key.columns.values()[0]
+            if not isinstance(pk.type, self.db.Integer):
+                continue
+            self.db.session.execute(self.db.text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', '{pk.name}'), "
+                f"(SELECT COALESCE(MAX({pk.name}), 1) FROM {table_name}))"
+            ))
+        self.db.session.commit()
+
+    def _timed(self, label, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        self.log(f"  {label:<22} {time.perf_counter() - started:6.2f}s")
+        return result
+
+    # ---------- tables ----------
+
+    def departments(self):
+        existing = {d.name: d.dept_id for d in self.m.Department.query.all()}
+        next_id = self._next_id(self.m.Department)
+        rows = []
+        for name, _ in DEPARTMENTS:
+            if name not in existing:
+                existing[name] = next_id
+                rows.append({"dept_id": next_id, "name": name, "description": f"{name} Department",
+                             "created_at": self.now})
+                next_id += 1
+        self._insert(self.m.Department, rows)
+        self.dept_ids = existing
+
+    def users_and_employees(self, employees, applicant_users, hr_users):
+        from werkzeug.security import generate_password_hash
+
+        rng = self.rng
+        password_hash = generate_password_hash(DEFAULT_PASSWORD)
+        next_user = self._next_id(self.m.User)
+        next_emp = self._next_id(self.m.Employee)
+
+        users, employee_rows = [], []
+
+        def add_user(role, is_active=True):
+            nonlocal next_user
+            user_id = next_user
+            next_user += 1
+            users.append({"user_id": user_id, "name": _name(rng), "email": f"user{user_id}@example.com",
+                          "password_hash": password_hash, "role": role, "is_active": is_active,
+                          "created_at": self.now, "updated_at": self.now})
+            return user_id
+
+        self.hr_user_ids = [add_user("hr") for _ in range(hr_users)]
+        self.applicant_user_ids = [add_user("applicant") for _ in range(applicant_users)]
+
+        departments = [name for name, _ in DEPARTMENTS]
+        draw_department = _stream(rng, departments, [w for _, w in DEPARTMENTS])
+        managers = {name: [] for name in departments}
+        for _ in range(employees):
+            dept = next(draw_department)
+            emp_id = next_emp
+            next_emp += 1
+            # Roughly one manager per 12 employees, managers report to nobody
+            is_manager = not managers[dept] or rng.random() < 1 / 12
+            manager_id = None if is_manager else rng.choice(managers[dept])
+            if is_manager:
+                managers[dept].append(emp_id)
+            # Hire dates skew recent: most of the workforce joined in the last few years
+            hire_date = self.today - timedelta(days=int(rng.triangular(30, 3650, 200)))
+            role = rng.choice(ROLES[dept])
+            base = 120000 if is_manager else 65000
+            user_id = add_user("employee", is_active=rng.random() > 0.02)
+            employee_rows.append({
+                "emp_id": emp_id, "user_id": user_id, "dept_id": self.dept_ids[dept],
+                "job_title": f"{role} Manager" if is_manager and "Manager" not in role else role,
+                "salary": round(rng.lognormvariate(math.log(base), 0.25), -2),
+                "skills": json.dumps(rng.sample(SKILLS[dept], min(4, len(SKILLS[dept])))),
+                "hire_date": hire_date, "manager_id": manager_id,
+                "created_at": self.now, "updated_at": self.now,
+            })
+            self.employees.append((emp_id, user_id, dept, manager_id))
+
+        self._insert(self.m.User, users)
+        self._insert(self.m.Employee, employee_rows)
+        self.employee_user_ids = [e[1] for e in self.employees]
+
+        birthdays = [{"id": None, "emp_id": emp_id, "created_at": self.now,
+                      "birth_date": date(rng.randint(1965, 2003), rng.randint(1, 12), rng.randint(1, 28))}
+                     for emp_id, _, _, _ in self.employees]
+        next_id = self._next_id(self.m.EmployeeBirthday)
+        for offset, row in enumerate(birthdays):
+            row["id"] = next_id + offset
+        self._insert(self.m.EmployeeBirthday, birthdays)
+
+    def trainings_and_enrollments(self, trainings, enrollments):
+        rng = self.rng
+        next_training = self._next_id(self.m.Training)
+        training_rows = []
+        for i in range(trainings):
+            category = rng.choice(TRAINING_CATEGORIES)
+            dept = rng.choice(list(SKILLS))
+            training_rows.append({
+                "training_id": next_training + i, "title": f"{category} Track {i + 1}", "category": category,
+                "description": f"{category} training for {dept} teams.", "duration_hours": rng.choice([2, 4, 8, 16, 24, 40]),
+                "instructor": _name(rng), "max_participants": rng.choice([20, 50, 100, 500]),
+                "skills_covered": json.dumps(rng.sample(SKILLS[dept], 3)), "created_at": self.now,
+            })
+        self._insert(self.m.Training, training_rows)
+        training_ids = [t["training_id"] for t in training_rows]
+
+        if not training_ids or not self.employees:
+            return
+        # Popularity follows a Zipf-like curve: a few mandatory courses, a long tail
+        draw_training = _stream(rng, training_ids, [1 / (rank + 1) for rank in range(len(training_ids))])
+        draw_employee = _stream(rng, [e[0] for e in self.employees])
+        enrollments = min(enrollments, len(self.employees) * len(training_ids) // 2)
+        pairs = set()
+        next_id = self._next_id(self.m.EmployeeTraining)
+        rows = []
+        while len(rows) < enrollments:
+            emp_id = next(draw_employee)
+            training_id = next(draw_training)
+            if (emp_id, training_id) in pairs:
+                continue
+            pairs.add((emp_id, training_id))
+            enrolled = self.now - timedelta(days=rng.randint(0, 720))
+            status = _weighted(rng, [("Completed", 55), ("In Progress", 20), ("Enrolled", 20), ("Dropped", 5)])
+            completed = status == "Completed"
+            rows.append({
+                "id": next_id + len(rows), "emp_id": emp_id, "training_id": training_id, "status": status,
+                "enrollment_date": enrolled,
+                "completion_date": enrolled + timedelta(days=rng.randint(1, 60)) if completed else None,
+                "score": round(rng.uniform(55, 100), 1) if completed else None, "certificate_url": None,
+            })
+        self._insert(self.m.EmployeeTraining, rows)
+
+    def leave_requests(self, count):
+        rng = self.rng
+        if not self.employees:
+            return
+        # Absence propensity is long-tailed: most people take a few leaves, some take many
+        draw_employee = _stream(rng, self.employees, [rng.lognormvariate(0, 0.8) for _ in self.employees])
+        next_id = self._next_id(self.m.LeaveRequest)
+        rows = []
+        for i in range(count):
+            emp_id, _, _, manager_id = next(draw_employee)
+            leave_type = _weighted(rng, LEAVE_TYPES)
+            start = self.today - timedelta(days=rng.randint(-30, 730))
+            length = 0 if rng.random() < 0.35 else int(rng.expovariate(1 / 3))
+            if leave_type == "Parental":
+                length = rng.randint(30, 90)
+            end = start + timedelta(days=min(length, 120))
+            age = (self.today - start).days
+            if age < 0:
+                status = _weighted(rng, [("Pending", 60), ("Approved", 35), ("Rejected", 5)])
+            else:
+                status = _weighted(rng, [("Approved", 80), ("Rejected", 14), ("Pending", 6)])
+            created = datetime.combine(start, datetime.min.time()) - timedelta(days=rng.randint(1, 30))
+            row = {
+                "leave_id": next_id + i, "emp_id": emp_id, "leave_type": leave_type,
+                "start_date": start, "end_date": end, "reason": rng.choice(LEAVE_REASONS[leave_type]),
+                "status": status, "number_of_days": _leave_days(start, end),
+                "approved_by": manager_id if status != "Pending" else None,
+                "comments": None, "created_at": created, "updated_at": created,
+            }
+            rows.append(row)
+            self.leaves_by_emp.setdefault(emp_id, []).append(row)
+        self._insert(self.m.LeaveRequest, rows)
+
+    def jobs_and_applicants(self, jobs, applicants):
+        rng = self.rng
+        draw_department = _stream(rng, [name for name, _ in DEPARTMENTS], [w for _, w in DEPARTMENTS])
+        next_job = self._next_id(self.m.Job)
+        job_rows = []
+        for i in range(jobs):
+            dept = next(draw_department)
+            title = rng.choice(ROLES[dept])
+            skills = rng.sample(SKILLS[dept], min(5, len(SKILLS[dept])))
+            posted = self.now - timedelta(days=rng.randint(0, 730))
+            status = _weighted(rng, [("Open", 30), ("Closed", 60), ("On Hold", 10)])
+            jd = (f"We are hiring a {title} to join our {dept} team. You will own {skills[0]} and "
+                  f"{skills[1]} work end to end and partner with stakeholders across the company.\n"
+                  f"Requirements: {', '.join(skills)}. {rng.randint(1, 8)}+ years of experience.")
+            job_rows.append({
+                "job_id": next_job + i, "dept_id": self.dept_ids[dept], "title": title, "jd_text": jd,
+                "requirements": json.dumps(skills), "status": status,
+                "location": rng.choice(["Remote", "New York", "London", "Bangalore", "Berlin", "Singapore"]),
+                "employment_type": _weighted(rng, [("Full-time", 85), ("Part-time", 5), ("Contract", 10)]),
+                "salary_range": None, "input_data": None, "quantity": rng.choice([1, 1, 1, 2, 3]),
+                "posted_date": posted, "closing_date": posted + timedelta(days=45) if status == "Closed" else None,
+                "created_at": posted,
+            })
+        self._insert(self.m.Job, job_rows)
+        self.job_ids = [j["job_id"] for j in job_rows]
+        if not job_rows:
+            return
+
+        # Job popularity is long-tailed; about 5% of applications are internal (employees)
+        draw_job = _stream(rng, job_rows, [rng.paretovariate(1.2) for _ in job_rows])
+        candidates = self.applicant_user_ids or self.employee_user_ids
+        if not candidates:
+            return
+        applicants = min(applicants, len(job_rows) * len(set(candidates + self.employee_user_ids)) // 2)
+        pairs = set()
+        next_applicant = self._next_id(self.m.Applicant)
+        next_resume = self._next_id(self.m.Resume)
+        applicant_rows, resume_rows = [], []
+        while len(applicant_rows) < applicants:
+            job = next(draw_job)
+            internal = self.employee_user_ids and rng.random() < 0.05
+            user_id = rng.choice(self.employee_user_ids if internal else candidates)
+            if (user_id, job["job_id"]) in pairs:
+                continue
+            pairs.add((user_id, job["job_id"]))
+            applicant_id = next_applicant + len(applicant_rows)
+            applied = job["posted_date"] + timedelta(days=rng.randint(0, 40))
+            scored = rng.random() < 0.6
+            applicant_rows.append({
+                "applicant_id": applicant_id, "user_id": user_id, "job_id": job["job_id"],
+                "status": _weighted(rng, APPLICANT_STATUSES),
+                "score": round(min(100, max(0, rng.gauss(62, 15))), 1) if scored else None,
+                "q_and_a_scores": None, "interview_questions": None, "feedback": None,
+                "applied_date": applied, "updated_at": applied,
+            })
+            skills = json.loads(job["requirements"])
+            rng.shuffle(skills)
+            resume_rows.append({
+                "resume_id": next_resume + len(resume_rows), "applicant_id": applicant_id,
+                "file_url": None, "parsed_text": self._resume_text(user_id, job["title"], skills),
+                "extracted_skills": json.dumps(skills[:rng.randint(2, len(skills))]),
+                "extracted_experience": None, "contact_info": json.dumps({"email": f"user{user_id}@example.com"}),
+                "uploaded_at": applied,
+            })
+        self._insert(self.m.Applicant, applicant_rows)
+        self._insert(self.m.Resume, resume_rows)
+
+    def _resume_text(self, user_id, title, skills):
+        rng = self.rng
+        years = rng.randint(0, 15)
+        lines = [f"Candidate {user_id}", f"user{user_id}@example.com", "", "SUMMARY",
+                 f"{title} with {years} years of experience in {', '.join(skills[:2])}.", "", "SKILLS",
+                 ", ".join(skills), "", "EXPERIENCE"]
+        for i in range(rng.randint(1, 4)):
+            lines.append(f"{title} at Company {rng.randint(1, 500)} ({2024 - 2 * i - 2} - {2024 - 2 * i})")
+            lines.append(f"Delivered {rng.choice(skills)} projects and improved {rng.choice(skills)} processes.")
+        lines += ["", "EDUCATION", f"{rng.choice(['B.Sc.', 'B.A.', 'M.Sc.', 'MBA'])}, State University"]
+        return "\n".join(lines)
+
+    def policies(self, count):
+        rng = self.rng
+        next_id = self._next_id(self.m.Policy)
+        rows = []
+        for i in range(count):
+            topic = POLICY_TOPICS[i % len(POLICY_TOPICS)]
+            paragraphs = []
+            for section in range(rng.randint(3, 8)):
+                sentences = [f"Employees must follow the {topic.lower()} rules described in section {section + 1}."]
+                sentences += [f"Requests related to {topic.lower()} are reviewed within {rng.randint(2, 10)} working days."
+                              for _ in range(rng.randint(3, 10))]
+                paragraphs.append(" ".join(sentences))
+            rows.append({"policy_id": next_id + i, "title": f"{topic} Policy" + (f" ({i // len(POLICY_TOPICS) + 1})" if i >= len(POLICY_TOPICS) else ""),
+                         "category": topic, "content": "\n\n".join(paragraphs), "version": "1.0",
+                         "created_at": self.now, "updated_at": self.now})
+        self._insert(self.m.Policy, rows)
+
+    def chat_messages(self, count):
+        rng = self.rng
+        if not self.employees:
+            return
+        # Chat activity is concentrated: a minority of employees use the assistant heavily
+        draw_employee = _stream(rng, self.employees, [rng.paretovariate(1.5) for _ in self.employees])
+        next_id = self._next_id(self.m.ChatMessage)
+        rows = []
+        while len(rows) < count:
+            emp_id, user_id, _, _ = next(draw_employee)
+            timestamp = self.now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+            for _ in range(rng.randint(1, 5)):
+                if len(rows) >= count:
+                    break
+                question = rng.choice(CHAT_QUESTIONS)
+                rows.append({"id": next_id + len(rows), "user_id": user_id, "sender": "user", "text": question,
+                             "type": "text", "data": None, "timestamp": timestamp})
+                timestamp += timedelta(seconds=rng.randint(2, 20))
+                leaves = self.leaves_by_emp.get(emp_id)
+                if question == "Leave request status" and leaves and len(rows) < count:
+                    leave = rng.choice(leaves)
+                    # Leave cards reference the request; chat history resolves them when read
+                    rows.append({"id": next_id + len(rows), "user_id": user_id, "sender": "ai", "text": "",
+                                 "type": "leave-card", "data": json.dumps({"leave_id": leave["leave_id"]}),
+                                 "timestamp": timestamp})
+                elif len(rows) < count:
+                    rows.append({"id": next_id + len(rows), "user_id": user_id, "sender": "ai",
+                                 "text": f"Here is what I found about: {question.lower()}", "type": "text",
+                                 "data": None, "timestamp": timestamp})
+                timestamp += timedelta(seconds=rng.randint(10, 300))
+        self._insert(self.m.ChatMessage, rows)
+
+    def performance_logs(self, count):
+        rng = self.rng
+        if not self.employees:
+            return
+        next_id = self._next_id(self.m.EmployeePerformance)
+        rows = [{
+            "id": next_id + i, "emp_id": rng.choice(self.employees)[0],
+            "score": float(rng.choice([60, 70, 80, 90, 100])),
+            "type": _weighted(rng, [("Module", 80), ("HR_Manual", 20)]),
+            "comment": None, "created_at": self.now - timedelta(days=rng.randint(0, 365)),
+        } for i in range(count)]
+        self._insert(self.m.EmployeePerformance, rows)
+
+    # ---------- entry point ----------
+
+    def generate(self, employees, applicant_users, hr_users, trainings, enrollments, leave_requests,
+                 jobs, applicants, policies, chat_messages, performance_logs, rollups=True):
+        """Generate every table at the given sizes; returns {table: rows inserted}"""
+        self._timed("departments", self.departments)
+        self._timed("users/employees", self.users_and_employees, employees, applicant_users, hr_users)
+        self._timed("trainings", self.trainings_and_enrollments, trainings, enrollments)
+        self._timed("leave requests", self.leave_requests, leave_requests)
+        self._timed("jobs/applicants", self.jobs_and_applicants, jobs, applicants)
+        self._timed("policies", self.policies, policies)
+        self._timed("chat messages", self.chat_messages, chat_messages)
+        self._timed("performance logs", self.performance_logs, performance_logs)
+        self._reset_sequences()
+        if rollups:
+            from utils.analytics_rollups import rebuild_rollups
+            self._timed("analytics rollups", rebuild_rollups)
+        return dict(self.counts)
+
+
+def add_scale_arguments(parser, default_preset="small"):
+    """--preset plus a per-table override for every size in PRESETS"""
+    parser.add_argument("--preset", choices=sorted(PRESETS), default=default_preset)
+    for name in PRESETS["small"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name,
+                            help=f"rows to generate (large preset: {PRESETS['large'][name]})")
+
+
+def scale_from_args(args):
+    sizes = dict(PRESETS[args.preset])
+    sizes.update({name: getattr(args, name) for name in sizes if getattr(args, name) is not None})
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the database with a synthetic HR dataset")
+    add_scale_arguments(parser)
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--skip-rollups", action="store_true", help="do not rebuild the analytics rollups")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    import models
+    from app_modular import app, db
+
+    sizes = scale_from_args(args)
+    print(f"Generating '{args.preset}' dataset: " + ", ".join(f"{k}={v}" for k, v in sizes.items()))
+    started = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+        generator = DatasetGenerator(db, models, seed=args.seed, batch_size=args.batch_size)
+        counts = generator.generate(**sizes, rollups=not args.skip_rollups)
+    print(f"Inserted {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s:")
+    for table, count in counts.items():
+        print(f"  {table:<22} {count}")
+
+
+if __name__ == "__main__":
+    main()
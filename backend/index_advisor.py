@@ -0,0 +1,55 @@
+"""
+Index advisor: EXPLAIN the query shapes the hot routes issue (utils/index_advisor.py)
+and flag full table scans. Exits 1 when a table of at least --min-rows rows is
+scanned where an index lookup was expected, so it can gate CI.
+
+Usage:
+    python index_advisor.py [--database-url URL] [--min-rows 1000] [--plans]
+    python generate_dataset.py --preset medium --database-url sqlite:////tmp/hr.db && \\
+        python index_advisor.py --database-url sqlite:////tmp/hr.db
+"""
+import argparse
+import os
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag full table scans in hot route queries")
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL)")
+    parser.add_argument("--min-rows", type=int, default=None,
+                        help="tables smaller than this may be scanned (default: 1000)")
+    parser.add_argument("--plans", action="store_true", help="print every query plan")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from app_modular import app, db
+    from utils.index_advisor import DEFAULT_MIN_ROWS, run_advisor
+
+    with app.app_context():
+        report = run_advisor(args.min_rows if args.min_rows is not None else DEFAULT_MIN_ROWS)
+        dialect = db.engine.dialect.name
+
+    problems = 0
+    print(f"EXPLAIN on {dialect}, {len(report)} query shapes")
+    for entry in report:
+        status = "OK  " if entry["ok"] else "FAIL"
+        print(f"{status} {entry['route']} - {entry['label']}")
+        if entry["error"]:
+            print(f"       error: {entry['error']}")
+        for scan in entry["scans"]:
+            print(f"       {scan['verdict']}: {scan['table']} ({scan['rows']} rows) - {scan['detail']}")
+        if args.plans:
+            for line in entry["plan"]:
+                print(f"       | {line}")
+        problems += 0 if entry["ok"] else 1
+
+    if problems:
+        print(f"⚠️ {problems} query shape(s) need an index (run create_indexes.py if the models declare it)")
+        sys.exit(1)
+    print("No unexpected full scans.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Create the database schema: missing tables, missing model indexes (dropping the
+retired ones listed in create_indexes.RETIRED_INDEXES) and, on a database that already has
+employees, the analytics rollups.
+The app does not touch the schema when it starts; run this once per deploy
+(and after adding models). Safe to re-run.
+
+Usage:
+    python init_db.py [--database-url URL]
+"""
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create tables, indexes and analytics rollups")
+    parser.add_argument("--database-url", help="target database (default: DATABASE_URL)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from app_modular import app, db
+    from create_indexes import create_missing_indexes, drop_retired_indexes
+    from utils.analytics_rollups import ensure_rollups
+
+    with app.app_context():
+        db.create_all()
+        created = create_missing_indexes(db)
+        dropped = drop_retired_indexes(db)
+        # First run on an existing database: build the analytics rollups once
+        ensure_rollups()
+        print(f"Database initialized: {len(db.metadata.tables)} tables, {created} indexes created, {dropped} dropped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -175,7 +175,7 @@ class Job(db.Model):
     quantity = db.Column(db.Integer, default=1)
     posted_date = db.Column(db.DateTime, default=datetime.utcnow)
     closing_date = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Job board sort key
     
     # Relationships
     applicants = db.relationship('Applicant', backref='job', lazy='dynamic', cascade='all, delete-orphan')
@@ -234,6 +234,16 @@ class Applicant(db.Model):
     applied_date = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Applicant listings filter by job and sort / range-filter by score (unscored counts as 0),
+    # date or status; "my applications" look up by user, and one user applies to a job at most once
+    # (a unique index rather than a constraint, so create_indexes.py can add it to existing tables)
+    __table_args__ = (
+        db.Index('ix_applicants_job_score_key', 'job_id', db.text('coalesce(score, 0)')),
+        db.Index('ix_applicants_job_applied', 'job_id', 'applied_date'),
+        db.Index('ix_applicants_job_status', 'job_id', 'status'),
+        db.Index('unique_applicant_user_job', 'user_id', 'job_id', unique=True),
+    )
+    
     # Relationships
     resume = db.relationship('Resume', backref='applicant', uselist=False, cascade='all, delete-orphan')
     
@@ -344,6 +354,12 @@ class LeaveRequest(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Per-employee history / approved totals, and the HR queue of pending requests
+    __table_args__ = (
+        db.Index('ix_leave_requests_emp_status_start', 'emp_id', 'status', 'start_date'),
+        db.Index('ix_leave_requests_status_created', 'status', 'created_at'),
+    )
+    
     def to_dict(self):
         """Convert leave request to dictionary"""
         return {
@@ -428,7 +444,10 @@ class EmployeeTraining(db.Model):
     certificate_url = db.Column(db.String(500))
     
     # Unique constraint to prevent duplicate enrollments
-    __table_args__ = (db.UniqueConstraint('emp_id', 'training_id', name='unique_employee_training'),)
+    __table_args__ = (
+        db.UniqueConstraint('emp_id', 'training_id', name='unique_employee_training'),
+        db.Index('ix_employee_trainings_emp_status', 'emp_id', 'status'),
+    )
     
     def to_dict(self):
         """Convert employee training to dictionary"""
@@ -530,9 +549,12 @@ class ChatMessage(db.Model):
     sender = db.Column(db.String(50))  # 'user' or 'ai' or 'assistant'
     text = db.Column(db.Text)
     type = db.Column(db.String(50), default='text') # 'text', 'leave-form', 'leave-card'
-    data = db.Column(db.Text) # JSON string for structured data
+    data = db.Column(db.Text) # JSON string for structured data; leave cards hold {"leave_id": ...}
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Chat history is read per user, newest first, and paginated on (user_id, id)
+    __table_args__ = (db.Index('ix_chat_messages_user_id', 'user_id', 'id'),)
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -545,6 +567,16 @@ class ChatMessage(db.Model):
         }
 
 
+class ChatSummary(db.Model):
+    """Rolling summary of a user's older chatbot messages (maintained by utils/chat_memory.py)"""
+    __tablename__ = 'chat_summaries'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), primary_key=True)
+    summary = db.Column(db.Text, default='')
+    last_message_id = db.Column(db.Integer, default=0)  # newest ChatMessage folded into the summary
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class WellnessResource(db.Model):
     """Wellness resources for employees"""
     __tablename__ = 'wellness_resources'
@@ -690,6 +722,9 @@ class EmployeePerformance(db.Model):
     comment = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Per-employee totals and the once-a-day HR rating check
+    __table_args__ = (db.Index('ix_employee_performance_emp_type_created', 'emp_id', 'type', 'created_at'),)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -699,3 +734,287 @@ class EmployeePerformance(db.Model):
             'comment': self.comment,
             'created_at': self.created_at.isoformat()
         }
+
+
+class ResumeJobScore(db.Model):
+    """
+    Persisted AI suitability score for one resume against one job.
+    Rows are reused until the JD text, resume text or scoring model changes.
+    """
+    __tablename__ = 'resume_job_scores'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id', ondelete='CASCADE'), nullable=False)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.resume_id', ondelete='CASCADE'), nullable=False)
+    technical_skills = db.Column(db.Float)
+    experience_relevance = db.Column(db.Float)
+    impact = db.Column(db.Float)
+    communication = db.Column(db.Float)
+    education = db.Column(db.Float)
+    overall = db.Column(db.Float, nullable=False, default=0.0)
+    model_name = db.Column(db.String(100))
+    jd_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the JD text scored against
+    resume_hash = db.Column(db.String(64), nullable=False)  # SHA-256 of the resume text scored
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('job_id', 'resume_id', name='unique_resume_job_score'),)
+
+    def get_scores(self):
+        """Scores in the shape returned by score_with_gemini"""
+        return {
+            'technical_skills': self.technical_skills,
+            'experience_relevance': self.experience_relevance,
+            'impact': self.impact,
+            'communication': self.communication,
+            'education': self.education,
+            'overall': self.overall
+        }
+
+    @staticmethod
+    def score_columns(scores):
+        """Column values for a score_with_gemini result (also used for bulk writes)"""
+        return {
+            'technical_skills': scores.get('technical_skills'),
+            'experience_relevance': scores.get('experience_relevance'),
+            'impact': scores.get('impact'),
+            'communication': scores.get('communication'),
+            'education': scores.get('education'),
+            'overall': scores.get('overall') or 0.0
+        }
+
+    def set_scores(self, scores):
+        """Copy a score_with_gemini result onto the row"""
+        for column, value in self.score_columns(scores).items():
+            setattr(self, column, value)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'resume_id': self.resume_id,
+            **self.get_scores(),
+            'model_name': self.model_name,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<ResumeJobScore Job:{self.job_id} Resume:{self.resume_id} {self.overall}>'
+
+
+class ResumeIngestion(db.Model):
+    """
+    One resume upload request. Files are processed in the background
+    (extract -> parse -> score) and clients poll this record for progress.
+    """
+    __tablename__ = 'resume_ingestions'
+
+    ingestion_id = db.Column(db.String(36), primary_key=True)  # UUID4
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.job_id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    files = db.relationship('ResumeIngestionFile', backref='ingestion', lazy=True,
+                            cascade='all, delete-orphan', order_by='ResumeIngestionFile.id')
+
+    @property
+    def status(self):
+        """queued / processing / completed / failed / partial, derived from the files"""
+        states = [f.status for f in self.files]
+        if not states or all(s == 'queued' for s in states):
+            return 'queued'
+        if any(s in ('queued', 'running') for s in states):
+            return 'processing'
+        if all(s == 'success' for s in states):
+            return 'completed'
+        if all(s == 'error' for s in states):
+            return 'failed'
+        return 'partial'
+
+    def to_dict(self):
+        files = [f.to_dict() for f in self.files]
+        return {
+            'ingestion_id': self.ingestion_id,
+            'job_id': self.job_id,
+            'status': self.status,
+            'total_files': len(files),
+            'completed_files': sum(1 for f in files if f['status'] in ('success', 'error')),
+            'files': files,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<ResumeIngestion {self.ingestion_id} - {self.status}>'
+
+
+class ResumeIngestionFile(db.Model):
+    """Progress of a single uploaded resume through the ingestion stages"""
+    __tablename__ = 'resume_ingestion_files'
+
+    id = db.Column(db.Integer, primary_key=True)
+    ingestion_id = db.Column(db.String(36), db.ForeignKey('resume_ingestions.ingestion_id'), nullable=False)
+    filename = db.Column(db.String(255))
+    file_path = db.Column(db.String(500))
+    content_hash = db.Column(db.String(64), db.ForeignKey('resume_documents.content_hash'))  # SHA-256 of the file bytes
+    reused = db.Column(db.Boolean, default=False)  # Parse served from an identical earlier upload
+    stage = db.Column(db.String(20), default='queued')  # queued, extracting, parsing, scoring, done
+    status = db.Column(db.String(20), default='queued')  # queued, running, success, error
+    error = db.Column(db.Text)
+    applicant_id = db.Column(db.Integer, db.ForeignKey('applicants.applicant_id'))
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.resume_id'))
+    ranking_score = db.Column(db.Float)
+    parsed_data = db.Column(db.Text)  # JSON string of the flattened parse result
+    stage_timings = db.Column(db.Text)  # JSON string {stage: seconds}
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def get_stage_timings(self):
+        if self.stage_timings:
+            try:
+                return json.loads(self.stage_timings)
+            except:
+                return {}
+        return {}
+
+    def set_stage_timing(self, stage, seconds):
+        timings = self.get_stage_timings()
+        timings[stage] = round(seconds, 3)
+        self.stage_timings = json.dumps(timings)
+
+    def set_page_timings(self, pages):
+        """Store per-page extraction seconds from utils.pdf_extraction"""
+        timings = self.get_stage_timings()
+        timings['extract_pages'] = [
+            {'page': p['page'], 'seconds': p['seconds'], 'method': p['method']} for p in pages
+        ]
+        self.stage_timings = json.dumps(timings)
+
+    def to_dict(self):
+        return {
+            'filename': self.filename,
+            'content_hash': self.content_hash,
+            'reused': bool(self.reused),
+            'stage': self.stage,
+            'status': self.status,
+            'error': self.error,
+            'applicant_id': self.applicant_id,
+            'resume_id': self.resume_id,
+            'ranking_score': self.ranking_score,
+            'parsed_data': json.loads(self.parsed_data) if self.parsed_data else None,
+            'stage_timings': self.get_stage_timings()
+        }
+
+    def __repr__(self):
+        return f'<ResumeIngestionFile {self.filename} - {self.stage}/{self.status}>'
+
+
+
+class ResumeDocument(db.Model):
+    """
+    An uploaded resume file, stored once per SHA-256 of its bytes.
+    Holds the extracted text and parse results so repeat uploads skip extraction and Gemini.
+    """
+    __tablename__ = 'resume_documents'
+
+    content_hash = db.Column(db.String(64), primary_key=True)  # SHA-256 hex digest of the file bytes
+    file_path = db.Column(db.String(500), nullable=False)
+    file_size = db.Column(db.Integer)
+    extracted_text = db.Column(db.Text)  # Plain text from utils.pdf_extraction
+    parsed_data = db.Column(db.Text)  # JSON string of the Gemini parse (without raw_text)
+    schema_data = db.Column(db.Text)  # JSON string of the parse validated against ResumeSchema
+    model_name = db.Column(db.String(100))  # Model that produced parsed_data
+    upload_count = db.Column(db.Integer, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def is_parsed(self):
+        return bool(self.parsed_data)
+
+    def get_parsed(self):
+        """Stored parse in the shape returned by parse_resume_text, raw_text included"""
+        if not self.parsed_data:
+            return None
+        try:
+            parsed = json.loads(self.parsed_data)
+        except:
+            return None
+        parsed['raw_text'] = self.extracted_text or ''
+        return parsed
+
+    def get_schema(self):
+        if self.schema_data:
+            try:
+                return json.loads(self.schema_data)
+            except:
+                return None
+        return None
+
+    def to_dict(self):
+        return {
+            'content_hash': self.content_hash,
+            'file_size': self.file_size,
+            'is_parsed': self.is_parsed,
+            'resume_schema': self.get_schema(),
+            'model_name': self.model_name,
+            'upload_count': self.upload_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_uploaded_at': self.last_uploaded_at.isoformat() if self.last_uploaded_at else None
+        }
+
+    def __repr__(self):
+        return f'<ResumeDocument {self.content_hash[:12]} x{self.upload_count}>'
+
+
+class EmployeeAnalyticsRollup(db.Model):
+    """
+    Precomputed analytics per employee (all-time approved leave, training counts).
+    Maintained by utils.analytics_rollups; rebuild with rebuild_analytics_rollups.py.
+    """
+    __tablename__ = 'employee_analytics_rollups'
+
+    emp_id = db.Column(db.Integer, db.ForeignKey('employees.emp_id', ondelete='CASCADE'), primary_key=True)
+    dept_id = db.Column(db.Integer, db.ForeignKey('departments.dept_id'), index=True)
+    approved_leave_days = db.Column(db.Float, default=0.0)
+    trainings_total = db.Column(db.Integer, default=0)
+    trainings_completed = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<EmployeeAnalyticsRollup Emp:{self.emp_id}>'
+
+
+class DepartmentAnalyticsRollup(db.Model):
+    """Precomputed analytics per department, the sum of its employees' rollups"""
+    __tablename__ = 'department_analytics_rollups'
+
+    dept_id = db.Column(db.Integer, db.ForeignKey('departments.dept_id', ondelete='CASCADE'), primary_key=True)
+    employee_count = db.Column(db.Integer, default=0)
+    approved_leave_days = db.Column(db.Float, default=0.0)
+    trainings_total = db.Column(db.Integer, default=0)
+    trainings_completed = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DepartmentAnalyticsRollup Dept:{self.dept_id} ({self.employee_count})>'
+
+
+class LeaveMonthlyRollup(db.Model):
+    """Approved leave per employee per calendar month (by leave start date)"""
+    __tablename__ = 'leave_monthly_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    emp_id = db.Column(db.Integer, db.ForeignKey('employees.emp_id', ondelete='CASCADE'), nullable=False)
+    dept_id = db.Column(db.Integer, db.ForeignKey('departments.dept_id'))
+    month = db.Column(db.Date, nullable=False, index=True)  # First day of the month
+    leave_days = db.Column(db.Float, default=0.0)
+    leave_count = db.Column(db.Integer, default=0)
+    burnout_count = db.Column(db.Integer, default=0)
+    sickness_count = db.Column(db.Integer, default=0)
+
+    __table_args__ = (db.UniqueConstraint('emp_id', 'month', name='unique_leave_month_rollup'),)
+
+    def __repr__(self):
+        return f'<LeaveMonthlyRollup Emp:{self.emp_id} {self.month}>'
@@ -0,0 +1,9 @@
+from app_modular import app, db
+from models import EmployeeAnalyticsRollup, DepartmentAnalyticsRollup, LeaveMonthlyRollup
+from utils.analytics_rollups import rebuild_rollups
+
+with app.app_context():
+    db.create_all()
+    counts = rebuild_rollups()
+    print(f"Analytics rollups rebuilt: {counts['employees']} employees, "
+          f"{counts['departments']} departments, {counts['months']} employee-months.")
@@ -1,7 +1,7 @@
 """
 Additional Routes - Employee, Wellness, Learning, Sentiment, Chatbot
 """
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context, current_app
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
@@ -13,79 +13,114 @@ from models import (
 from datetime import datetime, timedelta
 import os
 import json
-from utils.ai_chatbot import get_hr_response
+from utils.ai_chatbot import get_hr_response, stream_hr_response
+from utils.chat_memory import schedule_fold
+from utils.chat_history import fetch_chat_page, leave_card_data, serialize_messages
+from utils.pagination import page_size
 from utils.ai_skill_recommender import recommend_skills, get_trending_skills
 from utils.ai_sentiment_analyzer import analyze_sentiment, get_sentiment_trends, get_sentiment_themes
 from utils.ai_learning_path import generate_learning_path, get_roles_and_goals
 from utils.document_generator import generate_reference_letter, generate_employment_proof
 from utils.ai_wellness_tips import generate_wellness_tips
+from utils.analytics_rollups import refresh_employee_rollups
 
 
 # ==================== CHATBOT ROUTES ====================
 
+def _leave_status_reply(message, user_id):
+    """
+    Fixed answer and leave-card messages for "Leave request status" questions.
+    Returns (None, []) when the question should go to the chatbot. Cards are not added to the session.
+    """
+    if "leave request status" not in message.lower():
+        return None, []
+
+    # Find employee
+    user = User.query.get(user_id)
+    if not (user and user.employee):
+        return None, []
+
+    requests = LeaveRequest.query.filter_by(emp_id=user.employee.emp_id).order_by(LeaveRequest.created_at.desc()).all()
+    if not requests:
+        return "You have no leave requests found.", []
+
+    cards = [ChatMessage(
+        user_id=user_id,
+        sender="ai",
+        text="",
+        type="leave-card",
+        data=leave_card_data(req),
+        timestamp=datetime.utcnow()
+    ) for req in requests]
+    return f"Here are your {len(requests)} leave requests:", cards
+
+
+def _save_chat_exchange(user_id, message, ai_answer, cards, asked_at=None):
+    """
+    Save the user's message, the leave cards and the answer in one commit (ids follow that order).
+    Returns (answer timestamp, serialized cards).
+    """
+    # Save user chat
+    user_chat = ChatMessage(
+        user_id=user_id,
+        sender="user",
+        text=message,
+        timestamp=asked_at or datetime.utcnow(),
+    )
+    db.session.add(user_chat)
+    db.session.add_all(cards)
+
+    # Save AI chat (text summary)
+    answered_at = datetime.utcnow()
+    ai_chat = ChatMessage(
+        user_id=user_id,
+        sender="ai",
+        text=ai_answer,
+        timestamp=answered_at,
+    )
+    db.session.add(ai_chat)
+
+    # Serialized before the commit expires the rows, so the cards are not reloaded one by one
+    db.session.flush()
+    card_items = serialize_messages(cards)
+    db.session.commit()
+    # Fold turns that left the prompt's history window into the stored summary, off the request path
+    schedule_fold(current_app._get_current_object(), user_id)
+    return answered_at, card_items
+
+
+def _sse(event, payload):
+    """One Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
 class AskHRChat(Resource):
     """HR Chatbot API Endpoint"""
 
+    @jwt_required()
     def post(self):
         try:
             data = request.get_json()
             message = data.get("message", "")
-            user_id = data.get("user_id", 1)
+            # The conversation (and its memory) is always the caller's own; a body user_id is ignored
+            user_id = int(get_jwt_identity())
 
             if not message:
                 return {"error": "Message is required"}, 400
 
-            # Generate AI response from service
-            ai_answer = get_hr_response(message, user_id=user_id)
-            additional_messages = []
-
-            # Special handling for "Leave request status"
-            if "leave request status" in message.lower():
-                # Find employee
-                user = User.query.get(user_id)
-                if user and user.employee:
-                    requests = LeaveRequest.query.filter_by(emp_id=user.employee.emp_id).order_by(LeaveRequest.created_at.desc()).all()
-                    if requests:
-                        ai_answer = f"Here are your {len(requests)} leave requests:"
-                        for req in requests:
-                            card = ChatMessage(
-                                user_id=user_id,
-                                sender="ai",
-                                text="",
-                                type="leave-card",
-                                data=json.dumps(req.to_dict()),
-                                timestamp=datetime.utcnow()
-                            )
-                            db.session.add(card)
-                            additional_messages.append(card)
-                    else:
-                        ai_answer = "You have no leave requests found."
-
-            # Save user chat
-            user_chat = ChatMessage(
-                user_id=user_id,
-                sender="user",
-                text=message,
-                timestamp=datetime.utcnow(),
-            )
-            db.session.add(user_chat)
-
-            # Save AI chat (text summary)
-            ai_chat = ChatMessage(
-                user_id=user_id,
-                sender="ai",
-                text=ai_answer,
-                timestamp=datetime.utcnow(),
-            )
-            db.session.add(ai_chat)
+            # Special handling for "Leave request status" (answered without the chatbot)
+            ai_answer, additional_messages = _leave_status_reply(message, user_id)
+            if ai_answer is None:
+                # Generate AI response from service
+                ai_answer = get_hr_response(message, user_id=user_id)
 
-            db.session.commit()
+            answered_at, card_items = _save_chat_exchange(user_id, message, ai_answer, additional_messages)
 
             # Prepare response
             response_data = {
                 "response": ai_answer,
-                "timestamp": ai_chat.timestamp.isoformat(),
-                "additional_messages": [msg.to_dict() for msg in additional_messages]
+                "timestamp": answered_at.isoformat(),
+                "additional_messages": card_items
             }
 
             return response_data, 200
@@ -94,28 +129,76 @@ class AskHRChat(Resource):
             return {"error": str(e)}, 500
 
 
+class AskHRChatStream(Resource):
+    """
+    HR Chatbot API Endpoint, streaming the answer as Server-Sent Events.
+
+    Same request body and JWT requirement as AskHRChat. Events:
+        chunk    {"text"}                        - the next piece of the answer
+        message  chat history item               - additional messages (leave cards), after the answer
+        done     {"response", "timestamp"}       - the full answer, once it has been saved
+        error    {"error"}
+    The exchange is saved only when the stream completes; nothing is saved if the client disconnects.
+    """
+
+    @jwt_required()
+    def post(self):
+        data = request.get_json() or {}
+        message = data.get("message", "")
+        user_id = int(get_jwt_identity())
+
+        if not message:
+            return {"error": "Message is required"}, 400
+
+        asked_at = datetime.utcnow()
+        try:
+            ai_answer, cards = _leave_status_reply(message, user_id)
+            # Context and prompt are built here, so a failure is still a plain JSON error
+            chunks = iter([ai_answer]) if ai_answer is not None else stream_hr_response(message, user_id=user_id)
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+        def events():
+            parts = []
+            try:
+                for chunk in chunks:
+                    parts.append(chunk)
+                    yield _sse("chunk", {"text": chunk})
+
+                answer = "".join(parts).strip()
+                answered_at, card_items = _save_chat_exchange(user_id, message, answer, cards, asked_at=asked_at)
+                for card in card_items:
+                    yield _sse("message", card)
+                yield _sse("done", {"response": answer, "timestamp": answered_at.isoformat()})
+            except Exception as e:
+                db.session.rollback()
+                yield _sse("error", {"error": str(e)})
+
+        return Response(stream_with_context(events()), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 class ChatHistoryResource(Resource):
-    """Get chat history"""
+    """
+    Get chat history, newest first. Query params:
+        user_id - owner of the messages
+        limit   - page size (default 50)
+        cursor  - next_cursor from the previous page, for older messages
+    """
     @jwt_required()
     def get(self):
         try:
             user_id = request.args.get('user_id', 1, type=int)
-            limit = request.args.get('limit', 50, type=int)
-            
-            chats = ChatMessage.query.filter_by(user_id=user_id)\
-                .order_by(ChatMessage.timestamp.desc())\
-                .limit(limit).all()
-            
-            return {
-                'history': [{
-                    'id': chat.id,
-                    'sender': chat.sender,
-                    'text': chat.text,
-                    'type': chat.type,
-                    'data': json.loads(chat.data) if chat.data else None,
-                    'timestamp': chat.timestamp.isoformat()
-                } for chat in chats]
-            }, 200
+            try:
+                page = fetch_chat_page(
+                    user_id,
+                    cursor=request.args.get('cursor'),
+                    limit=page_size(request.args.get('limit', type=int))
+                )
+            except ValueError as e:
+                return {'error': str(e)}, 400
+
+            return page, 200
             
         except Exception as e:
             return {'error': str(e)}, 500
@@ -806,6 +889,7 @@ class TrainingStatusUpdate(Resource):
             if 'certificate_url' in data:
                 emp_training.certificate_url = data.get('certificate_url')
                 
+            refresh_employee_rollups(emp_training.emp_id)
             db.session.commit()
             
             return {
@@ -883,6 +967,7 @@ class AssignManagerTrainingResource(Resource):
                         enrollment_date=datetime.utcnow()
                     )
                     db.session.add(enrollment)
+                    refresh_employee_rollups(emp_id)
             
             db.session.commit()
             
@@ -1219,6 +1304,8 @@ class LeaveRequestActionResource(Resource):
             leave_request.approved_by = user.employee.emp_id
             leave_request.updated_at = datetime.utcnow()
             
+            if leave_request.status == 'Approved':
+                refresh_employee_rollups(leave_request.emp_id)
             db.session.commit()
             
             return {"message": f"Leave request {action}d successfully", "leave_request": leave_request.to_dict()}, 200
@@ -1296,6 +1383,8 @@ class AddEmployeeResource(Resource):
                 skills="[]"
             )
             db.session.add(new_employee)
+            db.session.flush()
+            refresh_employee_rollups(new_employee.emp_id)
             db.session.commit()
             
             return {
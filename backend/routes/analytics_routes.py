@@ -1,12 +1,37 @@
 """
 Analytics Routes
-Endpoints for HR analytics and reporting
+Endpoints for HR analytics and reporting.
+Every endpoint aggregates in SQL (GROUP BY / CASE) with a fixed number of
+queries, so response time does not grow with headcount. Absenteeism, retention
+and department figures read the precomputed rollups in utils.analytics_rollups.
+Endpoints polled by every dashboard tab are served from utils.response_cache.
 """
 from flask import jsonify
 from flask_restful import Resource
+from sqlalchemy import case, func
 from models import *
-from datetime import datetime, timedelta
-import calendar
+from utils import analytics_rollups as rollups
+from utils.response_cache import cached_response
+from datetime import datetime
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _employee_counts_by_dept():
+    """[(dept_id, name, employee count)] for every department in one query"""
+    return db.session.query(Department.dept_id, Department.name, func.count(Employee.emp_id))\
+        .outerjoin(Employee, Employee.dept_id == Department.dept_id)\
+        .group_by(Department.dept_id, Department.name)\
+        .order_by(Department.dept_id).all()
+
+
+def _department_rollups():
+    """[(name, DepartmentAnalyticsRollup or None)] for every department"""
+    return db.session.query(Department.name, DepartmentAnalyticsRollup)\
+        .outerjoin(DepartmentAnalyticsRollup, DepartmentAnalyticsRollup.dept_id == Department.dept_id)\
+        .order_by(Department.dept_id).all()
 
 
 class AnalyticsSummary(Resource):
@@ -15,38 +40,17 @@ class AnalyticsSummary(Resource):
     def get(self):
         total_employees = Employee.query.count()
         
-        # Calculate avg absenteeism
-        today = datetime.utcnow().date()
-        start_period = today - timedelta(days=180)
-        leaves = LeaveRequest.query.filter(
-            LeaveRequest.start_date >= start_period,
-            LeaveRequest.status == 'Approved'
-        ).all()
-        total_days = sum((lv.end_date - lv.start_date).days + 1 for lv in leaves)
-        avg_absenteeism = round((total_days / (total_employees * 22 * 6)) * 100, 2) if total_employees else 0
+        # Calculate avg absenteeism (current month and the five before it)
+        window_start = rollups.absenteeism_window_start(datetime.utcnow().date())
+        total_days = rollups.absenteeism_leave_days(window_start)
+        avg_absenteeism = round((total_days / (total_employees * rollups.WORKING_DAYS_PER_MONTH * rollups.ABSENTEEISM_MONTHS)) * 100, 2) if total_employees else 0
         
         # Training completion
-        total_enrollments = EmployeeTraining.query.count()
-        completed = EmployeeTraining.query.filter_by(status='Completed').count()
+        total_enrollments, completed = rollups.training_totals()
         training_completion = round((completed / total_enrollments) * 100, 2) if total_enrollments else 0
         
         # Retention risk
-        employees = Employee.query.all()
-        high_risk_count = 0
-        for emp in employees:
-            emp_leaves = LeaveRequest.query.filter(
-                LeaveRequest.emp_id == emp.emp_id,
-                LeaveRequest.status == 'Approved',
-                LeaveRequest.start_date >= start_period
-            ).all()
-            leave_days = sum((l.end_date - l.start_date).days + 1 for l in emp_leaves)
-            absenteeism_pct = (leave_days / (22 * 6)) * 100
-            
-            trainings = EmployeeTraining.query.filter_by(emp_id=emp.emp_id).all()
-            pending_pct = (len([t for t in trainings if t.status != 'Completed']) / (len(trainings) or 1)) * 100
-            
-            if absenteeism_pct > 8 or pending_pct > 50:
-                high_risk_count += 1
+        high_risk_count = rollups.risk_counts(window_start)['high']
         
         high_retention_risk = round((high_risk_count / total_employees) * 100, 2) if total_employees else 0
         
@@ -68,25 +72,14 @@ class AbsenteeismTrends(Resource):
     """Absenteeism trends over time"""
     
     def get(self):
-        today = datetime.utcnow()
-        months = []
-        approved_data, burnout_data, sickness_data = [], [], []
+        today = datetime.utcnow().date()
+        month_starts = [rollups.month_start(today, i) for i in reversed(range(7))]
+        totals = rollups.monthly_leave_totals(month_starts[0])
         
-        for i in reversed(range(7)):
-            month_start = datetime(today.year, today.month, 1) - timedelta(days=i*30)
-            month_end = datetime(month_start.year, month_start.month, 
-                               calendar.monthrange(month_start.year, month_start.month)[1])
-            months.append(month_start.strftime('%b'))
-            
-            leaves = LeaveRequest.query.filter(
-                LeaveRequest.start_date >= month_start,
-                LeaveRequest.start_date <= month_end,
-                LeaveRequest.status == 'Approved'
-            ).all()
-            
-            approved_data.append(sum((l.end_date - l.start_date).days + 1 for l in leaves))
-            burnout_data.append(sum(1 for l in leaves if l.reason and 'burnout' in l.reason.lower()))
-            sickness_data.append(sum(1 for l in leaves if l.reason and 'sick' in l.reason.lower()))
+        months = [m.strftime('%b') for m in month_starts]
+        approved_data = [int(totals.get(m, (0, 0, 0))[0]) for m in month_starts]
+        burnout_data = [int(totals.get(m, (0, 0, 0))[1]) for m in month_starts]
+        sickness_data = [int(totals.get(m, (0, 0, 0))[2]) for m in month_starts]
         
         return {
             "categories": months,
@@ -102,51 +95,25 @@ class RetentionRisk(Resource):
     """Retention risk distribution"""
     
     def get(self):
-        employees = Employee.query.all()
-        low = medium = high = 0
-        start_period = datetime.utcnow().date() - timedelta(days=180)
-        
-        for emp in employees:
-            leaves = LeaveRequest.query.filter(
-                LeaveRequest.emp_id == emp.emp_id,
-                LeaveRequest.status == 'Approved',
-                LeaveRequest.start_date >= start_period
-            ).all()
-            leave_days = sum((l.end_date - l.start_date).days + 1 for l in leaves)
-            absenteeism_pct = (leave_days / (22 * 6)) * 100
-            
-            trainings = EmployeeTraining.query.filter_by(emp_id=emp.emp_id).all()
-            pending_pct = (len([t for t in trainings if t.status != 'Completed']) / (len(trainings) or 1)) * 100
-            
-            if absenteeism_pct > 8 or pending_pct > 50:
-                high += 1
-            elif absenteeism_pct > 5 or pending_pct > 30:
-                medium += 1
-            else:
-                low += 1
+        window_start = rollups.absenteeism_window_start(datetime.utcnow().date())
+        counts = rollups.risk_counts(window_start)
         
-        return {"labels": ["Low Risk", "Medium Risk", "High Risk"], "series": [low, medium, high]}
+        return {"labels": ["Low Risk", "Medium Risk", "High Risk"], "series": [counts['low'], counts['medium'], counts['high']]}
 
 
 class TrainingCompletion(Resource):
     """Training completion by department"""
     
     def get(self):
-        departments = Department.query.all()
         categories, completed_data, pending_data = [], [], []
         
-        for dept in departments:
-            emp_ids = [e.emp_id for e in dept.employees]
-            if not emp_ids:
+        for name, rollup in _department_rollups():
+            if not rollup or not rollup.employee_count:
                 continue
             
-            total = EmployeeTraining.query.filter(EmployeeTraining.emp_id.in_(emp_ids)).count()
-            completed = EmployeeTraining.query.filter(
-                EmployeeTraining.emp_id.in_(emp_ids),
-                EmployeeTraining.status == 'Completed'
-            ).count()
+            total, completed = rollup.trainings_total or 0, rollup.trainings_completed or 0
             
-            categories.append(dept.name)
+            categories.append(name)
             completed_data.append(round((completed / total) * 100 if total else 0, 2))
             pending_data.append(round(((total - completed) / total) * 100 if total else 0, 2))
         
@@ -162,28 +129,19 @@ class TrainingCompletion(Resource):
 class DepartmentAnalytics(Resource):
     """Department-wise analytics"""
     
+    @cached_response(Department, DepartmentAnalyticsRollup)
     def get(self):
-        departments = Department.query.all()
         department_data = []
         
-        for dept in departments:
-            emp_count = dept.employees.count()
-            emp_ids = [e.emp_id for e in dept.employees]
+        for name, rollup in _department_rollups():
+            emp_count = rollup.employee_count if rollup else 0
             
-            if emp_ids:
-                total_leaves = LeaveRequest.query.filter(
-                    LeaveRequest.emp_id.in_(emp_ids),
-                    LeaveRequest.status == 'Approved'
-                ).all()
-                leave_days = sum((l.end_date - l.start_date).days + 1 for l in total_leaves)
-                absenteeism = round((leave_days / (emp_count * 22 * 6)) * 100 if emp_count else 0, 2)
+            if emp_count:
+                leave_days = rollup.approved_leave_days or 0
+                absenteeism = round((leave_days / (emp_count * rollups.WORKING_DAYS_PER_MONTH * rollups.ABSENTEEISM_MONTHS)) * 100, 2)
                 
-                total_training = EmployeeTraining.query.filter(EmployeeTraining.emp_id.in_(emp_ids)).count()
-                completed_training = EmployeeTraining.query.filter(
-                    EmployeeTraining.emp_id.in_(emp_ids),
-                    EmployeeTraining.status == 'Completed'
-                ).count()
-                pending_training = total_training - completed_training
+                total_training = rollup.trainings_total or 0
+                pending_training = total_training - (rollup.trainings_completed or 0)
             else:
                 absenteeism = pending_training = total_training = 0
             
@@ -199,7 +157,7 @@ class DepartmentAnalytics(Resource):
             insights.append(f"Avg absenteeism: {absenteeism}%")
             
             department_data.append({
-                "department": dept.name,
+                "department": name,
                 "risk_level": risk_level,
                 "employee_count": emp_count,
                 "pending_training": pending_training,
@@ -213,31 +171,40 @@ class DepartmentAnalytics(Resource):
 class AnalyticsOverview(Resource):
     """Comprehensive analytics overview"""
     
+    @cached_response(Employee, Department, Job, Applicant, Training, EmployeeTraining, LeaveRequest)
     def get(self):
         total_employees = Employee.query.count()
-        total_jobs = Job.query.count()
-        open_jobs = Job.query.filter_by(status='Open').count()
+        total_jobs, open_jobs = db.session.query(
+            func.count(Job.job_id), _count_if(Job.status == 'Open')
+        ).one()
         total_applicants = Applicant.query.count()
         
         # Training stats
         total_trainings = Training.query.count()
-        total_enrollments = EmployeeTraining.query.count()
-        completed_trainings = EmployeeTraining.query.filter_by(status='Completed').count()
+        total_enrollments, completed_trainings = db.session.query(
+            func.count(EmployeeTraining.id), _count_if(EmployeeTraining.status == 'Completed')
+        ).one()
         training_completion_rate = round((completed_trainings / total_enrollments) * 100, 2) if total_enrollments else 0
         
         # Leave stats
-        total_leaves = LeaveRequest.query.count()
-        pending_leaves = LeaveRequest.query.filter_by(status='Pending').count()
-        approved_leaves = LeaveRequest.query.filter_by(status='Approved').count()
+        total_leaves, pending_leaves, approved_leaves = db.session.query(
+            func.count(LeaveRequest.leave_id),
+            _count_if(LeaveRequest.status == 'Pending'),
+            _count_if(LeaveRequest.status == 'Approved')
+        ).one()
         
         # Department breakdown
-        departments = Department.query.all()
+        open_positions = dict(
+            db.session.query(Job.dept_id, func.count(Job.job_id))
+            .filter(Job.status == 'Open')
+            .group_by(Job.dept_id).all()
+        )
         dept_breakdown = []
-        for dept in departments:
+        for dept_id, name, emp_count in _employee_counts_by_dept():
             dept_breakdown.append({
-                "name": dept.name,
-                "employee_count": dept.employees.count(),
-                "open_positions": Job.query.filter_by(dept_id=dept.dept_id, status='Open').count()
+                "name": name,
+                "employee_count": emp_count,
+                "open_positions": open_positions.get(dept_id, 0)
             })
         
         return {
@@ -265,12 +232,22 @@ class AnalyticsOverview(Resource):
 class RecruitmentAnalytics(Resource):
     """Recruitment funnel analytics"""
     
+    @cached_response(Job, Applicant)
     def get(self):
-        jobs = Job.query.all()
+        jobs = db.session.query(Job.job_id, Job.title).order_by(Job.job_id).all()
+        
+        # Applicant counts per (job, status) in one grouped query
+        counts_by_job = {}
+        total_applicants = 0
+        for job_id, status, count in db.session.query(Applicant.job_id, Applicant.status, func.count(Applicant.applicant_id))\
+                .group_by(Applicant.job_id, Applicant.status).all():
+            counts_by_job.setdefault(job_id, {})[status] = count
+            total_applicants += count
         
         funnel_data = []
-        for job in jobs:
-            applicants = Applicant.query.filter_by(job_id=job.job_id).all()
+        for job_id, title in jobs:
+            job_counts = counts_by_job.get(job_id, {})
+            job_total = sum(job_counts.values())
             
             status_counts = {
                 "Applied": 0,
@@ -281,50 +258,62 @@ class RecruitmentAnalytics(Resource):
                 "Rejected": 0
             }
             
-            for applicant in applicants:
-                if applicant.status in status_counts:
-                    status_counts[applicant.status] += 1
+            for status, count in job_counts.items():
+                if status in status_counts:
+                    status_counts[status] += count
             
             funnel_data.append({
-                "job_title": job.title,
-                "job_id": job.job_id,
-                "total_applicants": len(applicants),
+                "job_title": title,
+                "job_id": job_id,
+                "total_applicants": job_total,
                 "funnel": status_counts,
-                "conversion_rate": round((status_counts["Hired"] / len(applicants)) * 100, 2) if applicants else 0
+                "conversion_rate": round((status_counts["Hired"] / job_total) * 100, 2) if job_total else 0
             })
         
         return {
             "recruitment_funnel": funnel_data,
             "total_jobs": len(jobs),
-            "total_applicants": Applicant.query.count()
+            "total_applicants": total_applicants
         }
 
 
 class TrainingAnalytics(Resource):
     """Training program analytics"""
     
+    @cached_response(Training, EmployeeTraining)
     def get(self):
-        trainings = Training.query.all()
+        is_completed = EmployeeTraining.status == 'Completed'
+        enrollment_sq = db.session.query(
+            EmployeeTraining.training_id.label('training_id'),
+            func.count(EmployeeTraining.id).label('enrolled'),
+            _count_if(is_completed).label('completed'),
+            func.coalesce(func.sum(case((is_completed, func.coalesce(EmployeeTraining.score, 0)), else_=0)), 0).label('score_sum')
+        ).group_by(EmployeeTraining.training_id).subquery()
+        
+        rows = db.session.query(
+            Training.training_id, Training.title, Training.category,
+            func.coalesce(enrollment_sq.c.enrolled, 0),
+            func.coalesce(enrollment_sq.c.completed, 0),
+            func.coalesce(enrollment_sq.c.score_sum, 0)
+        ).outerjoin(enrollment_sq, enrollment_sq.c.training_id == Training.training_id)\
+            .order_by(Training.training_id).all()
         
         training_stats = []
-        for training in trainings:
-            enrollments = EmployeeTraining.query.filter_by(training_id=training.training_id).all()
-            completed = [e for e in enrollments if e.status == 'Completed']
-            
-            avg_score = sum([e.score for e in completed if e.score]) / len(completed) if completed else 0
+        for training_id, title, category, enrolled, completed, score_sum in rows:
+            avg_score = float(score_sum) / completed if completed else 0
             
             training_stats.append({
-                "training_id": training.training_id,
-                "title": training.title,
-                "category": training.category,
-                "total_enrolled": len(enrollments),
-                "completed": len(completed),
-                "completion_rate": round((len(completed) / len(enrollments)) * 100, 2) if enrollments else 0,
+                "training_id": training_id,
+                "title": title,
+                "category": category,
+                "total_enrolled": enrolled,
+                "completed": completed,
+                "completion_rate": round((completed / enrolled) * 100, 2) if enrolled else 0,
                 "average_score": round(avg_score, 2)
             })
         
         return {
             "training_programs": training_stats,
-            "total_programs": len(trainings),
+            "total_programs": len(rows),
             "total_enrollments": EmployeeTraining.query.count()
         }
@@ -6,6 +6,7 @@ from models import User, Employee, db
 from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
+from utils.analytics_rollups import refresh_employee_rollups
 
 
 class LoginResource(Resource):
@@ -84,6 +85,8 @@ class RegisterResource(Resource):
                     hire_date=datetime.utcnow().date()
                 )
                 db.session.add(new_employee)
+                db.session.flush()
+                refresh_employee_rollups(new_employee.emp_id)
 
             db.session.commit()
 
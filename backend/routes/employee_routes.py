@@ -2,41 +2,38 @@ from flask import request
 import json
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Employee, User, Department, db, EmployeeBirthday, EmployeePerformance
+from models import Employee, User, db, EmployeeBirthday
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import func
+from utils.analytics_rollups import refresh_employee_rollups
+from utils.employee_queries import fetch_employee_page, parse_fields
+from utils.pagination import page_size
 
 class EmployeeListResource(Resource):
     @jwt_required()
     def get(self):
+        """
+        Employee listing. Optional query params:
+            fields  - comma-separated subset of the employee fields to return
+            limit   - page size (keyset pagination; omitted returns every employee)
+            cursor  - next_cursor from the previous page
+            dept_id - only employees of this department
+        """
         try:
-            # Fetch all employees with their associated user and department data
-            employees = Employee.query.join(User).outerjoin(Department).all()
-            
-            employee_list = []
-            for emp in employees:
-                emp_data = emp.to_dict()
-                # Add user-specific fields that might not be in to_dict() or ensure they are present
-                emp_data['name'] = emp.user.name
-                emp_data['email'] = emp.user.email
-                emp_data['department'] = emp.department.name if emp.department else 'Unassigned'
-                
-                # Add leave stats (mock or calculated)
-                # Calculate total approved leave days
-                approved_leaves = [req.number_of_days or 0 for req in emp.leave_requests if req.status == 'Approved']
-                emp_data['leaves_taken'] = sum(approved_leaves)
-                
-                # Calculate aggregated performance score
-                performance_records = EmployeePerformance.query.filter_by(emp_id=emp.emp_id).all()
-                if performance_records:
-                    total_score = sum(record.score for record in performance_records)
-                    emp_data['performance_score'] = round(total_score, 1)
-                else:
-                    emp_data['performance_score'] = None
-                
-                employee_list.append(emp_data)
+            fields, unknown = parse_fields(request.args.get('fields'))
+            if unknown:
+                return {"message": f"Unknown fields: {', '.join(unknown)}"}, 400
 
-            return {"employees": employee_list}, 200
+            try:
+                page = fetch_employee_page(
+                    fields=fields,
+                    cursor=request.args.get('cursor'),
+                    limit=page_size(request.args.get('limit', type=int), default=None),
+                    dept_id=request.args.get('dept_id', type=int)
+                )
+            except ValueError as e:
+                return {"message": str(e)}, 400
+            return page, 200
 
         except Exception as e:
             return {"message": "Unexpected error occurred", "error": str(e)}, 500
@@ -103,6 +100,9 @@ class ApproveEmployeeResource(Resource):
             else:
                 employee.skills = skills_data
             
+            # New employee or department change: keep the analytics rollups in step
+            db.session.flush()
+            refresh_employee_rollups(employee.emp_id)
             db.session.commit()
             
             return {"message": f"Employee {user.name} approved and activated successfully"}, 200
@@ -0,0 +1,58 @@
+"""
+Metrics Routes
+Operational metrics for HR/admin users. Only registered when the matching
+instrumentation is switched on.
+"""
+from flask import request
+from flask_jwt_extended import jwt_required, get_jwt
+from flask_restful import Resource
+
+from utils import llm_telemetry, sql_profiler
+
+
+def _is_admin():
+    return (get_jwt().get("role") or "").lower() in ("hr", "admin")
+
+
+class SqlMetricsResource(Resource):
+    """Per-endpoint query counts, DB time, slowest and most repeated statements"""
+
+    @jwt_required()
+    def get(self):
+        if not _is_admin():
+            return {"error": "Access denied"}, 403
+        return {
+            "slow_query_ms": sql_profiler.SQL_SLOW_QUERY_MS,
+            "endpoints": sql_profiler.endpoint_stats(request.args.get("endpoint"))
+        }, 200
+
+    @jwt_required()
+    def delete(self):
+        if not _is_admin():
+            return {"error": "Access denied"}, 403
+        sql_profiler.reset()
+        return {"message": "SQL metrics reset"}, 200
+
+
+class LlmMetricsResource(Resource):
+    """Per-call-site LLM latency / token histograms, cache hits, parse failures, retries and cost"""
+
+    @jwt_required()
+    def get(self):
+        if not _is_admin():
+            return {"error": "Access denied"}, 403
+        return {
+            "prices_per_1m_tokens": {
+                "input": llm_telemetry.LLM_PRICE_INPUT_PER_1M,
+                "output": llm_telemetry.LLM_PRICE_OUTPUT_PER_1M
+            },
+            "totals": llm_telemetry.totals(),
+            "call_sites": llm_telemetry.call_site_stats(request.args.get("call_site"))
+        }, 200
+
+    @jwt_required()
+    def delete(self):
+        if not _is_admin():
+            return {"error": "Access denied"}, 403
+        llm_telemetry.reset()
+        return {"message": "LLM metrics reset"}, 200
@@ -2,18 +2,32 @@
 Recruitment Routes - Integrated with AI Backend
 Uses AI Backend (Gemini) for resume parsing, JD generation, and ranking
 """
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
-from models import db, Job, Applicant, Resume, Employee, User, Policy, Department
+from models import (
+    db, Job, Applicant, Resume, Employee, User, Policy, Department,
+    ResumeIngestion, ResumeIngestionFile
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only
 import os
 import json
+import uuid
 from datetime import datetime
-from utils.ai_resume_parser import parse_resume_with_gpt
 from utils.ai_jd_generator import build_prompt, generate_structured_jd
 from utils.document_generator import generate_policy_document
-from utils.ai_ranking import score_with_gemini
+from utils.scoring_engine import score_candidates
+from utils.candidate_prefilter import shortlist
+from utils.score_store import score_resumes_for_job
+from utils.job_queries import (
+    APPLICANT_INCLUDES, APPLICANT_SORTS, JOB_INCLUDES, JOB_SORTS,
+    fetch_applicant_page, fetch_job_page, parse_include
+)
+from utils.pagination import page_size, parse_sort
+from utils.resume_ingestion import ensure_recovered, schedule_job_rescore, submit_ingestion
+from utils.resume_documents import save_upload, parse_document
 from utils.ai_questionnaire import generate_questionnaire
 # from utils.ai_helpers import generate_structured_jd, generate_policy_document
 UPLOAD_FOLDER = "uploads/resumes"
@@ -25,7 +39,10 @@ def allowed_file(filename):
 
 
 class ResumeUpload(Resource):
-    """Upload and parse resumes using AI Backend"""
+    """
+    Upload resumes for a job. Files are saved and queued for background
+    extraction, parsing and scoring; poll ResumeIngestionStatus for progress.
+    """
     
     @jwt_required()
     def post(self):
@@ -36,132 +53,83 @@ class ResumeUpload(Resource):
                 return {"error": "User not found"}, 404
 
             job_id = request.form.get('job_id')
+            job = Job.query.get(job_id) if job_id else None
+            if not job:
+                return {"error": "A valid job_id is required"}, 400
             
             # Check for duplicate application immediately
-            existing_applicant = Applicant.query.filter_by(user_id=user.user_id, job_id=job_id).first()
+            existing_applicant = Applicant.query.filter_by(user_id=user.user_id, job_id=job.job_id).first()
             if existing_applicant:
                 return {
                     "status": "error",
                     "message": "You have already applied for this position."
                 }, 409
 
-            # Fetch job details for filename
-            job_title = "job"
-            job_description = ""
-            if job_id:
-                job = Job.query.get(job_id)
-                if job:
-                    job_title = secure_filename(job.title)
-                    job_description = job.jd_text
-            
-            files = request.files.getlist("files[]")
+            job_title = secure_filename(job.title)
+            ingestion = ResumeIngestion(ingestion_id=str(uuid.uuid4()), user_id=user.user_id, job_id=job.job_id)
+            db.session.add(ingestion)
+
             results = []
-            
+            files = request.files.getlist("files[]")
             for file in files:
                 if file and allowed_file(file.filename):
-                    # Rename file: candidate-name_job-post-name_resume.ext
+                    # Display name: candidate-name_job-post-name_resume.ext
                     original_ext = file.filename.rsplit(".", 1)[1].lower()
                     safe_candidate_name = secure_filename(user.name)
                     new_filename = f"{safe_candidate_name}_{job_title}_resume.{original_ext}"
-                    filepath = os.path.join(UPLOAD_FOLDER, new_filename)
-                    file.save(filepath)
-                    
-                    # Parse with AI
-                    parsed_dict = parse_resume_with_gpt(filepath)
-                    
-                    if 'error' not in parsed_dict:
-                        try:
-                            # Extract candidate info from nested structure
-                            personal_info = parsed_dict.get('personal_info', {})
-                            
-                            # Flatten the structure for easier frontend consumption
-                            flattened_parsed_data = {
-                                'name': user.name,
-                                'email': user.email,
-                                'phone': personal_info.get('phone', ''),
-                                'location': personal_info.get('location', ''),
-                                'linkedin': personal_info.get('linkedin', ''),
-                                'github': personal_info.get('github', ''),
-                                'summary': parsed_dict.get('summary', ''),
-                                'skills': parsed_dict.get('skills', []),
-                                'experience': parsed_dict.get('experience', []),
-                                'education': parsed_dict.get('education', []),
-                                'certifications': parsed_dict.get('certifications', []),
-                                'projects': parsed_dict.get('projects', []),
-                                'raw_text': parsed_dict.get('raw_text', '')
-                            }
-
-                            # Create applicant record
-                            applicant = Applicant(
-                                user_id=user.user_id,
-                                job_id=int(job_id),
-                                status='Applied'
-                            )
-                            db.session.add(applicant)
-                            db.session.flush()
-                            
-                            # Calculate Ranking Score immediately
-                            ranking_score = 0
-                            if job_description and flattened_parsed_data.get('raw_text'):
-                                try:
-                                    scores = score_with_gemini(job_title, job_description, flattened_parsed_data.get('raw_text'))
-                                    ranking_score = scores.get('overall', 0)
-                                except Exception as e:
-                                    print(f"Ranking error: {e}")
-                            
-                            # Save score to applicant
-                            applicant.score = ranking_score
-
-                            # Save resume to database
-                            resume = Resume(
-                                applicant_id=applicant.applicant_id,
-                                file_url=filepath,
-                                parsed_text=flattened_parsed_data.get('raw_text', ''),
-                                extracted_skills=json.dumps(flattened_parsed_data.get('skills', [])),
-                                extracted_experience=json.dumps(flattened_parsed_data.get('experience', [])),
-                                contact_info=json.dumps({
-                                    'email': user.email,
-                                    'phone': flattened_parsed_data.get('phone', ''),
-                                    'location': flattened_parsed_data.get('location', '')
-                                })
-                            )
-                            db.session.add(resume)
-                            db.session.flush()
-                            resume_id = resume.resume_id
-                            
-                            db.session.commit()
-
-                            results.append({
-                                "filename": new_filename,
-                                "status": "success",
-                                "parsed_data": flattened_parsed_data,
-                                "resume_id": resume_id,
-                                "applicant_id": applicant.applicant_id,
-                                "ranking_score": ranking_score
-                            })
-                        except Exception as db_error:
-                            db.session.rollback()
-                            results.append({
-                                "filename": filename,
-                                "status": "error",
-                                "error": f"Database error: {str(db_error)}"
-                            })
-                    else:
-                        results.append({
-                            "filename": filename,
-                            "status": "error",
-                            "error": parsed_dict.get('error', 'Parsing failed')
-                        })
-            
+                    # Stored once per content hash; repeat uploads reuse the earlier parse
+                    document = save_upload(file, UPLOAD_FOLDER, original_ext)
+                    ingestion.files.append(ResumeIngestionFile(
+                        filename=new_filename,
+                        file_path=document.file_path,
+                        content_hash=document.content_hash
+                    ))
+                else:
+                    results.append({
+                        "filename": file.filename if file else None,
+                        "status": "error",
+                        "error": "Invalid file type"
+                    })
+
+            if not ingestion.files:
+                db.session.rollback()
+                return {"error": "No valid resume files uploaded", "results": results}, 400
+
+            db.session.commit()
+            submit_ingestion(current_app._get_current_object(), ingestion.ingestion_id)
+
+            results = [f.to_dict() for f in ingestion.files] + results
             return {
-                "message": f"Processed {len(results)} files",
+                "message": f"Queued {len(ingestion.files)} files for processing",
+                "ingestion_id": ingestion.ingestion_id,
+                "status_url": f"/api/recruitment/upload/{ingestion.ingestion_id}",
                 "results": results
-            }, 200
+            }, 202
             
         except Exception as e:
+            db.session.rollback()
             return {"error": f"Upload failed: {str(e)}"}, 500
 
 
+class ResumeIngestionStatus(Resource):
+    """Per-file progress of a resume upload"""
+
+    @jwt_required()
+    def get(self, ingestion_id):
+        # Files orphaned by a restart would otherwise report "processing" forever
+        ensure_recovered(current_app._get_current_object())
+        ingestion = ResumeIngestion.query.get(ingestion_id)
+        if not ingestion:
+            return {"error": "Upload not found"}, 404
+
+        # Applicants may only see their own uploads
+        user = User.query.get(get_jwt_identity())
+        if not user or (ingestion.user_id != user.user_id and user.role.lower() not in ('hr', 'admin')):
+            return {"error": "Upload not found"}, 404
+
+        return ingestion.to_dict(), 200
+
+
 class ResumeParseAdvanced(Resource):
     """Advanced resume parsing with database storage"""
     
@@ -175,13 +143,14 @@ class ResumeParseAdvanced(Resource):
                 return {"error": "Invalid file type"}, 400
             
             filename = secure_filename(file.filename)
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            file.save(filepath)
+            document = save_upload(file, UPLOAD_FOLDER, file.filename.rsplit(".", 1)[1].lower())
+            filepath = document.file_path
             
-            # Parse with AI
-            parsed_dict = parse_resume_with_gpt(filepath)
+            # Parse with AI (identical files reuse the stored parse)
+            parsed_dict = parse_document(document)
             
             if 'error' in parsed_dict:
+                db.session.commit()  # keep the stored file and any extracted text
                 return {"error": parsed_dict['error']}, 500
             
             # Save to database
@@ -212,10 +181,15 @@ class ResumeParseAdvanced(Resource):
                         applicant = Applicant(
                             user_id=user.user_id,
                             job_id=int(job_id),
-                            status='Applied'
+                            status='Applied',
+                            score=None  # Unscored; scored on the background score pool
                         )
-                        db.session.add(applicant)
-                        db.session.flush()
+                        try:
+                            with db.session.begin_nested():
+                                db.session.add(applicant)
+                        except IntegrityError:
+                            # A concurrent upload created this application first
+                            applicant = Applicant.query.filter_by(user_id=user.user_id, job_id=int(job_id)).first()
                 
                 # Save resume to database
                 resume_id = None
@@ -251,6 +225,8 @@ class ResumeParseAdvanced(Resource):
                         resume_id = resume.resume_id
                 
                 db.session.commit()
+                if applicant and applicant.score is None:
+                    schedule_job_rescore(current_app._get_current_object(), applicant.job_id)
                 
                 return {
                     "message": "Resume parsed successfully",
@@ -274,6 +250,7 @@ class ResumeParseAdvanced(Resource):
 
 
 class CandidateJobMatcher(Resource):
+    """Rank internal candidates (employees with an uploaded resume) against a job description"""
 
     def post(self):
         try:
@@ -285,66 +262,123 @@ class CandidateJobMatcher(Resource):
             if not job_description:
                 return {"error": "job_description is required"}, 400
 
-            # Fetch employees with parsed resumes
-            employees = Employee.query.filter(Employee.parsed_resume.isnot(None)).all()
-            print(f"DEBUG: Found {len(employees)} employees with parsed resumes")
+            # Cheap local pre-filter: only the top_k lexical matches go to Gemini (default PREFILTER_TOP_K)
+            top_k = data.get("top_k")
+            if top_k in (None, ""):
+                top_k = None
+            else:
+                try:
+                    if isinstance(top_k, bool) or (isinstance(top_k, float) and not top_k.is_integer()):
+                        raise ValueError(top_k)
+                    top_k = int(top_k)
+                except (TypeError, ValueError):
+                    top_k = None
+                if top_k is None or top_k < 1:
+                    return {"error": "top_k must be a positive integer"}, 400
+
+            # Employees have no resume column; use the latest resume uploaded by their user account
+            employees = _employees_with_resumes()
 
             if not employees:
-                print("DEBUG: No employees with resumes found, returning empty rankings")
                 return {
                     "message": "Candidate matching complete",
                     "total_candidates": 0,
                     "rankings": []
                 }, 200
 
-            rankings = []
-
-            for employee in employees:
-                try:
-                    print(f"DEBUG: Processing employee {employee.emp_id} - {employee.user.name if employee.user else 'Unknown'}")
-                    # Get parsed resume text
-                    resume_text = employee.parsed_resume or ""
-
-                    # Score using Gemini
-                    print(f"DEBUG: Calling score_with_gemini for employee {employee.emp_id}")
-                    scores = score_with_gemini(job_title, job_description, resume_text)
-                    print(f"DEBUG: Received scores for employee {employee.emp_id}: {scores}")
-
-                    if scores:
-                        rankings.append({
-                            "emp_id": employee.emp_id,
-                            "name": employee.user.name if employee.user else "Unknown",
-                            "email": employee.user.email if employee.user else None,
-                            "job_title": employee.job_title,
-                            "department": employee.department.name if employee.department else None,
-                            "skills": employee.get_skills(),
-                            "experience_years": employee.experience_years,
-                            **scores
-                        })
-                        print(f"DEBUG: Added employee {employee.emp_id} to rankings")
-                    else:
-                        print(f"DEBUG: No scores returned for employee {employee.emp_id}")
+            candidates = {employee.emp_id: (employee, resume_id, resume_text)
+                          for employee, resume_id, resume_text in employees}
+            shortlisted = shortlist(
+                {emp_id: {"text": resume_text, "skills": employee.skills}
+                 for emp_id, (employee, _, resume_text) in candidates.items()},
+                f"{job_title}\n{job_description}",
+                top_k
+            )
+
+            # Score the shortlist concurrently (bounded by SCORING_MAX_WORKERS).
+            # For a saved job, stored scores are reused until the JD or resume text changes.
+            job_id = data.get("job_id")
+            if job_id and Job.query.get(job_id):
+                stored = score_resumes_for_job(
+                    int(job_id),
+                    job_title,
+                    job_description,
+                    [(candidates[entry["candidate_id"]][1], candidates[entry["candidate_id"]][2])
+                     for entry in shortlisted]
+                )
+                if stored["rescored"]:
+                    db.session.commit()
+                # The score store is keyed by resume; report everything by emp_id like the unsaved-job path
+                emp_ids = {resume_id: emp_id for emp_id, (_, resume_id, _) in candidates.items()}
+                outcome = dict(
+                    stored,
+                    scores={emp_ids[resume_id]: scores for resume_id, scores in stored["scores"].items()},
+                    failed=[emp_ids[resume_id] for resume_id in stored["failed"]],
+                    timed_out=[emp_ids[resume_id] for resume_id in stored["timed_out"]]
+                )
+            else:
+                outcome = score_candidates(
+                    job_title,
+                    job_description,
+                    [(entry["candidate_id"], candidates[entry["candidate_id"]][2]) for entry in shortlisted]
+                )
 
-                except Exception as e:
-                    print(f"ERROR scoring employee {employee.emp_id}: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+            rankings = []
+            for entry in shortlisted:
+                employee, _, _ = candidates[entry["candidate_id"]]
+                scores = outcome["scores"].get(employee.emp_id)
+                if not scores:
+                    continue
+                rankings.append({
+                    "emp_id": employee.emp_id,
+                    "name": employee.user.name if employee.user else "Unknown",
+                    "email": employee.user.email if employee.user else None,
+                    "job_title": employee.job_title,
+                    "department": employee.department.name if employee.department else None,
+                    "skills": employee.get_skills(),
+                    "lexical_score": entry["lexical_score"],
+                    "matched_skills": entry["matched_skills"],
+                    **scores
+                })
 
             rankings_sorted = sorted(rankings, key=lambda x: x.get("overall", 0), reverse=True)
-            print(f"DEBUG: Returning {len(rankings_sorted)} ranked candidates")
-            print(f"DEBUG: Rankings data: {rankings_sorted[:2] if rankings_sorted else 'empty'}")
 
             return {
                 "message": "Candidate matching complete",
                 "job_title": job_title,
                 "total_candidates": len(rankings_sorted),
-                "rankings": rankings_sorted
+                "rankings": rankings_sorted,
+                "prefilter": {"indexed": len(candidates), "shortlisted": len(shortlisted)},
+                "partial": outcome["partial"],
+                "failed_candidates": outcome["failed"],
+                "timed_out_candidates": outcome["timed_out"]
             }, 200
 
         except Exception as e:
             return {"error": "Unexpected server error", "details": str(e)}, 500
 
 
+def _employees_with_resumes():
+    """
+    Return [(employee, resume_id, resume_text)] for employees whose user account uploaded a resume.
+    Loads everything in one query so scoring threads never touch the session.
+    """
+    rows = db.session.query(Employee, Resume.resume_id, Resume.parsed_text)\
+        .join(Applicant, Applicant.user_id == Employee.user_id)\
+        .join(Resume, Resume.applicant_id == Applicant.applicant_id)\
+        .options(joinedload(Employee.user), joinedload(Employee.department))\
+        .filter(Resume.parsed_text.isnot(None))\
+        .order_by(Resume.uploaded_at.desc())\
+        .all()
+
+    # Keep only the most recent resume per employee
+    latest = {}
+    for employee, resume_id, parsed_text in rows:
+        if employee.emp_id not in latest and parsed_text.strip():
+            latest[employee.emp_id] = (employee, resume_id, parsed_text)
+    return list(latest.values())
+
+
 
 
 class InterviewQuestionGenerator(Resource):
@@ -832,28 +866,33 @@ class WritingTones(Resource):
 class JobListResource(Resource):
     @jwt_required(optional=True)
     def get(self):
+        """
+        Job board. Optional query params:
+            status, dept_id, location - exact-match filters
+            sort    - created_at or -created_at (default: newest first)
+            limit   - page size (keyset pagination, default 50)
+            cursor  - next_cursor from the previous page
+            include - comma-separated heavy fields: jd_text, requirements, input_data
+        """
         try:
             current_user_id = get_jwt_identity()
-            applied_job_ids = set()
-            
-            if current_user_id:
-                # Get list of job_ids this user has applied for
-                applications = Applicant.query.filter_by(user_id=current_user_id).all()
-                applied_job_ids = {app.job_id for app in applications}
-                application_status_map = {app.job_id: app.status for app in applications}
-
-            jobs = Job.query.order_by(Job.created_at.desc()).all()
-            
-            job_list = []
-            for job in jobs:
-                job_dict = job.to_dict()
-                job_dict['has_applied'] = job.job_id in applied_job_ids
-                job_dict['application_status'] = application_status_map.get(job.job_id) if current_user_id else None
-                job_list.append(job_dict)
-
-            return {
-                "jobs": job_list
-            }, 200
+            try:
+                sort, descending = parse_sort(request.args.get('sort'), JOB_SORTS, '-created_at')
+                page = fetch_job_page(
+                    sort=sort,
+                    descending=descending,
+                    cursor=request.args.get('cursor'),
+                    limit=page_size(request.args.get('limit', type=int)),
+                    status=request.args.get('status'),
+                    dept_id=request.args.get('dept_id', type=int),
+                    location=request.args.get('location'),
+                    include=parse_include(request.args.get('include'), JOB_INCLUDES),
+                    user_id=int(current_user_id) if current_user_id else None
+                )
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            return page, 200
         except Exception as e:
             return {"error": str(e)}, 500
 
@@ -962,51 +1001,48 @@ class PostJob(Resource):
 
 class JobApplicants(Resource):
     def get(self, job_id):
+        """
+        Applicants of a job. Optional query params:
+            status               - exact-match applicant status
+            min_score, max_score - inclusive score range
+            sort    - score, -score, applied_date or -applied_date (default: best score first)
+            limit   - page size (keyset pagination, default 50)
+            cursor  - next_cursor from the previous page
+            include - "summary" adds the start of each resume text
+        """
         try:
-            job = Job.query.get(job_id)
+            job = Job.query.options(load_only(Job.job_id, Job.title, Job.jd_text)).get(job_id)
             if not job:
                 return {"error": "Job not found"}, 404
-            
-            # Explicitly join to ensure we get user details
-            # Use outer join for resume in case it's missing (though it shouldn't be)
-            applicants = db.session.query(Applicant, User, Resume)\
-                .join(User, Applicant.user_id == User.user_id)\
-                .outerjoin(Resume, Applicant.applicant_id == Resume.applicant_id)\
-                .filter(Applicant.job_id == job_id)\
-                .all()
-            
-            results = []
-            
-            for applicant, user, resume in applicants:
-                score = applicant.score if applicant.score is not None else 0
-                
-                # Fallback: if score is 0 and resume exists, try to calculate it
-                if score == 0 and resume and resume.parsed_text:
-                     try:
-                        scores = score_with_gemini(job.title, job.jd_text, resume.parsed_text)
-                        score = scores.get('overall', 0)
-                        applicant.score = score
-                        db.session.commit()
-                     except:
-                        pass
-
-                results.append({
-                    "applicant_id": applicant.applicant_id,
-                    "name": user.name,
-                    "email": user.email,
-                    "status": applicant.status,
-                    "score": score,
-                    "resume_url": f"/api/{resume.file_url}" if resume and resume.file_url else None,
-                    "summary": (resume.parsed_text[:200] + "...") if resume and resume.parsed_text else "",
-                    "q_and_a_scores": json.loads(applicant.q_and_a_scores) if applicant.q_and_a_scores else []
-                })
-            
-            # Sort by score descending
-            results.sort(key=lambda x: x['score'], reverse=True)
-            
-            return {"applicants": results}, 200
+
+            try:
+                sort, descending = parse_sort(request.args.get('sort'), APPLICANT_SORTS, '-score')
+                include = parse_include(request.args.get('include'), APPLICANT_INCLUDES)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            # Listing is a pure read: unscored applicants (NULL score) list with 0 until
+            # the ingestion pipeline's background retries score them
+            try:
+                page = fetch_applicant_page(
+                    job_id,
+                    sort=sort,
+                    descending=descending,
+                    cursor=request.args.get('cursor'),
+                    limit=page_size(request.args.get('limit', type=int)),
+                    status=request.args.get('status'),
+                    min_score=request.args.get('min_score', type=float),
+                    max_score=request.args.get('max_score', type=float),
+                    include=include
+                )
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            return page, 200
         except Exception as e:
             return {"error": str(e)}, 500
+
+
 class SaveApplicantScores(Resource):
     """Save manual interview scores for an applicant"""
     @jwt_required()
@@ -1,38 +1,26 @@
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
-from pathlib import Path
 from utils.swagger_parser import get_api_capabilities
 from utils.data_fetcher import get_employee_context
+from utils.policy_index import search_policies
+from utils.llm_client import generate_text, llm_available, stream_text
+from utils.chat_memory import conversation_window, format_window
 
-load_dotenv(Path(__file__).parent.parent / ".env", override=True)
 
-# Setup Gemini with validation
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables")
+UNAVAILABLE_REPLY = "I apologize, but I'm currently unable to process requests. Please contact HR directly for assistance."
+EMPTY_REPLY = "I apologize, but I couldn't generate a response. Please rephrase your question or contact HR directly."
+ERROR_REPLY = "I apologize, but I'm having trouble processing your request. Please try again later or contact HR directly for assistance."
 
-genai.configure(api_key=api_key)
-
-
-def get_hr_response(question: str, user_id: int = None) -> str:
-    """
-    Answer HR policy questions using Google Gemini 2.5 Flash with RAG and DB Context.
-    
-    Args:
-        question: Employee's question
-        user_id: ID of the user asking the question (optional, for context)
-    
-    Returns:
-        AI-generated answer
-    """
-    # Check API key
-    if not api_key:
-        return "I apologize, but I'm currently unable to process requests. Please contact HR directly for assistance."
 
+def build_hr_prompt(question: str, user_id: int = None) -> str:
+    """Chatbot prompt for a question, with the user's profile, leave stats, the relevant policy excerpts
+    and the bounded conversation history (utils.chat_memory)"""
     # 1. Fetch Context
-    context_data = get_employee_context(user_id) if user_id else {"user_info": {}, "leave_stats": {}, "policies": []}
-    api_capabilities = get_api_capabilities()
+    if user_id:
+        context_data = get_employee_context(user_id, question)
+        history_str = format_window(conversation_window(user_id))
+    else:
+        context_data = {"user_info": {}, "leave_stats": {}, "policies": search_policies(question)}
+        history_str = ""
+    api_capabilities = get_api_capabilities(question=question)
     
     # 2. Construct System Prompt
     user_info = context_data.get("user_info", {})
@@ -53,9 +41,12 @@ def get_hr_response(question: str, user_id: int = None) -> str:
         leave_context_str += f"- Remaining Balance: {leave_stats.get('remaining_leaves')} days (out of {leave_stats.get('standard_allowance')})\n"
         leave_context_str += f"- Pending Requests: {leave_stats.get('pending_requests')}\n"
     
-    policy_context_str = "Company HR Policies:\n"
+    # Only the policy excerpts retrieved for this question (utils.policy_index)
+    policy_context_str = "Company HR Policies (relevant excerpts):\n"
     for policy in policies:
         policy_context_str += f"\n--- POLICY: {policy.get('title')} ---\n{policy.get('content')}\n"
+    if not policies:
+        policy_context_str += "- No policy text matched this question.\n"
         
     system_prompt = f"""You are an intelligent and helpful HR Assistant for our company.
 Your goal is to answer employee questions accurately using ONLY the provided context.
@@ -72,33 +63,81 @@ Your goal is to answer employee questions accurately using ONLY the provided con
 
 === CONTEXT END ===
 
+{history_str}
 **STRICT RULES:**
 1.  **Scope Enforcement**: Answer ONLY based on the context provided above (User Profile, Leave Stats, Policies, and System Capabilities).
 2.  **Out of Scope**: If the user asks about something not in the context (e.g., general world knowledge, celebrity news, code generation unrelated to this system), politely refuse: "I can only answer questions related to company policies, your profile, and HR data."
 3.  **Data Privacy**: You have access to the specific user's data shown above. Do NOT hallucinate data for other users.
 4.  **System Capabilities**: If the user asks how to do something (e.g., "How do I apply for leave?"), refer to the "System Capabilities" list to confirm if the feature exists and guide them (e.g., "You can submit a leave request via the Leave Management section.").
-5.  **Tone**: Professional, empathetic, and concise.
+5.  **Follow-ups**: Use the conversation so far (if shown) to resolve references like "that", "it" or "the second one", but take facts only from the context above.
+6.  **Tone**: Professional, empathetic, and concise.
 
 Employee Question: {question}
 
 Answer:"""
+    return system_prompt
 
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(system_prompt)
 
-        if not response or not hasattr(response, 'text'):
-            print("⚠️ HR Chatbot: No response from API")
-            return "I apologize, but I'm having trouble processing your request. Please try again or contact HR directly."
+def get_hr_response(question: str, user_id: int = None) -> str:
+    """
+    Answer HR policy questions using Google Gemini 2.5 Flash with RAG and DB Context.
+    
+    Args:
+        question: Employee's question
+        user_id: ID of the user asking the question (optional, for context)
+    
+    Returns:
+        AI-generated answer
+    """
+    # Check API key
+    if not llm_available():
+        return UNAVAILABLE_REPLY
+
+    system_prompt = build_hr_prompt(question, user_id)
 
-        response_text = response.text.strip()
+    try:
+        response_text = generate_text(system_prompt, call_site="hr_chatbot").strip()
 
         if not response_text:
             print("⚠️ HR Chatbot: Empty response")
-            return "I apologize, but I couldn't generate a response. Please rephrase your question or contact HR directly."
+            return EMPTY_REPLY
 
         return response_text
 
     except Exception as e:
         print(f"⚠️ HR Chatbot error: {e}")
-        return "I apologize, but I'm having trouble processing your request. Please try again later or contact HR directly for assistance."
+        return ERROR_REPLY
+
+
+def stream_hr_response(question: str, user_id: int = None):
+    """
+    Streaming get_hr_response. The context is fetched and the prompt built before
+    this returns; the returned iterator then yields the answer in chunks as Gemini
+    produces them, falling back to the same apology texts when there is no answer.
+    """
+    if not llm_available():
+        return iter([UNAVAILABLE_REPLY])
+
+    system_prompt = build_hr_prompt(question, user_id)
+
+    def chunks():
+        started = False
+        try:
+            for chunk in stream_text(system_prompt, call_site="hr_chatbot"):
+                if not started:
+                    # Match get_hr_response, which strips the answer
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                    started = True
+                yield chunk
+        except Exception as e:
+            print(f"⚠️ HR Chatbot error: {e}")
+            if not started:
+                yield ERROR_REPLY
+            return
+        if not started:
+            print("⚠️ HR Chatbot: Empty response")
+            yield EMPTY_REPLY
+
+    return chunks()
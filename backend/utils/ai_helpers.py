@@ -1,18 +1,15 @@
 # ai_helpers.py
 import json
 import re
-import google.generativeai as genai
-from dotenv import load_dotenv
-import os
+from utils.llm_client import generate_text, reject_response
+from utils.llm_telemetry import record_parse_failure
 
-# Load API key
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
-
-def _extract_json_from_text(text: str):
+def _extract_json_from_text(text: str, call_site: str = None, prompt: str = None):
     """
     Extract JSON from messy LLM output.
+    When call_site is given, lenient recoveries and failures are counted in LLM telemetry;
+    with the prompt too, an unparseable response is also dropped from the LLM cache.
     """
 
     # 1. Remove backticks (```json ... ``` format)
@@ -29,7 +26,10 @@ def _extract_json_from_text(text: str):
     if match:
         json_str = match.group(0)
         try:
-            return json.loads(json_str)
+            parsed = json.loads(json_str)
+            if call_site:
+                record_parse_failure(call_site, "fallback")
+            return parsed
         except:
             pass
 
@@ -38,8 +38,15 @@ def _extract_json_from_text(text: str):
         fixed = text.replace("\n", "")
         fixed = re.sub(r",\s*}", "}", fixed)  # remove trailing comma before }
         fixed = re.sub(r",\s*]", "]", fixed)  # remove trailing comma before ]
-        return json.loads(fixed)
+        parsed = json.loads(fixed)
+        if call_site:
+            record_parse_failure(call_site, "fallback")
+        return parsed
     except:
+        if call_site and prompt:
+            reject_response(prompt, call_site)
+        elif call_site:
+            record_parse_failure(call_site)
         return None
 
 
@@ -75,13 +82,10 @@ RAW INPUT:
 """
 
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-
-        raw_text = response.text
+        raw_text = generate_text(prompt, call_site="job_description")
 
         # Extract and fix JSON
-        parsed = _extract_json_from_text(raw_text)
+        parsed = _extract_json_from_text(raw_text, call_site="job_description", prompt=prompt)
 
         if parsed is None:
             return {
@@ -113,17 +117,16 @@ Return ONLY valid JSON with this structure:
 """
 
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
+        response_text = generate_text(prompt, call_site="policy_document")
         
         # Reuse the JSON extractor
-        parsed = _extract_json_from_text(response.text)
+        parsed = _extract_json_from_text(response_text, call_site="policy_document", prompt=prompt)
         
         if parsed is None:
              # Fallback if JSON parsing fails
             return {
                 "title": "Generated Policy",
-                "content": response.text
+                "content": response_text
             }
             
         return parsed
@@ -1,15 +1,8 @@
-import os
 import json
 from datetime import datetime
 from pathlib import Path
 from flask import session 
-from dotenv import load_dotenv
-import google.generativeai as genai
-
-# ---------------------- ENV ---------------------- #
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
+from utils.llm_client import generate_text, reject_response
 
 # ---------------------- HELPER ---------------------- #
 def sanitize_dict(obj):
@@ -219,27 +212,15 @@ def generate_structured_jd(user_data: dict) -> dict:  # ← Changed from str to
     try:
         prompt = build_prompt(user_data)
         
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        gemini_response = model.generate_content(prompt)
-        
-        # CRITICAL: Extract text immediately and discard response object
+        # The LLM client only ever hands back plain text, never the response object
         try:
-            response_text = str(gemini_response.text).strip()
-        except AttributeError:
-            return {
-                "error": "Gemini response has no text attribute",
-                "structured_text": str(user_data)
-            }
+            response_text = generate_text(prompt, call_site="job_description").strip()
         except Exception as text_error:
             return {
                 "error": f"Failed to extract text: {str(text_error)}",
                 "structured_text": str(user_data)
             }
         
-        # At this point, gemini_response should be garbage collected
-        # We only work with response_text (string) from here
-        del gemini_response  # Explicitly delete to ensure it's not referenced
-        
         # Remove markdown code blocks if present
         if response_text.startswith('```json'):
             response_text = response_text[7:]
@@ -277,6 +258,7 @@ def generate_structured_jd(user_data: dict) -> dict:  # ← Changed from str to
             return clean_output
             
         except json.JSONDecodeError as json_error:
+            reject_response(prompt, "job_description")
             return {
                 "error": f"Failed to parse JSON: {str(json_error)}",
                 "structured_text": str(user_data),
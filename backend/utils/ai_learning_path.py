@@ -1,20 +1,8 @@
 """
 Learning Path Generator using Google Gemini 2.5 Flash
 """
-import os
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
-from pathlib import Path
-
-load_dotenv(Path(__file__).parent.parent / ".env", override=True)
-
-# Setup Gemini with validation
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables")
-
-genai.configure(api_key=api_key)
+from utils.llm_client import generate_text, llm_available, reject_response
 
 
 def generate_learning_path(current_role: str, career_goal: str, employee_id: int = None) -> dict:
@@ -79,7 +67,7 @@ def generate_learning_path(current_role: str, career_goal: str, employee_id: int
         }
     }
 
-    if not api_key:
+    if not llm_available():
         print("⚠️ Learning path generation: No API key")
         return fallback_path
 
@@ -113,14 +101,7 @@ Return as JSON:
 """
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        
-        if not response or not hasattr(response, 'text'):
-            print("⚠️ Learning path: No response from API")
-            return fallback_path
-
-        response_text = response.text.strip()
+        response_text = generate_text(prompt, call_site="learning_path").strip()
 
         if not response_text:
             print("⚠️ Learning path: Empty response")
@@ -143,6 +124,7 @@ Return as JSON:
 
     except json.JSONDecodeError as e:
         print(f"⚠️ Learning path JSON error: {e}")
+        reject_response(prompt, "learning_path")
         return fallback_path
     except Exception as e:
         print(f"⚠️ Learning path error: {e}")
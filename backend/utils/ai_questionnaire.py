@@ -1,19 +1,6 @@
-import os
 import json
-from dotenv import load_dotenv
-from pathlib import Path
-import google.generativeai as genai
+from utils.llm_client import generate_text, reject_response
 
-# Load .env from backend root directory
-env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(env_path, override=True)
-
-# Configure Gemini
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("WARNING: GEMINI_API_KEY not found in .env file")
-else:
-    genai.configure(api_key=api_key)
 
 def generate_questionnaire(resume_json, jd_json):
     """
@@ -85,13 +72,8 @@ RULES:
 Return ONLY the JSON object, no other text."""
 
     try:
-        # Use Gemini 2.5 Flash (same as other utilities)
-        model = genai.GenerativeModel("gemini-2.5-flash")
-
-        # Generate content
-        response = model.generate_content(prompt)
-
-        raw_text = response.text.strip()
+        # Use Gemini 2.5 Flash (same as other utilities), via the shared LLM cache
+        raw_text = generate_text(prompt, call_site="interview_questions").strip()
 
         # Remove markdown fences and extra text
         cleaned = raw_text.replace("```json", "").replace("```", "").strip()
@@ -101,6 +83,7 @@ Return ONLY the JSON object, no other text."""
         end = cleaned.rfind("}")
 
         if start == -1 or end == -1:
+            reject_response(prompt, "interview_questions", "no_json")
             raise ValueError("No JSON object found in response")
 
         clean_json = cleaned[start:end+1]
@@ -119,6 +102,7 @@ Return ONLY the JSON object, no other text."""
         return parsed_json
 
     except json.JSONDecodeError as e:
+        reject_response(prompt, "interview_questions")
         return {
             "error": "Failed to parse JSON from Gemini response",
             "details": str(e),
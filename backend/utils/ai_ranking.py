@@ -1,21 +1,10 @@
 import json
-import os
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, Optional
-
-from dotenv import load_dotenv
-import google.generativeai as genai
+from typing import Any, Dict, List, Optional, Tuple
 
 from models import db
 from models import Resume
-
-
-# --------------------------------------------------------------
-# Load ENV + Configure Gemini
-# --------------------------------------------------------------
-load_dotenv(Path(__file__).parent / ".env", override=True)
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from utils.llm_client import generate_text, reject_response
 
 
 # --------------------------------------------------------------
@@ -33,12 +22,32 @@ def _to_score(v: Any) -> Optional[float]:
         return None
 
 
+SCORE_METRICS = ("technical_skills", "experience_relevance", "impact", "communication", "education")
+
+
+def _scores_from(data: Dict[str, Any]) -> Dict[str, float]:
+    """Clamp the metric values of one Gemini score object; overall defaults to their mean"""
+    scores = {metric: _to_score(data.get(metric)) for metric in SCORE_METRICS}
+    overall = _to_score(data.get("overall"))
+
+    # If overall missing → compute average
+    if overall is None:
+        vals = [v for v in scores.values() if v is not None]
+        overall = round(sum(vals) / len(vals), 2) if vals else 0.0
+
+    scores["overall"] = overall
+    return scores
+
+
 # --------------------------------------------------------------
 # Gemini AI Scoring
 # --------------------------------------------------------------
-def score_with_gemini(job_title: str, jd_text: str, resume_text: str) -> Optional[Dict[str, float]]:
+def score_with_gemini(job_title: str, jd_text: str, resume_text: str,
+                      raise_on_error: bool = False) -> Optional[Dict[str, float]]:
     """
     Sends resume + job description to Gemini and returns structured scoring.
+    With raise_on_error=True, API errors (e.g. rate limits) propagate to the caller
+    instead of being swallowed, so the batch engine can back off and retry.
     """
 
     prompt = f"""
@@ -72,15 +81,7 @@ Return STRICT JSON ONLY:
 """
 
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-
-        # Check if response exists and has text
-        if not response or not hasattr(response, 'text'):
-            print("⚠️ Gemini scoring error: No response from API")
-            return None
-
-        raw = response.text.strip()
+        raw = generate_text(prompt, call_site="resume_scoring").strip()
 
         # Check if response is empty
         if not raw:
@@ -93,77 +94,181 @@ Return STRICT JSON ONLY:
 
         if start == -1 or end == -1:
             print(f"⚠️ Gemini scoring error: No JSON found in response. Raw response: {raw[:200]}")
+            reject_response(prompt, "resume_scoring", "no_json")
             return None
 
         json_str = raw[start:end + 1]
         data = json.loads(json_str)
 
-        tech = _to_score(data.get("technical_skills"))
-        exp = _to_score(data.get("experience_relevance"))
-        imp = _to_score(data.get("impact"))
-        comm = _to_score(data.get("communication"))
-        edu = _to_score(data.get("education"))
-        overall = _to_score(data.get("overall"))
-
-        # If overall missing → compute average
-        if overall is None:
-            vals = [v for v in [tech, exp, imp, comm, edu] if v is not None]
-            overall = round(sum(vals) / len(vals), 2) if vals else 0.0
-
-        return {
-            "technical_skills": tech,
-            "experience_relevance": exp,
-            "impact": imp,
-            "communication": comm,
-            "education": edu,
-            "overall": overall
-        }
+        return _scores_from(data)
 
     except json.JSONDecodeError as e:
         print(f"⚠️ Gemini scoring JSON error: {e}")
+        reject_response(prompt, "resume_scoring")
         return None
     except Exception as e:
+        if raise_on_error:
+            raise
         print(f"⚠️ Gemini scoring error: {e}")
         return None
 
 
+# --------------------------------------------------------------
+# Gemini AI Scoring: several resumes against one JD per call
+# --------------------------------------------------------------
+def build_batch_prompt(job_title: str, jd_text: str, resumes: List[Tuple[str, str]]) -> str:
+    """Scoring prompt carrying the JD once and each resume under its candidate id"""
+    blocks = "\n\n".join(
+        f'<<<CANDIDATE id="{candidate_id}">>>\n{resume_text}\n<<<END CANDIDATE>>>'
+        for candidate_id, resume_text in resumes
+    )
+    return f"""
+You are an expert technical recruiter for the role "{job_title}".
+
+JOB DESCRIPTION:
+\"\"\"{jd_text}\"\"\"
+
+
+CANDIDATES ({len(resumes)}):
+{blocks}
+
+
+Evaluate EACH candidate's resume independently on a strict scale of **0–100** for these metrics:
+
+1. technical_skills
+2. experience_relevance
+3. impact
+4. communication
+5. education
+
+Return STRICT JSON ONLY: an array with exactly one object per candidate, using the candidate id given above:
+[
+  {{
+    "id": "<candidate id>",
+    "technical_skills": <0-100>,
+    "experience_relevance": <0-100>,
+    "impact": <0-100>,
+    "communication": <0-100>,
+    "education": <0-100>,
+    "overall": <0-100>
+  }}
+]
+"""
+
+
+def score_batch_with_gemini(job_title: str, jd_text: str, resumes: List[Tuple[str, str]],
+                            raise_on_error: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Scores several (candidate_id, resume_text) pairs in one Gemini call.
+
+    Only items that come back valid are returned: a known, not repeated id and all
+    five metrics numeric. Missing or malformed candidates are simply absent, so the
+    caller can retry them in smaller batches.
+    """
+    wanted = {str(candidate_id) for candidate_id, _ in resumes}
+    prompt = build_batch_prompt(job_title, jd_text, [(str(cid), text) for cid, text in resumes])
+
+    try:
+        raw = generate_text(prompt, call_site="resume_scoring_batch").strip()
+        start = raw.find("[")
+        end = raw.rfind("]")
+        if start == -1 or end == -1:
+            print(f"⚠️ Gemini batch scoring error: No JSON array in response. Raw response: {raw[:200]}")
+            reject_response(prompt, "resume_scoring_batch", "no_json")
+            return {}
+        items = json.loads(raw[start:end + 1])
+    except json.JSONDecodeError as e:
+        print(f"⚠️ Gemini batch scoring JSON error: {e}")
+        reject_response(prompt, "resume_scoring_batch")
+        return {}
+    except Exception as e:
+        if raise_on_error:
+            raise
+        print(f"⚠️ Gemini batch scoring error: {e}")
+        return {}
+
+    results, seen = {}, set()
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        candidate_id = str(item.get("id", ""))
+        if candidate_id not in wanted or candidate_id in seen:
+            # Unknown or repeated ids make the whole candidate untrustworthy
+            results.pop(candidate_id, None)
+            seen.add(candidate_id)
+            continue
+        seen.add(candidate_id)
+        scores = _scores_from(item)
+        if any(scores[metric] is None for metric in SCORE_METRICS):
+            continue
+        results[candidate_id] = scores
+    if wanted and not results:
+        # Parsed, but not one usable candidate: do not replay this answer
+        reject_response(prompt, "resume_scoring_batch", "no_valid_items")
+    return results
+
+
 # --------------------------------------------------------------
 # MAIN: Score ALL resumes for a dynamic job description
 # --------------------------------------------------------------
-def score_all_resumes(job_title: str, job_description: str):
+def score_all_resumes(job_title: str, job_description: str, max_workers: Optional[int] = None,
+                      top_k: Optional[int] = None, job_id: Optional[int] = None):
     """
     Called by your CandidateJobMatcher controller.
     Returns a list of scored + sorted candidates.
-    """
-
-    resumes = Resume.query.all()
 
-    if not resumes:
+    A local BM25 / skill-overlap pre-filter picks the top_k resumes (default
+    PREFILTER_TOP_K); only those are scored by Gemini, concurrently via
+    utils.scoring_engine. Each result carries both the lexical and the Gemini scores.
+    With a job_id, scores are read from / written to the persistent score store.
+    """
+    # Imported here: scoring_engine imports this module
+    from utils.scoring_engine import score_candidates
+    from utils.candidate_prefilter import shortlist
+    from models import Applicant, User
+
+    rows = db.session.query(Resume.resume_id, Resume.applicant_id, Resume.parsed_text,
+                            Resume.extracted_skills, User.name)\
+        .outerjoin(Applicant, Resume.applicant_id == Applicant.applicant_id)\
+        .outerjoin(User, Applicant.user_id == User.user_id)\
+        .all()
+
+    if not rows:
         return []
 
-    results = []
+    rows_by_id = {row.resume_id: row for row in rows}
+    shortlisted = shortlist(
+        {row.resume_id: {"text": row.parsed_text, "skills": row.extracted_skills} for row in rows},
+        f"{job_title}\n{job_description}",
+        top_k
+    )
+
+    to_score = [(entry["candidate_id"], rows_by_id[entry["candidate_id"]].parsed_text or "") for entry in shortlisted]
+    if job_id:
+        from utils.score_store import score_resumes_for_job
+        outcome = score_resumes_for_job(job_id, job_title, job_description, to_score, max_workers=max_workers)
+        if outcome["rescored"]:
+            db.session.commit()
+    else:
+        outcome = score_candidates(job_title, job_description, to_score, max_workers=max_workers)
+
+    if outcome["partial"]:
+        print(f"⚠️ Resume scoring incomplete: {len(outcome['failed'])} failed, "
+              f"{len(outcome['timed_out'])} timed out")
 
-    for resume in resumes:
-        try:
-            # Actual resume text field according to your model
-            resume_text = resume.parsed_text or ""
-
-            scores = score_with_gemini(job_title, job_description, resume_text)
-
-            if scores:
-                results.append({
-                    "resume_id": resume.resume_id,
-                    "applicant_id": resume.applicant_id,
-                    "resume_name": (
-                        resume.applicant.user.name
-                        if resume.applicant and resume.applicant.user
-                        else None
-                    ),
-                    **scores
-                })
-
-        except Exception as e:
-            print("Error scoring a resume:", e)
+    results = []
+    for entry in shortlisted:
+        row = rows_by_id[entry["candidate_id"]]
+        scores = outcome["scores"].get(row.resume_id)
+        if scores:
+            results.append({
+                "resume_id": row.resume_id,
+                "applicant_id": row.applicant_id,
+                "resume_name": row.name,
+                "lexical_score": entry["lexical_score"],
+                "matched_skills": entry["matched_skills"],
+                **scores
+            })
 
     # Sort by overall descending
     results_sorted = sorted(results, key=lambda x: x["overall"], reverse=True)
@@ -1,22 +1,8 @@
-import os
-from dotenv import load_dotenv
-from pathlib import Path
-
-# Load environment variables
-load_dotenv(override=True)
-
 import json
 import re
-from PyPDF2 import PdfReader
-import google.generativeai as genai
-from utils.resume_schema import ResumeSchema
-
-# Setup Gemini with validation
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables")
+from utils.pdf_extraction import extract_pdf
+from utils.llm_client import generate_text, llm_available, reject_response
 
-genai.configure(api_key=api_key)
 
 def clean_json_str(text: str) -> str:
     text = text.strip()
@@ -31,23 +17,43 @@ def clean_json_str(text: str) -> str:
     return text
 
 
+def extract_resume_text(file_path: str) -> str:
+    """
+    Extracts the plain text of a resume PDF.
+    Raises ValueError with a user-facing message when nothing can be read.
+    """
+    try:
+        text = extract_pdf(file_path)["text"]
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Failed to read PDF: {str(e)}")
+
+    if not text.strip():
+        raise ValueError("Empty PDF or no text extracted")
+    return text
+
+
 def parse_resume_with_gpt(file_path: str):
     """Extracts resume text and parses structured data using Google Gemini 2.5 Flash."""
 
     # Check API key
-    if not api_key:
+    if not llm_available():
         return {"error": "GEMINI_API_KEY not configured", "raw_text": ""}
 
-    # Extract text
     try:
-        with open(file_path, "rb") as f:
-            reader = PdfReader(f)
-            text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
-    except Exception as e:
-        return {"error": f"Failed to read PDF: {str(e)}", "raw_text": ""}
+        text = extract_resume_text(file_path)
+    except ValueError as e:
+        return {"error": str(e), "raw_text": ""}
 
-    if not text.strip():
-        return {"error": "Empty PDF or no text extracted", "raw_text": ""}
+    return parse_resume_text(text)
+
+
+def parse_resume_text(text: str):
+    """Parses already-extracted resume text into structured data using Gemini."""
+
+    if not llm_available():
+        return {"error": "GEMINI_API_KEY not configured", "raw_text": ""}
 
     # Create prompt for Gemini
     prompt = f"""You are an AI resume parser. Extract detailed structured information from the given resume text and return it strictly as JSON.
@@ -96,16 +102,8 @@ Return a JSON object with the following structure:
 Return ONLY the JSON object, no additional text."""
 
     try:
-        # Run Gemini model
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-
-        # Validate response
-        if not response or not hasattr(response, 'text'):
-            print("⚠️ Gemini API returned no response")
-            return {"error": "No response from Gemini API", "raw_text": text[:500]}
-
-        raw_output = response.text.strip()
+        # Run Gemini model (identical resume text is served from the LLM cache)
+        raw_output = generate_text(prompt, call_site="resume_parsing").strip()
 
         if not raw_output:
             print("⚠️ Gemini API returned empty response")
@@ -120,6 +118,7 @@ Return ONLY the JSON object, no additional text."""
             return parsed_data
         except json.JSONDecodeError as e:
             print(f"⚠️ JSON parse failed: {e}")
+            reject_response(prompt, "resume_parsing")
             print(f"Raw output (first 500 chars): {raw_output[:500]}")
             return {"error": f"JSON parsing failed: {str(e)}", "raw_text": text[:500]}
 
@@ -1,20 +1,8 @@
 """
 Sentiment Analysis using Google Gemini 2.5 Flash
 """
-import os
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
-from pathlib import Path
-
-load_dotenv(Path(__file__).parent.parent / ".env", override=True)
-
-# Setup Gemini with validation
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables")
-
-genai.configure(api_key=api_key)
+from utils.llm_client import generate_text, llm_available, reject_response
 
 
 def analyze_sentiment(feedback_list: list) -> dict:
@@ -36,7 +24,7 @@ def analyze_sentiment(feedback_list: list) -> dict:
     }
 
     # Check API key
-    if not api_key:
+    if not llm_available():
         print("⚠️ Sentiment analysis skipped: No API key")
         return default_response
 
@@ -65,15 +53,7 @@ Return as JSON with this structure:
 """
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        
-        # Validate response
-        if not response or not hasattr(response, 'text'):
-            print("⚠️ Sentiment analysis: No response from API")
-            return default_response
-
-        response_text = response.text.strip()
+        response_text = generate_text(prompt, call_site="sentiment_analysis").strip()
 
         if not response_text:
             print("⚠️ Sentiment analysis: Empty response")
@@ -96,6 +76,7 @@ Return as JSON with this structure:
 
     except json.JSONDecodeError as e:
         print(f"⚠️ Sentiment analysis JSON error: {e}")
+        reject_response(prompt, "sentiment_analysis")
         return default_response
     except Exception as e:
         print(f"⚠️ Sentiment analysis error: {e}")
@@ -1,14 +1,8 @@
 """
 Skill Recommendation System using Google Gemini 2.5 Flash
 """
-import os
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
-from pathlib import Path
-
-load_dotenv(Path(__file__).parent.parent / ".env", override=True)
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from utils.llm_client import generate_text, reject_response
 
 
 def recommend_skills(current_role: str, career_goal: str, department: str = "General") -> list:
@@ -40,18 +34,19 @@ Example format:
 """
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        
         # Clean and parse JSON response
-        response_text = response.text.strip()
+        response_text = generate_text(prompt, call_site="skill_recommendations").strip()
         if response_text.startswith('```json'):
             response_text = response_text[7:-3]
         elif response_text.startswith('```'):
             response_text = response_text[3:-3]
         response_text = response_text.strip()
         
-        result = json.loads(response_text)
+        try:
+            result = json.loads(response_text)
+        except json.JSONDecodeError:
+            reject_response(prompt, "skill_recommendations")
+            raise
         return result.get('skills', [])
     except Exception as e:
         return [
@@ -82,18 +77,19 @@ Example:
 """
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        
         # Clean and parse JSON response
-        response_text = response.text.strip()
+        response_text = generate_text(prompt, call_site="trending_skills").strip()
         if response_text.startswith('```json'):
             response_text = response_text[7:-3]
         elif response_text.startswith('```'):
             response_text = response_text[3:-3]
         response_text = response_text.strip()
         
-        result = json.loads(response_text)
+        try:
+            result = json.loads(response_text)
+        except json.JSONDecodeError:
+            reject_response(prompt, "trending_skills")
+            raise
         return result.get('skills', [])
     except Exception as e:
         return [
@@ -1,20 +1,8 @@
 """
 Wellness Tips Generator using Google Gemini 2.5 Flash
 """
-import os
 import json
-import google.generativeai as genai
-from dotenv import load_dotenv
-from pathlib import Path
-
-load_dotenv(Path(__file__).parent.parent / ".env", override=True)
-
-# Setup Gemini with validation
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables")
-
-genai.configure(api_key=api_key)
+from utils.llm_client import generate_text, llm_available, reject_response
 
 
 def generate_wellness_tips(category: str = "general") -> list:
@@ -68,7 +56,7 @@ def generate_wellness_tips(category: str = "general") -> list:
     }
 
     # Return fallback if no API key or invalid category
-    if not api_key or category not in fallback_tips:
+    if not llm_available() or category not in fallback_tips:
         return fallback_tips.get(category, fallback_tips["general"])
 
     prompt = f"""Generate a specific, actionable wellness tip for the category: {category}
@@ -87,14 +75,7 @@ Return as JSON array:
 """
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        
-        if not response or not hasattr(response, 'text'):
-            print(f"⚠️ Wellness tips: No response for {category}")
-            return fallback_tips.get(category, fallback_tips["general"])
-
-        response_text = response.text.strip()
+        response_text = generate_text(prompt, call_site="wellness_tips").strip()
 
         if not response_text:
             print(f"⚠️ Wellness tips: Empty response for {category}")
@@ -123,6 +104,7 @@ Return as JSON array:
 
     except json.JSONDecodeError as e:
         print(f"⚠️ Wellness tips JSON error for {category}: {e}")
+        reject_response(prompt, "wellness_tips")
         return fallback_tips.get(category, fallback_tips["general"])
     except Exception as e:
         print(f"⚠️ Wellness tips error for {category}: {e}")
@@ -0,0 +1,239 @@
+"""
+Analytics Rollups
+Precomputed per-employee, per-department and per-month aggregates behind the HR
+dashboard, so AnalyticsSummary, RetentionRisk and AbsenteeismTrends read a few
+rollup rows instead of scanning LeaveRequest / EmployeeTraining.
+
+Rollups are kept current by refresh_employee_rollups(), which routes call in the
+same transaction as the write (leave approval, training change, new employee).
+Department counters change by atomic "SET col = col + delta" updates and the
+employee rollup row is locked while it is recomputed, so concurrent writes for
+the same department or employee do not lose updates.
+rebuild_rollups() recomputes everything from the raw tables.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+
+from models import (
+    db, Employee, EmployeeTraining, LeaveRequest,
+    EmployeeAnalyticsRollup, DepartmentAnalyticsRollup, LeaveMonthlyRollup
+)
+
+
+# Absenteeism is measured over the current month and the five before it,
+# against 22 working days x 6 months
+ABSENTEEISM_MONTHS = 6
+WORKING_DAYS_PER_MONTH = 22
+
+
+def month_start(day: date, months_back: int = 0) -> date:
+    """First day of the month `months_back` months before `day`'s month"""
+    index = day.year * 12 + (day.month - 1) - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _leave_stats(leaves) -> Dict[date, List[float]]:
+    """{month: [days, count, burnout, sickness]} from (start_date, end_date, reason) rows"""
+    months = defaultdict(lambda: [0.0, 0, 0, 0])
+    for start_date, end_date, reason in leaves:
+        bucket = months[month_start(start_date)]
+        bucket[0] += (end_date - start_date).days + 1
+        bucket[1] += 1
+        reason = (reason or "").lower()
+        bucket[2] += 1 if "burnout" in reason else 0
+        bucket[3] += 1 if "sick" in reason else 0
+    return months
+
+
+def _increment_department(dept_id: int, deltas: Dict[str, float]) -> int:
+    """UPDATE ... SET col = col + delta for one department row; returns the matched row count"""
+    values = {name: func.coalesce(getattr(DepartmentAnalyticsRollup, name), 0) + delta
+              for name, delta in deltas.items()}
+    result = db.session.execute(
+        update(DepartmentAnalyticsRollup)
+        .where(DepartmentAnalyticsRollup.dept_id == dept_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _apply_to_department(dept_id, sign: int, leave_days: float, total: int, completed: int) -> None:
+    if dept_id is None:
+        return
+    deltas = {"employee_count": sign, "approved_leave_days": sign * leave_days,
+              "trainings_total": sign * total, "trainings_completed": sign * completed}
+    if _increment_department(dept_id, deltas):
+        return
+    # First rollup of this department; a concurrent transaction may create it first
+    try:
+        with db.session.begin_nested():
+            db.session.add(DepartmentAnalyticsRollup(dept_id=dept_id, **deltas))
+    except IntegrityError:
+        _increment_department(dept_id, deltas)
+
+
+def refresh_employee_rollups(emp_id: int) -> None:
+    """
+    Recompute one employee's rollups from their own leave and training rows and
+    move the difference onto the department rollup. Does not commit.
+    """
+    db.session.flush()
+    # Locked until commit (SELECT ... FOR UPDATE where supported), so two refreshes of one
+    # employee cannot both move the same old values off the department
+    row = db.session.get(EmployeeAnalyticsRollup, emp_id, with_for_update=True)
+    if row is not None:
+        _apply_to_department(row.dept_id, -1, row.approved_leave_days or 0.0,
+                             row.trainings_total or 0, row.trainings_completed or 0)
+
+    employee = Employee.query.get(emp_id)
+    LeaveMonthlyRollup.query.filter_by(emp_id=emp_id).delete(synchronize_session=False)
+    if employee is None:
+        if row is not None:
+            db.session.delete(row)
+        return
+
+    total, completed = db.session.query(
+        func.count(EmployeeTraining.id),
+        func.coalesce(func.sum(case((EmployeeTraining.status == 'Completed', 1), else_=0)), 0)
+    ).filter(EmployeeTraining.emp_id == emp_id).one()
+
+    months = _leave_stats(
+        db.session.query(LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.reason)
+        .filter(LeaveRequest.emp_id == emp_id, LeaveRequest.status == 'Approved').all()
+    )
+    for month, (days, count, burnout, sickness) in months.items():
+        db.session.add(LeaveMonthlyRollup(emp_id=emp_id, dept_id=employee.dept_id, month=month,
+                                          leave_days=days, leave_count=count,
+                                          burnout_count=burnout, sickness_count=sickness))
+
+    if row is None:
+        row = EmployeeAnalyticsRollup(emp_id=emp_id)
+        db.session.add(row)
+    row.dept_id = employee.dept_id
+    row.approved_leave_days = sum(m[0] for m in months.values())
+    row.trainings_total = total
+    row.trainings_completed = completed
+    _apply_to_department(row.dept_id, 1, row.approved_leave_days, total, completed)
+
+
+def rebuild_rollups() -> Dict[str, int]:
+    """Recompute every rollup table from the raw tables and commit"""
+    LeaveMonthlyRollup.query.delete()
+    EmployeeAnalyticsRollup.query.delete()
+    DepartmentAnalyticsRollup.query.delete()
+
+    trainings = {
+        emp_id: (total, completed)
+        for emp_id, total, completed in db.session.query(
+            EmployeeTraining.emp_id,
+            func.count(EmployeeTraining.id),
+            func.coalesce(func.sum(case((EmployeeTraining.status == 'Completed', 1), else_=0)), 0)
+        ).group_by(EmployeeTraining.emp_id).all()
+    }
+
+    leaves_by_emp = defaultdict(list)
+    for emp_id, start_date, end_date, reason in db.session.query(
+            LeaveRequest.emp_id, LeaveRequest.start_date, LeaveRequest.end_date, LeaveRequest.reason
+    ).filter(LeaveRequest.status == 'Approved').yield_per(1000):
+        leaves_by_emp[emp_id].append((start_date, end_date, reason))
+
+    employee_rows, month_rows, departments = [], [], {}
+    for emp_id, dept_id in db.session.query(Employee.emp_id, Employee.dept_id).all():
+        months = _leave_stats(leaves_by_emp.get(emp_id, ()))
+        total, completed = trainings.get(emp_id, (0, 0))
+        leave_days = sum(m[0] for m in months.values())
+        employee_rows.append(EmployeeAnalyticsRollup(
+            emp_id=emp_id, dept_id=dept_id, approved_leave_days=leave_days,
+            trainings_total=total, trainings_completed=completed
+        ))
+        for month, (days, count, burnout, sickness) in months.items():
+            month_rows.append(LeaveMonthlyRollup(emp_id=emp_id, dept_id=dept_id, month=month,
+                                                 leave_days=days, leave_count=count,
+                                                 burnout_count=burnout, sickness_count=sickness))
+        if dept_id is not None:
+            dept = departments.setdefault(dept_id, DepartmentAnalyticsRollup(
+                dept_id=dept_id, employee_count=0, approved_leave_days=0.0,
+                trainings_total=0, trainings_completed=0
+            ))
+            dept.employee_count += 1
+            dept.approved_leave_days += leave_days
+            dept.trainings_total += total
+            dept.trainings_completed += completed
+
+    db.session.add_all(employee_rows + month_rows + list(departments.values()))
+    db.session.commit()
+    return {"employees": len(employee_rows), "departments": len(departments), "months": len(month_rows)}
+
+
+def ensure_rollups() -> None:
+    """Build the rollups once on a database that has employees but no rollup rows yet"""
+    if EmployeeAnalyticsRollup.query.first() is None and Employee.query.first() is not None:
+        rebuild_rollups()
+
+
+# ==================== READS ====================
+
+def absenteeism_window_start(today: date) -> date:
+    return month_start(today, ABSENTEEISM_MONTHS - 1)
+
+
+def absenteeism_leave_days(window_start: date) -> float:
+    """Approved leave days across all employees since window_start"""
+    return float(db.session.query(func.coalesce(func.sum(LeaveMonthlyRollup.leave_days), 0))
+                 .filter(LeaveMonthlyRollup.month >= window_start).scalar())
+
+
+def risk_counts(window_start: date) -> Dict[str, int]:
+    """
+    Employees per retention-risk level, from the rollups in one query.
+    High: >8% absenteeism over the window or >50% trainings pending; Medium: >5% or >30%.
+    """
+    leave_sq = db.session.query(
+        LeaveMonthlyRollup.emp_id.label('emp_id'),
+        func.sum(LeaveMonthlyRollup.leave_days).label('leave_days')
+    ).filter(LeaveMonthlyRollup.month >= window_start)\
+        .group_by(LeaveMonthlyRollup.emp_id).subquery()
+
+    total = func.coalesce(EmployeeAnalyticsRollup.trainings_total, 0)
+    pending = total - func.coalesce(EmployeeAnalyticsRollup.trainings_completed, 0)
+    absenteeism_pct = func.coalesce(leave_sq.c.leave_days, 0) * 100.0 / (WORKING_DAYS_PER_MONTH * ABSENTEEISM_MONTHS)
+    pending_pct = pending * 100.0 / case((total == 0, 1), else_=total)
+    risk = case(
+        ((absenteeism_pct > 8) | (pending_pct > 50), 'high'),
+        ((absenteeism_pct > 5) | (pending_pct > 30), 'medium'),
+        else_='low'
+    ).label('risk')
+
+    rows = db.session.query(risk, func.count(EmployeeAnalyticsRollup.emp_id))\
+        .outerjoin(leave_sq, leave_sq.c.emp_id == EmployeeAnalyticsRollup.emp_id)\
+        .group_by(risk).all()
+
+    counts = {'low': 0, 'medium': 0, 'high': 0}
+    counts.update({level: count for level, count in rows})
+    return counts
+
+
+def monthly_leave_totals(first_month: date) -> Dict[date, tuple]:
+    """{month: (leave_days, burnout_count, sickness_count)} for months since first_month"""
+    rows = db.session.query(
+        LeaveMonthlyRollup.month,
+        func.sum(LeaveMonthlyRollup.leave_days),
+        func.sum(LeaveMonthlyRollup.burnout_count),
+        func.sum(LeaveMonthlyRollup.sickness_count)
+    ).filter(LeaveMonthlyRollup.month >= first_month)\
+        .group_by(LeaveMonthlyRollup.month).all()
+    return {month: (days or 0, burnout or 0, sickness or 0) for month, days, burnout, sickness in rows}
+
+
+def training_totals() -> tuple:
+    """(enrollments, completed) across all employees"""
+    total, completed = db.session.query(
+        func.coalesce(func.sum(EmployeeAnalyticsRollup.trainings_total), 0),
+        func.coalesce(func.sum(EmployeeAnalyticsRollup.trainings_completed), 0)
+    ).one()
+    return int(total), int(completed)
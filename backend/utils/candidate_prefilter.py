@@ -0,0 +1,151 @@
+"""
+Candidate Pre-filter
+Cheap local first stage for ranking: an in-memory inverted index over resume /
+employee text and skills, scored with BM25 plus skill overlap. Only the top-K
+candidates are sent on to Gemini for scoring.
+"""
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+
+PREFILTER_TOP_K = int(os.getenv("PREFILTER_TOP_K", "20"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Share of the lexical score coming from BM25 text relevance vs. skill overlap
+BM25_WEIGHT = 0.6
+SKILL_WEIGHT = 0.4
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+    "is", "it", "its", "of", "on", "or", "our", "that", "the", "their", "this", "to",
+    "we", "will", "with", "you", "your", "who", "what", "which", "role", "team", "work",
+    "experience", "years", "strong", "ability", "skills", "including", "etc",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping tech spellings like c++, c# and node.js"""
+    if not text:
+        return []
+    text = _TAG_RE.sub(" ", text.lower())
+    tokens = (t.rstrip(".") for t in _TOKEN_RE.findall(text))
+    return [t for t in tokens if t and t not in _STOPWORDS]
+
+
+def parse_skills(value: Any) -> List[str]:
+    """Accept a list or the JSON-string skill columns used by Resume / Employee"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (ValueError, TypeError):
+            value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    skills = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("skill") or item.get("name") or ""
+        item = str(item).strip().lower()
+        if item:
+            skills.append(item)
+    return skills
+
+
+class CandidateIndex:
+    """
+    Inverted index over candidate documents.
+
+    Each document is {"text": str, "skills": [str]}; skills are also indexed as text
+    so a skill listed only in the skills column still matches the job description.
+    """
+
+    def __init__(self, documents: Dict[Any, Dict[str, Any]]):
+        self.postings = defaultdict(dict)  # token -> {doc_id: term frequency}
+        self.doc_lengths = {}
+        self.skills = {}
+
+        for doc_id, doc in documents.items():
+            skills = parse_skills(doc.get("skills"))
+            self.skills[doc_id] = set(skills)
+            counts = Counter(tokenize(doc.get("text") or "") + tokenize(" ".join(skills)))
+            self.doc_lengths[doc_id] = sum(counts.values())
+            for token, tf in counts.items():
+                self.postings[token][doc_id] = tf
+
+        self.doc_count = len(self.doc_lengths)
+        self.avg_length = (sum(self.doc_lengths.values()) / self.doc_count) if self.doc_count else 0.0
+
+    def _idf(self, token: str) -> float:
+        df = len(self.postings.get(token, ()))
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def bm25(self, query_tokens: Iterable[str]) -> Dict[Any, float]:
+        """BM25 score for every document sharing at least one query token"""
+        scores = defaultdict(float)
+        for token in set(query_tokens):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = self._idf(token)
+            for doc_id, tf in postings.items():
+                norm = 1 - BM25_B + BM25_B * (self.doc_lengths[doc_id] / (self.avg_length or 1))
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        return scores
+
+    def rank(self, query_text: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Rank candidates against a job description.
+
+        Returns up to top_k entries of
+        {"candidate_id", "lexical_score" (0-100), "bm25", "skill_overlap", "matched_skills"},
+        best first. Candidates with no lexical signal are dropped unless nothing matches.
+        """
+        top_k = max(1, top_k or PREFILTER_TOP_K)
+        query_tokens = tokenize(query_text)
+        normalized_query = " " + " ".join(query_tokens) + " "
+
+        bm25_scores = self.bm25(query_tokens)
+        max_bm25 = max(bm25_scores.values()) if bm25_scores else 0.0
+
+        # Skills (from any candidate) that the job description actually mentions
+        wanted_skills = set()
+        for skill in set().union(*self.skills.values()) if self.skills else ():
+            skill_tokens = tokenize(skill)
+            if skill_tokens and " " + " ".join(skill_tokens) + " " in normalized_query:
+                wanted_skills.add(skill)
+
+        ranked = []
+        for doc_id in self.doc_lengths:
+            matched = sorted(self.skills[doc_id] & wanted_skills)
+            overlap = len(matched) / len(wanted_skills) if wanted_skills else 0.0
+            bm25 = bm25_scores.get(doc_id, 0.0)
+            score = BM25_WEIGHT * (bm25 / max_bm25 if max_bm25 else 0.0) + SKILL_WEIGHT * overlap
+            ranked.append({
+                "candidate_id": doc_id,
+                "lexical_score": round(score * 100, 2),
+                "bm25": round(bm25, 4),
+                "skill_overlap": round(overlap, 4),
+                "matched_skills": matched,
+            })
+
+        ranked.sort(key=lambda r: r["lexical_score"], reverse=True)
+        if any(r["lexical_score"] > 0 for r in ranked):
+            ranked = [r for r in ranked if r["lexical_score"] > 0]
+        return ranked[:top_k]
+
+
+def shortlist(documents: Dict[Any, Dict[str, Any]], query_text: str,
+              top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Build an index over `documents` and return the top_k candidates for `query_text`"""
+    return CandidateIndex(documents).rank(query_text, top_k)
@@ -0,0 +1,80 @@
+"""
+Chat Context Cache
+Per-user chatbot context (profile, department, manager and leave stats) kept in
+memory for CHAT_CONTEXT_TTL seconds, so the follow-up turns of a conversation
+do not query the database for it again.
+
+Entries are dropped when a commit writes a table they are built from
+(utils.response_cache tracks written tables per commit); the TTL bounds
+staleness from writes made by other workers.
+"""
+import copy
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from utils import response_cache
+
+
+CHAT_CONTEXT_TTL = int(os.getenv("CHAT_CONTEXT_TTL", "300"))
+
+# Tables the context is built from
+CONTEXT_TABLES = frozenset({"users", "employees", "departments", "leave_requests"})
+
+_entries = {}  # user_id -> (context, expires_at)
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_generation = [0]  # bumped on every invalidation
+
+
+def get_user_context(user_id: int, load: Callable[[int], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Cached load(user_id). A copy is returned, so callers may modify it.
+    """
+    now = time.time()
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry and entry[1] <= now:
+            del _entries[user_id]
+            entry = None
+        if entry:
+            _stats["hits"] += 1
+            return copy.deepcopy(entry[0])
+        _stats["misses"] += 1
+        generation = _generation[0]
+
+    context = load(user_id)
+    with _lock:
+        # Skip storing if a commit invalidated the cache while this was loaded
+        if _generation[0] == generation:
+            _entries[user_id] = (context, now + CHAT_CONTEXT_TTL)
+    return copy.deepcopy(context)
+
+
+def invalidate_user(user_id: int) -> None:
+    with _lock:
+        _generation[0] += 1
+        if _entries.pop(user_id, None) is not None:
+            _stats["invalidations"] += 1
+
+
+def clear() -> None:
+    with _lock:
+        _generation[0] += 1
+        _stats["invalidations"] += len(_entries)
+        _entries.clear()
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "entries": len(_entries)}
+
+
+def _on_tables_changed(tables) -> None:
+    # Leave balances and reporting lines span users, so any relevant write drops every entry
+    if CONTEXT_TABLES & set(tables):
+        clear()
+
+
+response_cache.subscribe(_on_tables_changed)
@@ -0,0 +1,99 @@
+"""
+Chat History Queries
+Keyset-paginated chat history and leave-card references.
+
+A page is read newest first on the (user_id, id) index, so a user's chat pane costs
+the same however long their history is. Leave-card messages store only
+{"leave_id": ...}; the cards of a page are resolved with one LeaveRequest query, which
+also keeps their status current. Cards saved with a full LeaveRequest.to_dict() copy
+are resolved the same way and fall back to that copy when the request is gone.
+The data column is only decoded for structured (non-text) messages.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import joinedload
+
+from models import ChatMessage, Employee, LeaveRequest
+from utils.pagination import apply_keyset, decode_cursor, encode_cursor
+
+
+LEAVE_CARD = "leave-card"
+
+HISTORY_COLUMNS = (ChatMessage.id, ChatMessage.sender, ChatMessage.text, ChatMessage.type,
+                   ChatMessage.data, ChatMessage.timestamp)
+
+
+def leave_card_data(leave_request: LeaveRequest) -> str:
+    """Stored data of a leave-card message: a reference, resolved when the card is read"""
+    return json.dumps({"leave_id": leave_request.leave_id})
+
+
+def _decode(message) -> Optional[Any]:
+    if not message.data or (message.type or "text") == "text":
+        return None
+    try:
+        return json.loads(message.data)
+    except ValueError:
+        return None
+
+
+def resolve_leave_cards(leave_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """LeaveRequest.to_dict() for each existing id, in one query"""
+    leave_ids = set(leave_ids)
+    if not leave_ids:
+        return {}
+    requests = (LeaveRequest.query
+                .options(joinedload(LeaveRequest.employee).joinedload(Employee.user),
+                         joinedload(LeaveRequest.approver).joinedload(Employee.user))
+                .filter(LeaveRequest.leave_id.in_(leave_ids))
+                .all())
+    return {req.leave_id: req.to_dict() for req in requests}
+
+
+def serialize_messages(messages: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    History items for ChatMessage rows (or rows with the same columns), in the given order.
+    Leave cards get the current LeaveRequest.to_dict() as their data.
+    """
+    items = []
+    for message in messages:
+        items.append({
+            "id": message.id,
+            "sender": message.sender,
+            "text": message.text,
+            "type": message.type,
+            "data": _decode(message),
+            "timestamp": message.timestamp.isoformat() if message.timestamp else None,
+        })
+
+    cards = [item for item in items
+             if item["type"] == LEAVE_CARD and isinstance(item["data"], dict) and item["data"].get("leave_id")]
+    resolved = resolve_leave_cards(item["data"]["leave_id"] for item in cards)
+    for item in cards:
+        item["data"] = resolved.get(item["data"]["leave_id"], item["data"])
+    return items
+
+
+def fetch_chat_page(user_id: int, cursor: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+    """
+    One page of a user's chat history, newest first.
+
+    Args:
+        user_id: Owner of the messages
+        cursor: next_cursor of the previous (newer) page
+        limit: Page size
+
+    Returns:
+        {"history": [...], "next_cursor": str or None}; raises ValueError for a malformed cursor
+    """
+    query = ChatMessage.query.with_entities(*HISTORY_COLUMNS).filter(ChatMessage.user_id == user_id)
+    query = apply_keyset(query, [ChatMessage.id], decode_cursor(cursor) if cursor else None, descending=True)
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "history": serialize_messages(rows),
+        "next_cursor": encode_cursor(rows[-1].id) if has_more else None,
+    }
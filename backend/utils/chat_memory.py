@@ -0,0 +1,193 @@
+"""
+Chat Memory
+Bounded conversation history for the HR chatbot prompt.
+
+The prompt gets the user's last CHAT_HISTORY_TURNS turns verbatim plus a rolling
+summary of everything older (a ChatSummary row per user). After each exchange a
+background worker folds the messages that left the verbatim window into the
+summary once at least CHAT_SUMMARY_BATCH of them have piled up: one LLM call over
+the old summary and just those messages, so the summary is updated incrementally.
+Messages that left the window but are not folded yet stay in the prompt verbatim,
+so nothing drops out of context between folds. The whole history section is held
+to CHAT_HISTORY_TOKEN_BUDGET tokens (summary first, then the newest messages), so
+prompt size stays flat however long a conversation gets.
+
+CHAT_HISTORY_TURNS          - user/assistant turns kept verbatim; 0 disables memory (default: 4)
+CHAT_HISTORY_TOKEN_BUDGET   - tokens for the summary and recent messages together (default: 1200)
+CHAT_MESSAGE_MAX_TOKENS     - longer messages are clipped in the prompt (default: 300)
+CHAT_SUMMARY_MAX_WORDS      - target length of the rolling summary (default: 150)
+CHAT_SUMMARY_BATCH          - messages past the window that trigger a fold (default: 4)
+"""
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from models import db, ChatMessage, ChatSummary
+from utils.llm_client import generate_text, llm_available
+from utils.llm_telemetry import CHARS_PER_TOKEN, estimate_tokens
+
+
+CHAT_HISTORY_TURNS = int(os.getenv("CHAT_HISTORY_TURNS", "4"))
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1200"))
+CHAT_MESSAGE_MAX_TOKENS = int(os.getenv("CHAT_MESSAGE_MAX_TOKENS", "300"))
+CHAT_SUMMARY_MAX_WORDS = int(os.getenv("CHAT_SUMMARY_MAX_WORDS", "150"))
+CHAT_SUMMARY_BATCH = int(os.getenv("CHAT_SUMMARY_BATCH", "4"))
+
+# Upper bound on messages folded by one summary call
+_FOLD_MAX_MESSAGES = 40
+
+_SPEAKERS = {"user": "Employee", "ai": "Assistant", "assistant": "Assistant"}
+
+_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-summary")
+_pending = set()  # user ids with a queued fold
+_pending_lock = threading.Lock()
+
+
+def _conversation(user_id: int):
+    """Plain text messages of a user's conversation (leave cards and forms are left out)"""
+    return (db.session.query(ChatMessage.id, ChatMessage.sender, ChatMessage.text)
+            .filter(ChatMessage.user_id == user_id,
+                    ChatMessage.sender.in_(tuple(_SPEAKERS)),
+                    db.or_(ChatMessage.type == 'text', ChatMessage.type.is_(None)),
+                    ChatMessage.text.isnot(None), ChatMessage.text != ''))
+
+
+def _recent(user_id: int, limit: int, after_id: int = 0) -> List[tuple]:
+    """The user's newest `limit` messages (with an id above after_id) as (id, sender, text), newest first"""
+    return (_conversation(user_id)
+            .filter(ChatMessage.id > after_id)
+            .order_by(ChatMessage.id.desc())
+            .limit(limit).all())
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    text = text.strip()
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(0, max_tokens * CHARS_PER_TOKEN - 3)].rstrip() + "..."
+
+
+def conversation_window(user_id: int) -> Dict[str, Any]:
+    """
+    History for the next prompt.
+
+    Returns:
+        {"summary": str, "messages": [{"sender": "Employee" | "Assistant", "text": str}] oldest first}
+        Both are empty when memory is disabled or the user has no history.
+    """
+    window = {"summary": "", "messages": []}
+    if CHAT_HISTORY_TURNS <= 0 or not user_id:
+        return window
+
+    row = db.session.get(ChatSummary, user_id)
+    summary = _clip(row.summary, CHAT_HISTORY_TOKEN_BUDGET // 2) if row and row.summary else ""
+    budget = CHAT_HISTORY_TOKEN_BUDGET - estimate_tokens(summary)
+
+    # Everything the summary does not cover yet: the verbatim window plus any not-yet-folded
+    # messages before it, newest first until the budget runs out
+    folded_through = row.last_message_id if row and row.last_message_id else 0
+    messages = []
+    for _, sender, text in _recent(user_id, CHAT_HISTORY_TURNS * 2 + _FOLD_MAX_MESSAGES, folded_through):
+        text = _clip(text, CHAT_MESSAGE_MAX_TOKENS)
+        cost = estimate_tokens(text)
+        if cost > budget:
+            break
+        budget -= cost
+        messages.append({"sender": _SPEAKERS[sender], "text": text})
+
+    window["summary"] = summary
+    window["messages"] = list(reversed(messages))
+    return window
+
+
+def format_window(window: Dict[str, Any]) -> str:
+    """Prompt section for a conversation_window ("" when there is no history)"""
+    if not window["summary"] and not window["messages"]:
+        return ""
+    section = "Conversation so far:\n"
+    if window["summary"]:
+        section += f"Summary of earlier messages: {window['summary']}\n"
+    if window["messages"]:
+        section += "Recent messages:\n"
+        for message in window["messages"]:
+            section += f"{message['sender']}: {message['text']}\n"
+    return section + "\n"
+
+
+# ==================== ROLLING SUMMARY ====================
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between an employee and the company's HR assistant.
+
+Current summary:
+{summary}
+
+New messages, oldest first:
+{transcript}
+
+Rewrite the summary so it also covers the new messages. Keep the facts, requests and decisions the
+assistant needs to answer follow-up questions (dates, leave types, amounts, names of policies).
+Write at most {max_words} words of plain text. Return only the summary."""
+
+
+def fold_history(user_id: int) -> bool:
+    """
+    Fold messages that left the verbatim window into the user's stored summary.
+    Does nothing until at least CHAT_SUMMARY_BATCH such messages exist. Returns True when the summary changed.
+    """
+    if CHAT_HISTORY_TURNS <= 0 or not llm_available():
+        return False
+
+    window = _recent(user_id, CHAT_HISTORY_TURNS * 2)
+    if len(window) < CHAT_HISTORY_TURNS * 2:
+        return False
+    oldest_in_window = min(message_id for message_id, _, _ in window)
+
+    row = db.session.get(ChatSummary, user_id)
+    folded_through = row.last_message_id if row else 0
+    messages = (_conversation(user_id)
+                .filter(ChatMessage.id > folded_through, ChatMessage.id < oldest_in_window)
+                .order_by(ChatMessage.id)
+                .limit(_FOLD_MAX_MESSAGES).all())
+    if len(messages) < CHAT_SUMMARY_BATCH:
+        return False
+
+    transcript = "\n".join(f"{_SPEAKERS[sender]}: {_clip(text, CHAT_MESSAGE_MAX_TOKENS)}"
+                           for _, sender, text in messages)
+    prompt = SUMMARY_PROMPT.format(summary=(row.summary if row and row.summary else "(none yet)"),
+                                   transcript=transcript, max_words=CHAT_SUMMARY_MAX_WORDS)
+    summary = generate_text(prompt, call_site="chat_summary").strip()
+    if not summary:
+        return False
+
+    if row is None:
+        row = ChatSummary(user_id=user_id)
+        db.session.add(row)
+    row.summary = summary
+    row.last_message_id = messages[-1][0]
+    db.session.commit()
+    return True
+
+
+def schedule_fold(app, user_id: int) -> None:
+    """Queue fold_history for a user on the background worker (at most one queued fold per user)"""
+    if CHAT_HISTORY_TURNS <= 0 or not user_id:
+        return
+    with _pending_lock:
+        if user_id in _pending:
+            return
+        _pending.add(user_id)
+    _pool.submit(_run_fold, app, user_id)
+
+
+def _run_fold(app, user_id: int) -> None:
+    with _pending_lock:
+        _pending.discard(user_id)
+    with app.app_context():
+        try:
+            fold_history(user_id)
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Chat summary error (user {user_id}): {e}")
+            traceback.print_exc()
@@ -1,20 +1,8 @@
 """
 Document Generator using Google Gemini 2.5 Flash
 """
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
-from pathlib import Path
 from datetime import datetime
-
-load_dotenv(Path(__file__).parent.parent / ".env", override=True)
-
-# Setup Gemini with validation
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables")
-
-genai.configure(api_key=api_key)
+from utils.llm_client import generate_text, llm_available
 
 
 def generate_reference_letter(employee_name: str, position: str, department: str, achievements: str) -> str:
@@ -46,7 +34,7 @@ Sincerely,
 [Company Name]
 """
 
-    if not api_key:
+    if not llm_available():
         return fallback_letter
 
     prompt = f"""Generate a professional reference letter for:
@@ -67,14 +55,7 @@ Format as a complete letter with date, salutation, body, and signature placehold
 """
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-
-        if not response or not hasattr(response, 'text'):
-            print("⚠️ Reference letter: No response from API")
-            return fallback_letter
-
-        response_text = response.text.strip()
+        response_text = generate_text(prompt, call_site="reference_letter").strip()
 
         if not response_text:
             print("⚠️ Reference letter: Empty response")
@@ -164,7 +145,7 @@ This policy will be reviewed annually and updated as necessary.
 For questions or clarifications, please contact the Human Resources department.
 """
 
-    if not api_key:
+    if not llm_available():
         return fallback_policy
 
     prompt = f"""Generate a comprehensive workplace policy document for:
@@ -183,14 +164,7 @@ Format as a formal policy document.
 """
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-
-        if not response or not hasattr(response, 'text'):
-            print("⚠️ Policy document: No response from API")
-            return fallback_policy
-
-        response_text = response.text.strip()
+        response_text = generate_text(prompt, call_site="policy_document").strip()
 
         if not response_text:
             print("⚠️ Policy document: Empty response")
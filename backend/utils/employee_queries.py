@@ -0,0 +1,173 @@
+"""
+Employee Queries
+Reusable query builders for employee listings and per-employee context.
+
+Listings load User and Department with joined eager loading and take approved
+leave days and performance totals from correlated aggregate subqueries (index
+range lookups on the emp_id-led indexes), so a page of any size is one SELECT
+instead of one query per employee. Pages are keyset paginated on emp_id with the
+opaque cursors of utils.pagination, and a field projection only loads the
+columns, joins and aggregates the requested fields need.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload, load_only
+
+from models import db, Employee, EmployeePerformance, LeaveRequest, User
+from utils.pagination import apply_keyset, decode_cursor, encode_cursor
+
+# Response fields, in output order
+EMPLOYEE_FIELDS = (
+    "emp_id", "user_id", "name", "email", "dept_id", "department", "job_title", "salary",
+    "skills", "hire_date", "manager_id", "leaves_taken", "performance_score",
+)
+
+# Response field -> Employee column it reads
+_COLUMN_FIELDS = {
+    "user_id": Employee.user_id,
+    "dept_id": Employee.dept_id,
+    "job_title": Employee.job_title,
+    "salary": Employee.salary,
+    "skills": Employee.skills,
+    "hire_date": Employee.hire_date,
+    "manager_id": Employee.manager_id,
+}
+
+
+def parse_fields(raw: Optional[str]) -> Tuple[Optional[List[str]], List[str]]:
+    """Split a "?fields=a,b" value into (known fields or None for all, unknown names); emp_id is always kept"""
+    if not raw:
+        return None, []
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EMPLOYEE_FIELDS]
+    return [name for name in EMPLOYEE_FIELDS if name in names or name == "emp_id"], unknown
+
+
+def performance_total_column():
+    """Summed EmployeePerformance score of the outer query's employee (None without records)"""
+    return (db.session.query(func.sum(EmployeePerformance.score))
+            .filter(EmployeePerformance.emp_id == Employee.emp_id)
+            .correlate(Employee)
+            .scalar_subquery()
+            .label("performance_total"))
+
+
+def approved_leave_column():
+    """Approved leave days of the outer query's employee"""
+    return (db.session.query(func.coalesce(func.sum(LeaveRequest.number_of_days), 0))
+            .filter(LeaveRequest.emp_id == Employee.emp_id, LeaveRequest.status == 'Approved')
+            .correlate(Employee)
+            .scalar_subquery()
+            .label("leaves_taken"))
+
+
+def _cursor_id(token: str) -> int:
+    """emp_id of a cursor; raises ValueError for a malformed one"""
+    values = decode_cursor(token)
+    if len(values) != 1 or isinstance(values[0], bool) or not isinstance(values[0], int):
+        raise ValueError("Invalid cursor")
+    return values[0]
+
+
+def employee_list_query(fields: Optional[Iterable[str]] = None, after_id: Optional[int] = None,
+                        dept_id: Optional[int] = None):
+    """
+    Employees (ordered by emp_id) with their user and department eagerly loaded.
+
+    Rows are (Employee, performance_total, leaves_taken); an aggregate is None
+    when its field is not requested.
+
+    Args:
+        fields: Response fields to load (None for all of EMPLOYEE_FIELDS)
+        after_id: Keyset cursor, only employees with a larger emp_id are returned
+        dept_id: Only employees of this department
+    """
+    wanted = set(fields or EMPLOYEE_FIELDS)
+
+    # Employees without a user row are excluded, as with the original inner join
+    columns = [column for name, column in _COLUMN_FIELDS.items() if name in wanted]
+    user_columns = [column for name, column in (("name", User.name), ("email", User.email)) if name in wanted]
+    options = [load_only(Employee.emp_id, *columns),
+               joinedload(Employee.user, innerjoin=True).load_only(User.user_id, *user_columns)]
+    if "department" in wanted:
+        options.append(joinedload(Employee.department))
+
+    query = db.session.query(Employee).options(*options)
+
+    query = query.add_columns(performance_total_column() if "performance_score" in wanted else db.null(),
+                              approved_leave_column() if "leaves_taken" in wanted else db.null())
+
+    if dept_id is not None:
+        query = query.filter(Employee.dept_id == dept_id)
+    return apply_keyset(query, [Employee.emp_id], [after_id] if after_id is not None else None, descending=False)
+
+
+def serialize_employee(emp: Employee, performance_total: Optional[float], leaves_taken: Optional[float],
+                       fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Listing payload for one employee, limited to the requested fields"""
+    wanted = set(fields or EMPLOYEE_FIELDS)
+    values = {
+        "emp_id": lambda: emp.emp_id,
+        "user_id": lambda: emp.user_id,
+        "name": lambda: emp.user.name,
+        "email": lambda: emp.user.email,
+        "dept_id": lambda: emp.dept_id,
+        "department": lambda: emp.department.name if emp.department else 'Unassigned',
+        "job_title": lambda: emp.job_title,
+        "salary": lambda: emp.salary,
+        "skills": lambda: emp.get_skills(),
+        "hire_date": lambda: emp.hire_date.isoformat() if emp.hire_date else None,
+        "manager_id": lambda: emp.manager_id,
+        "leaves_taken": lambda: leaves_taken or 0,
+        "performance_score": lambda: round(performance_total, 1) if performance_total is not None else None,
+    }
+    return {name: values[name]() for name in EMPLOYEE_FIELDS if name in wanted}
+
+
+def fetch_employee_page(fields: Optional[Iterable[str]] = None, cursor: Optional[str] = None,
+                        limit: Optional[int] = None, dept_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    One page of the employee listing, ordered by emp_id.
+
+    Args:
+        fields: Response fields (None for all of EMPLOYEE_FIELDS)
+        cursor: next_cursor of the previous page
+        limit: Page size (None returns every matching employee)
+        dept_id: Only employees of this department
+
+    Returns:
+        {"employees": [...], "next_cursor": str or None}; raises ValueError for a malformed cursor
+    """
+    query = employee_list_query(fields, after_id=_cursor_id(cursor) if cursor else None, dept_id=dept_id)
+    rows = query.limit(limit + 1).all() if limit is not None else query.all()
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit] if has_more else rows
+    return {
+        "employees": [serialize_employee(emp, performance_total, leaves_taken, fields)
+                      for emp, performance_total, leaves_taken in rows],
+        "next_cursor": encode_cursor(rows[-1][0].emp_id) if has_more else None,
+    }
+
+
+def employee_with_relations(user_id: int) -> Optional[User]:
+    """User with employee, department and manager's user loaded in one query"""
+    employee = joinedload(User.employee)
+    return db.session.get(User, user_id, options=[
+        employee.joinedload(Employee.department),
+        employee.joinedload(Employee.manager).joinedload(Employee.user),
+    ])
+
+
+def leave_totals_query(emp_id: int):
+    """(approved leave days, pending request count) for one employee"""
+    return db.session.query(
+        func.coalesce(func.sum(case((LeaveRequest.status == 'Approved', LeaveRequest.number_of_days), else_=0)), 0),
+        func.count(case((LeaveRequest.status == 'Pending', 1))),
+    ).filter(LeaveRequest.emp_id == emp_id)
+
+
+def leave_totals(emp_id: int) -> Dict[str, Any]:
+    """Approved leave days and pending request count in one aggregate query"""
+    approved_days, pending = leave_totals_query(emp_id).one()
+    return {"approved_days": approved_days, "pending_requests": pending}
@@ -0,0 +1,200 @@
+"""
+Index Advisor
+Runs EXPLAIN on the query shapes the hot routes issue and flags full table
+scans, so lookups stay index-driven as tables grow. Run it with index_advisor.py.
+
+SQLite:   EXPLAIN QUERY PLAN; "SCAN <table>" without an index is a full scan
+Postgres: EXPLAIN; "Seq Scan on <table>" is a full scan
+
+Listings that return a whole table (e.g. every employee) scan by design; their
+shapes declare the tables they are expected to scan. Full scans of tables
+smaller than min_rows are reported but not counted as problems, since planners
+rightly prefer them there.
+"""
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from models import (
+    db, Applicant, ChatMessage, Employee, EmployeePerformance, EmployeeTraining, Job, LeaveRequest, User
+)
+from utils.employee_queries import employee_list_query, leave_totals_query
+from utils.job_queries import applicant_list_query, applications_query, job_board_query, unscored_resumes_query
+
+
+DEFAULT_MIN_ROWS = 1000
+
+_SQLITE_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+_POSTGRES_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper that compiles the inner statement with its bound parameters"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kw)
+
+
+class QueryShape:
+    """A query a route issues, built with sample parameters"""
+
+    def __init__(self, route: str, label: str, build: Callable[[Dict[str, Any]], Any],
+                 expected_scans: Sequence[str] = ()):
+        self.route = route
+        self.label = label
+        self.build = build
+        self.expected_scans = set(expected_scans)
+
+
+def _employee_context_query(sample):
+    # utils.employee_queries.employee_with_relations uses Session.get; EXPLAIN the equivalent joined SELECT
+    from sqlalchemy.orm import joinedload
+
+    employee = joinedload(User.employee)
+    return (db.session.query(User)
+            .options(employee.joinedload(Employee.department),
+                     employee.joinedload(Employee.manager).joinedload(Employee.user))
+            .filter(User.user_id == sample["user_id"]))
+
+
+QUERY_SHAPES = [
+    QueryShape("GET /api/employees", "full listing", lambda s: employee_list_query(),
+               expected_scans=("employees",)),
+    QueryShape("GET /api/employees", "keyset page",
+               lambda s: employee_list_query(after_id=s["emp_id"]).limit(50)),
+    QueryShape("POST /api/askhr/chat", "employee context",
+               _employee_context_query),
+    QueryShape("POST /api/askhr/chat", "leave totals",
+               lambda s: leave_totals_query(s["emp_id"])),
+    QueryShape("POST /api/askhr/chat", "leave request cards",
+               lambda s: LeaveRequest.query.filter_by(emp_id=s["emp_id"]).order_by(LeaveRequest.created_at.desc())),
+    QueryShape("GET /api/employee/leave/status", "recent leave requests",
+               lambda s: LeaveRequest.query.filter_by(emp_id=s["emp_id"])
+               .order_by(LeaveRequest.created_at.desc()).limit(10)),
+    QueryShape("GET /api/hr/leave/requests", "pending queue",
+               lambda s: LeaveRequest.query.filter_by(status='Pending').order_by(LeaveRequest.created_at.desc())),
+    QueryShape("GET /api/jobs", "open jobs page",
+               lambda s: job_board_query(status='Open').limit(50)),
+    QueryShape("GET /api/jobs", "user's applications on the page",
+               lambda s: applications_query(s["user_id"], [s["job_id"]])),
+    QueryShape("GET /api/jobs/<id>/applicants", "best-scored page",
+               lambda s: applicant_list_query(s["job_id"]).limit(50)),
+    QueryShape("GET /api/jobs/<id>/applicants", "status + score range page",
+               lambda s: applicant_list_query(s["job_id"], status='Interview', min_score=50, max_score=90).limit(50)),
+    QueryShape("GET /api/jobs/<id>/applicants", "unscored applicants",
+               lambda s: unscored_resumes_query(s["job_id"])),
+    QueryShape("POST /api/recruitment/upload", "duplicate application check",
+               lambda s: Applicant.query.filter_by(user_id=s["user_id"], job_id=s["job_id"]).limit(1)),
+    QueryShape("GET /api/employee/dashboard/summary/<id>", "completed trainings",
+               lambda s: db.session.query(func.count(EmployeeTraining.id))
+               .filter_by(emp_id=s["emp_id"], status='Completed')),
+    QueryShape("GET /api/performance/summary/<id>", "performance log",
+               lambda s: EmployeePerformance.query.filter_by(emp_id=s["emp_id"])),
+    QueryShape("POST /api/performance/log", "today's HR rating",
+               lambda s: EmployeePerformance.query.filter(
+                   EmployeePerformance.emp_id == s["emp_id"],
+                   EmployeePerformance.type == 'HR_Manual',
+                   EmployeePerformance.created_at >= s["day_start"],
+                   EmployeePerformance.created_at <= s["day_end"]).limit(1)),
+    QueryShape("GET /api/chat/history", "latest messages",
+               lambda s: ChatMessage.query.filter_by(user_id=s["user_id"])
+               .order_by(ChatMessage.id.desc()).limit(51)),
+]
+
+
+def sample_parameters() -> Dict[str, Any]:
+    """Representative ids from the database (any value works for EXPLAIN; these keep plans realistic)"""
+    today = datetime.utcnow().date()
+    return {
+        "emp_id": db.session.query(func.min(Employee.emp_id)).scalar() or 1,
+        "user_id": db.session.query(func.min(User.user_id)).scalar() or 1,
+        "job_id": db.session.query(func.min(Job.job_id)).scalar() or 1,
+        "day_start": datetime.combine(today, datetime.min.time()),
+        "day_end": datetime.combine(today, datetime.max.time()),
+    }
+
+
+def explain(query) -> List[str]:
+    """Plan lines for an ORM query or Core statement"""
+    statement = getattr(query, "statement", query)
+    rows = db.session.execute(_Explain(statement)).fetchall()
+    if db.engine.dialect.name == "sqlite":
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def full_scans(plan: List[str], dialect: str) -> List[Tuple[str, str]]:
+    """(table, plan line) for every full table scan in a plan"""
+    scans = []
+    for line in plan:
+        if dialect == "sqlite":
+            match = _SQLITE_SCAN_RE.match(line.strip())
+            # "SCAN t USING INDEX ..." walks an index in sort order and stops at the LIMIT;
+            # only a bare SCAN reads the whole table
+            if match and "USING" not in match.group(2):
+                scans.append((match.group(1), line.strip()))
+        else:
+            for table in _POSTGRES_SCAN_RE.findall(line):
+                scans.append((table, line.strip()))
+    return scans
+
+
+def table_sizes(tables) -> Dict[str, int]:
+    sizes = {}
+    for table in tables:
+        try:
+            sizes[table] = db.session.execute(text(f'SELECT COUNT(*) FROM "{table}"')).scalar()
+        except Exception:
+            db.session.rollback()
+            sizes[table] = 0
+    return sizes
+
+
+def run_advisor(min_rows: int = DEFAULT_MIN_ROWS, shapes: Sequence[QueryShape] = QUERY_SHAPES) -> List[Dict[str, Any]]:
+    """
+    EXPLAIN every shape and classify its full scans.
+
+    Returns:
+        [{"route", "label", "plan", "scans": [{"table", "rows", "detail", "verdict"}], "ok", "error"}]
+        verdict is "expected", "small" (table below min_rows) or "full scan"
+    """
+    dialect = db.engine.dialect.name
+    sample = sample_parameters()
+    report, sizes = [], {}
+
+    for shape in shapes:
+        entry = {"route": shape.route, "label": shape.label, "plan": [], "scans": [], "ok": True, "error": None}
+        try:
+            entry["plan"] = explain(shape.build(sample))
+        except Exception as e:
+            db.session.rollback()
+            entry.update(ok=False, error=str(e))
+            report.append(entry)
+            continue
+
+        scans = full_scans(entry["plan"], dialect)
+        sizes.update(table_sizes({table for table, _ in scans} - set(sizes)))
+        for table, detail in scans:
+            if table in shape.expected_scans:
+                verdict = "expected"
+            elif sizes.get(table, 0) < min_rows:
+                verdict = "small"
+            else:
+                verdict = "full scan"
+                entry["ok"] = False
+            entry["scans"].append({"table": table, "rows": sizes.get(table, 0), "detail": detail, "verdict": verdict})
+        report.append(entry)
+
+    return report
@@ -0,0 +1,250 @@
+"""
+Job Queries
+Query builders for the job board and per-job applicant listings.
+
+Both listings filter and sort in SQL on indexed columns and page with keyset
+cursors (utils/pagination.py). They select only the columns the payload needs.
+Large text (JD text, input payload, resume text) is loaded only when asked for
+via "?include=". Applicant counts and the current user's application status
+are resolved for the jobs on the page only.
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.orm import joinedload, load_only
+
+from models import db, Applicant, Job, Resume, User
+from utils.pagination import apply_keyset, decode_cursor, encode_cursor
+
+
+SUMMARY_CHARS = 200
+
+# Sort key -> (indexed column, cursor value parser)
+JOB_SORTS = {
+    "created_at": (Job.created_at, datetime.fromisoformat),
+}
+JOB_INCLUDES = ("jd_text", "requirements", "input_data")
+
+# Unscored applicants (NULL score) list, sort and filter as 0, matching the displayed score;
+# the expression is the one indexed by ix_applicants_job_score_key
+SCORE_KEY = func.coalesce(Applicant.score, literal_column("0"))
+
+# Both are the second column of an index led by job_id
+APPLICANT_SORTS = {
+    "score": (SCORE_KEY, float),
+    "applied_date": (Applicant.applied_date, datetime.fromisoformat),
+}
+APPLICANT_INCLUDES = ("summary",)
+
+
+def parse_include(raw: Optional[str], allowed: Iterable[str]) -> List[str]:
+    """Split "?include=a,b"; raises ValueError for names not in allowed"""
+    names = [name.strip() for name in (raw or "").split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(unknown)}")
+    return names
+
+
+def _cursor_values(token: Optional[str], parse) -> Optional[List[Any]]:
+    """Sort key and id of a cursor; raises ValueError for a malformed one (including a null key)"""
+    if not token:
+        return None
+    values = decode_cursor(token)
+    if len(values) != 2 or values[0] is None:
+        raise ValueError("Invalid cursor")
+    try:
+        return [parse(values[0]), int(values[1])]
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+# ==================== JOBS ====================
+
+def job_board_query(sort: str = "created_at", descending: bool = True, cursor: Optional[str] = None,
+                    status: Optional[str] = None, dept_id: Optional[int] = None,
+                    location: Optional[str] = None, include: Iterable[str] = ()):
+    """
+    Jobs matching the filters in keyset order, after the cursor row.
+    Rows are (Job, applicant_count); only the listed and included columns are loaded.
+    """
+    sort_column, parse = JOB_SORTS[sort]
+    applicant_count = (db.session.query(func.count(Applicant.applicant_id))
+                       .filter(Applicant.job_id == Job.job_id)
+                       .correlate(Job)
+                       .scalar_subquery())
+
+    columns = [Job.job_id, Job.dept_id, Job.title, Job.status, Job.location, Job.employment_type,
+               Job.salary_range, Job.quantity, Job.posted_date, Job.closing_date, Job.created_at]
+    columns += [getattr(Job, name) for name in JOB_INCLUDES if name in include]
+    query = (db.session.query(Job, applicant_count.label("applicant_count"))
+             .options(load_only(*columns), joinedload(Job.department)))
+
+    if status:
+        query = query.filter(Job.status == status)
+    if dept_id is not None:
+        query = query.filter(Job.dept_id == dept_id)
+    if location:
+        query = query.filter(Job.location == location)
+    return apply_keyset(query, [sort_column, Job.job_id], _cursor_values(cursor, parse), descending)
+
+
+def applications_query(user_id: int, job_ids: List[int]):
+    """(job_id, status) of a user's applications to the given jobs"""
+    return (db.session.query(Applicant.job_id, Applicant.status)
+            .filter(Applicant.user_id == user_id, Applicant.job_id.in_(job_ids)))
+
+
+def fetch_job_page(sort: str = "created_at", descending: bool = True, cursor: Optional[str] = None,
+                   limit: Optional[int] = None, status: Optional[str] = None, dept_id: Optional[int] = None,
+                   location: Optional[str] = None, include: Iterable[str] = (),
+                   user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    One page of the job board.
+
+    Args:
+        sort / descending: Key from JOB_SORTS and direction
+        cursor: next_cursor of the previous page
+        limit: Page size (None returns every matching job)
+        status / dept_id / location: Exact-match filters
+        include: Heavy fields to add (JOB_INCLUDES)
+        user_id: Applicant whose has_applied / application_status is reported
+
+    Returns:
+        {"jobs": [...], "next_cursor": str or None}
+    """
+    include = set(include)
+    query = job_board_query(sort, descending, cursor, status=status, dept_id=dept_id,
+                            location=location, include=include)
+    rows = query.limit(limit + 1).all() if limit is not None else query.all()
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit] if has_more else rows
+
+    applications = {}
+    if user_id is not None and rows:
+        applications = dict(applications_query(user_id, [job.job_id for job, _ in rows]).all())
+
+    jobs = []
+    for job, count in rows:
+        item = {
+            'job_id': job.job_id,
+            'dept_id': job.dept_id,
+            'department': job.department.name if job.department else None,
+            'title': job.title,
+            'status': job.status,
+            'location': job.location,
+            'employment_type': job.employment_type,
+            'salary_range': job.salary_range,
+            'quantity': job.quantity,
+            'posted_date': job.posted_date.isoformat() if job.posted_date else None,
+            'closing_date': job.closing_date.isoformat() if job.closing_date else None,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'applicant_count': count,
+            'has_applied': job.job_id in applications,
+            'application_status': applications.get(job.job_id) if user_id is not None else None,
+        }
+        if "jd_text" in include:
+            item['jd_text'] = job.jd_text
+        if "requirements" in include:
+            item['requirements'] = job.get_requirements()
+        if "input_data" in include:
+            item['input_data'] = json.loads(job.input_data) if job.input_data else None
+        jobs.append(item)
+
+    last = rows[-1][0] if has_more else None
+    return {
+        "jobs": jobs,
+        "next_cursor": encode_cursor(getattr(last, sort), last.job_id) if last is not None else None,
+    }
+
+
+# ==================== APPLICANTS ====================
+
+def unscored_resumes_query(job_id: int):
+    """(resume_id, parsed_text) for the job's applicants that have no score yet (NULL; 0 is a real score)"""
+    return (db.session.query(Resume.resume_id, Resume.parsed_text)
+            .join(Applicant, Applicant.applicant_id == Resume.applicant_id)
+            .filter(Applicant.job_id == job_id,
+                    Applicant.score.is_(None),
+                    Resume.parsed_text.isnot(None)))
+
+
+def unscored_resumes(job_id: int) -> List[tuple]:
+    """List form of unscored_resumes_query"""
+    return unscored_resumes_query(job_id).all()
+
+
+def applicant_list_query(job_id: int, sort: str = "score", descending: bool = True,
+                         cursor: Optional[str] = None, status: Optional[str] = None,
+                         min_score: Optional[float] = None, max_score: Optional[float] = None,
+                         include: Iterable[str] = ()):
+    """Applicant rows (with user and resume columns) of one job in keyset order, after the cursor row"""
+    sort_column, parse = APPLICANT_SORTS[sort]
+
+    columns = [Applicant.applicant_id, Applicant.status, SCORE_KEY.label("score"), Applicant.q_and_a_scores,
+               Applicant.applied_date, User.name, User.email, Resume.file_url]
+    if "summary" in include:
+        columns.append(func.substr(Resume.parsed_text, 1, SUMMARY_CHARS).label("summary"))
+    query = (db.session.query(*columns)
+             .join(User, Applicant.user_id == User.user_id)
+             .outerjoin(Resume, Applicant.applicant_id == Resume.applicant_id)
+             .filter(Applicant.job_id == job_id))
+
+    if status:
+        query = query.filter(Applicant.status == status)
+    if min_score is not None:
+        query = query.filter(SCORE_KEY >= min_score)
+    if max_score is not None:
+        query = query.filter(SCORE_KEY <= max_score)
+    return apply_keyset(query, [sort_column, Applicant.applicant_id], _cursor_values(cursor, parse), descending)
+
+
+def fetch_applicant_page(job_id: int, sort: str = "score", descending: bool = True,
+                         cursor: Optional[str] = None, limit: Optional[int] = None,
+                         status: Optional[str] = None, min_score: Optional[float] = None,
+                         max_score: Optional[float] = None, include: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    One page of a job's applicants.
+
+    Args:
+        sort / descending: Key from APPLICANT_SORTS and direction
+        cursor: next_cursor of the previous page
+        limit: Page size (None returns every matching applicant)
+        status: Exact-match applicant status
+        min_score / max_score: Inclusive score range
+        include: "summary" adds the first SUMMARY_CHARS characters of the resume text
+
+    Returns:
+        {"applicants": [...], "next_cursor": str or None}
+    """
+    include = set(include)
+    query = applicant_list_query(job_id, sort, descending, cursor, status=status, min_score=min_score,
+                                 max_score=max_score, include=include)
+    rows = query.limit(limit + 1).all() if limit is not None else query.all()
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit] if has_more else rows
+
+    applicants = []
+    for row in rows:
+        item = {
+            "applicant_id": row.applicant_id,
+            "name": row.name,
+            "email": row.email,
+            "status": row.status,
+            "score": row.score if row.score is not None else 0,
+            "applied_date": row.applied_date.isoformat() if row.applied_date else None,
+            "resume_url": f"/api/{row.file_url}" if row.file_url else None,
+            "q_and_a_scores": json.loads(row.q_and_a_scores) if row.q_and_a_scores else [],
+        }
+        if "summary" in include:
+            item["summary"] = (row.summary + "...") if row.summary else ""
+        applicants.append(item)
+
+    last = rows[-1] if has_more else None
+    return {
+        "applicants": applicants,
+        "next_cursor": encode_cursor(getattr(last, sort), last.applicant_id) if last is not None else None,
+    }
+
@@ -0,0 +1,436 @@
+"""
+LLM Backends
+Pluggable text-generation backends behind utils/llm_client.generate_text.
+
+LLM_BACKEND selects the backend on first use:
+    gemini (default) - Google Gemini via google.generativeai
+    fake             - deterministic local stand-in for offline runs and benchmarks
+
+The fake answers every call site with JSON in the shape its caller parses, derived
+from a hash of the prompt, so the same prompt always gets the same answer. Latency
+and failures are injected from environment settings:
+    FAKE_LLM_LATENCY_MS         - base latency per call (default: 0)
+    FAKE_LLM_JITTER_MS          - uniform random extra latency (default: 0)
+    FAKE_LLM_MS_PER_1K_CHARS    - extra latency per 1000 prompt characters (default: 0)
+    FAKE_LLM_ERROR_RATE         - fraction of calls that raise a server error (default: 0)
+    FAKE_LLM_RATE_LIMIT_RATE    - fraction of calls that raise a 429 (default: 0)
+    FAKE_LLM_SEED               - seed for latency and failure injection (default: 0)
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+
+ENV_PATH = Path(__file__).resolve().parent.parent / ".env"
+
+_usage = threading.local()
+
+
+class LLMBackend:
+    """Interface every backend implements"""
+
+    name = "base"
+
+    @property
+    def available(self) -> bool:
+        """False when the backend cannot serve calls (e.g. no API key)"""
+        return True
+
+    def cache_model_name(self, model_name: str) -> str:
+        """Model name used in response cache keys, so backends never share entries"""
+        return model_name
+
+    def generate(self, prompt: str, call_site: str, model_name: str,
+                 generation_config: Optional[Dict[str, Any]] = None) -> str:
+        raise NotImplementedError
+
+    def generate_stream(self, prompt: str, call_site: str, model_name: str,
+                        generation_config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Yield the response in chunks as the model produces them (default: one chunk)"""
+        yield self.generate(prompt, call_site, model_name, generation_config)
+
+    def last_usage(self) -> Optional[Dict[str, int]]:
+        """Token usage reported for this thread's last generate() call, or None when unknown"""
+        usage = getattr(_usage, "value", None)
+        _usage.value = None
+        return usage
+
+    @staticmethod
+    def _set_usage(prompt_tokens: Optional[int], response_tokens: Optional[int]) -> None:
+        _usage.value = ({"prompt_tokens": prompt_tokens, "response_tokens": response_tokens or 0}
+                        if prompt_tokens is not None else None)
+
+
+class GeminiBackend(LLMBackend):
+    """
+    Google Gemini. google.generativeai takes most of a second to import, so it is
+    imported and configured once, on the first generate() call, and a model
+    client is kept per model name.
+    """
+
+    name = "gemini"
+
+    def __init__(self):
+        self._genai = None
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return bool(os.getenv("GEMINI_API_KEY"))
+
+    def _model(self, model_name: str):
+        model = self._models.get(model_name)
+        if model is None:
+            with self._lock:
+                if self._genai is None:
+                    import google.generativeai as genai
+
+                    api_key = os.getenv("GEMINI_API_KEY")
+                    if not api_key:
+                        print("⚠️ WARNING: GEMINI_API_KEY not found in environment variables")
+                    genai.configure(api_key=api_key)
+                    self._genai = genai
+                model = self._models.get(model_name)
+                if model is None:
+                    model = self._models[model_name] = self._genai.GenerativeModel(model_name)
+        return model
+
+    def generate(self, prompt, call_site, model_name, generation_config=None):
+        self._set_usage(None, None)
+        model = self._model(model_name)
+        if generation_config:
+            response = model.generate_content(prompt, generation_config=generation_config)
+        else:
+            response = model.generate_content(prompt)
+
+        text = response.text if response is not None and hasattr(response, "text") else ""
+        self._record_usage(response)
+        return text or ""
+
+    def generate_stream(self, prompt, call_site, model_name, generation_config=None):
+        self._set_usage(None, None)
+        model = self._model(model_name)
+        if generation_config:
+            response = model.generate_content(prompt, generation_config=generation_config, stream=True)
+        else:
+            response = model.generate_content(prompt, stream=True)
+
+        chunk = None
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. only a finish reason)
+                continue
+            if text:
+                yield text
+        # Usage is reported on the last chunk
+        self._record_usage(chunk)
+
+    def _record_usage(self, response) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self._set_usage(getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None))
+
+
+class FakeLLMError(Exception):
+    """Injected failure; the message mimics the Gemini error it stands in for"""
+
+
+_CANDIDATE_RE = re.compile(r'<<<CANDIDATE id="([^"]*)">>>')
+_WORD_RE = re.compile(r"[a-z][a-z0-9+#.]*")
+
+_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Node.js", "SQL", "PostgreSQL",
+    "AWS", "Docker", "Kubernetes", "Flask", "Django", "Machine Learning", "Data Analysis",
+    "Excel", "Communication", "Leadership", "Project Management", "Recruitment",
+    "Payroll", "Agile", "Git", "Linux", "Tableau", "Power BI", "Go", "C++",
+]
+_COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises"]
+_FIRST_NAMES = ["Asha", "Ben", "Chen", "Divya", "Elena", "Farid", "Grace", "Hiro", "Isha", "Jonas"]
+_LAST_NAMES = ["Kumar", "Lopez", "Mensah", "Novak", "Okafor", "Patel", "Quinn", "Rossi", "Sato", "Tan"]
+_TIP_CATEGORY_RE = re.compile(r"category:\s*(\w+)", re.IGNORECASE)
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Deterministic offline stand-in for Gemini.
+    Responses depend only on (call_site, prompt); latency and injected failures come
+    from a seeded generator, so a benchmark run is repeatable for a given seed.
+    """
+
+    name = "fake"
+
+    STREAM_CHUNKS = 8
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, ms_per_1k_chars: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.ms_per_1k_chars = ms_per_1k_chars
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.calls_by_site = {}
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMBackend":
+        return cls(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")),
+            jitter_ms=float(os.getenv("FAKE_LLM_JITTER_MS", "0")),
+            ms_per_1k_chars=float(os.getenv("FAKE_LLM_MS_PER_1K_CHARS", "0")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+        )
+
+    def cache_model_name(self, model_name: str) -> str:
+        return f"fake/{model_name}"
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.calls_by_site = {}
+
+    def _draw(self, prompt: str, call_site: str):
+        """Count the call and draw its latency (ms) and failure roll"""
+        with self._lock:
+            self.calls += 1
+            self.calls_by_site[call_site] = self.calls_by_site.get(call_site, 0) + 1
+            delay = self.latency_ms + self.ms_per_1k_chars * len(prompt) / 1000.0
+            if self.jitter_ms:
+                delay += self._random.uniform(0, self.jitter_ms)
+            failure = self._random.random()
+        return delay, failure
+
+    def _raise_injected(self, failure: float) -> None:
+        if failure < self.rate_limit_rate:
+            raise FakeLLMError("429 RESOURCE_EXHAUSTED: fake rate limit")
+        if failure < self.rate_limit_rate + self.error_rate:
+            raise FakeLLMError("500 INTERNAL: fake server error")
+
+    def generate(self, prompt, call_site, model_name, generation_config=None):
+        delay, failure = self._draw(prompt, call_site)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        self._raise_injected(failure)
+        return self._answer(prompt, call_site)
+
+    def generate_stream(self, prompt, call_site, model_name, generation_config=None):
+        """The same answer as generate(), in STREAM_CHUNKS pieces with the latency spread evenly across them"""
+        delay, failure = self._draw(prompt, call_site)
+        text = self._answer(prompt, call_site)
+        size = max(1, -(-len(text) // self.STREAM_CHUNKS))  # ceil division
+        chunks = [text[start:start + size] for start in range(0, len(text), size)] or [""]
+        for index, chunk in enumerate(chunks):
+            if delay > 0:
+                time.sleep(delay / len(chunks) / 1000.0)
+            if index == 0:
+                self._raise_injected(failure)
+            yield chunk
+
+    def _answer(self, prompt: str, call_site: str) -> str:
+        rng = random.Random(hashlib.sha256(f"{call_site}\n{prompt}".encode("utf-8")).hexdigest())
+        builder = getattr(self, f"_{call_site}", None)
+        if builder is None:
+            return self._text(rng, prompt)
+        result = builder(rng, prompt)
+        return result if isinstance(result, str) else json.dumps(result)
+
+    # ---------- response builders, one per call site ----------
+
+    @staticmethod
+    def _skills_in(rng: random.Random, prompt: str, count: int = 6) -> List[str]:
+        """Known skills mentioned in the prompt, topped up with random ones"""
+        lowered = prompt.lower()
+        found = [skill for skill in _SKILLS if skill.lower() in lowered]
+        rest = [skill for skill in _SKILLS if skill not in found]
+        rng.shuffle(rest)
+        return (found + rest)[:max(count, min(len(found), 12))]
+
+    @staticmethod
+    def _scores(rng: random.Random) -> Dict[str, int]:
+        scores = {metric: rng.randint(35, 95) for metric in
+                  ("technical_skills", "experience_relevance", "impact", "communication", "education")}
+        scores["overall"] = round(sum(scores.values()) / len(scores))
+        return scores
+
+    def _text(self, rng, prompt):
+        words = _WORD_RE.findall(prompt.lower())[-40:]
+        rng.shuffle(words)
+        return "Thank you for your question. " + " ".join(words[:25]).capitalize() + "."
+
+    def _hr_chatbot(self, rng, prompt):
+        return self._text(rng, prompt)
+
+    def _reference_letter(self, rng, prompt):
+        return "To Whom It May Concern,\n\n" + self._text(rng, prompt) + "\n\nSincerely,\nHR Manager"
+
+    def _policy_document(self, rng, prompt):
+        body = self._text(rng, prompt)
+        if "json" in prompt.lower():
+            return {"title": "Workplace Policy", "content": f"<h2>Purpose</h2><p>{body}</p>"}
+        return f"Purpose\n\n{body}\n\nScope\n\nThis policy applies to all employees."
+
+    def _resume_parsing(self, rng, prompt):
+        name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+        return {
+            "personal_info": {
+                "name": name,
+                "email": f"{name.lower().replace(' ', '.')}@example.com",
+                "phone": f"+1-555-{rng.randint(1000, 9999)}",
+                "location": "Remote",
+                "linkedin": None,
+                "github": None,
+            },
+            "summary": f"{name} is an experienced professional.",
+            "skills": self._skills_in(rng, prompt),
+            "experience": [{
+                "company": rng.choice(_COMPANIES),
+                "title": "Software Engineer",
+                "duration": f"{rng.randint(2012, 2020)} - Present",
+                "responsibilities": ["Delivered features end to end", "Mentored junior engineers"],
+            }],
+            "education": [{"degree": "B.Sc. Computer Science", "institution": "State University",
+                           "year": str(rng.randint(2008, 2020))}],
+            "certifications": [],
+            "projects": [{"name": "Internal Platform", "description": "Service used across teams",
+                          "technologies": self._skills_in(rng, prompt, 3)[:3]}],
+        }
+
+    def _resume_scoring(self, rng, prompt):
+        return self._scores(rng)
+
+    def _resume_scoring_batch(self, rng, prompt):
+        return [{"id": candidate_id, **self._scores(random.Random(f"{rng.random()}:{candidate_id}"))}
+                for candidate_id in _CANDIDATE_RE.findall(prompt)]
+
+    def _interview_questions(self, rng, prompt):
+        def questions(topic):
+            return [{"question": f"Tell us about your experience with {skill}.",
+                     "suggested_answer": f"A concrete example applying {skill} to {topic}.",
+                     "keywords": [skill, topic]}
+                    for skill in self._skills_in(rng, prompt, 3)[:3]]
+        return {
+            "project_questions": questions("projects"),
+            "resume_technical_questions": questions("resume"),
+            "jd_technical_questions": questions("the role"),
+            "experience_questions": questions("past roles"),
+            "certificate_questions": questions("certifications"),
+        }
+
+    def _learning_path(self, rng, prompt):
+        modules = [{
+            "module_name": f"{skill} Fundamentals",
+            "description": f"Build working knowledge of {skill}.",
+            "duration_weeks": rng.randint(1, 4),
+            "key_topics": [f"{skill} basics", f"Applied {skill}"],
+            "prerequisites": [],
+            "resources": [{"type": "course", "title": f"Intro to {skill}", "url": "https://example.com"}],
+        } for skill in self._skills_in(rng, prompt, 4)[:4]]
+        return {"learning_path": {
+            "title": "Personalized Learning Path",
+            "total_duration_weeks": sum(m["duration_weeks"] for m in modules),
+            "modules": modules,
+        }}
+
+    def _skill_recommendations(self, rng, prompt):
+        return {"skills": [{"skill": skill, "reason": f"{skill} is used widely in this role.",
+                            "priority": rng.choice(["high", "medium", "low"]),
+                            "timeframe": f"{rng.randint(1, 6)} months"}
+                           for skill in self._skills_in(rng, prompt, 5)[:5]]}
+
+    def _trending_skills(self, rng, prompt):
+        return {"skills": [{"skill": skill, "trend": rng.choice(["rising", "stable"]),
+                            "demand_level": rng.choice(["high", "medium"])}
+                           for skill in self._skills_in(rng, prompt, 5)[:5]]}
+
+    def _sentiment_analysis(self, rng, prompt):
+        positive = rng.randint(30, 70)
+        negative = rng.randint(5, 100 - positive)
+        return {
+            "overall_sentiment": "positive" if positive > 50 else "neutral",
+            "breakdown": {"positive": positive, "neutral": 100 - positive - negative, "negative": negative},
+            "themes": [{"theme": "Work-life balance", "sentiment": "positive", "count": rng.randint(1, 10)},
+                       {"theme": "Communication", "sentiment": "neutral", "count": rng.randint(1, 10)}],
+            "recommendations": ["Hold regular feedback sessions", "Recognize team achievements"],
+        }
+
+    def _wellness_tips(self, rng, prompt):
+        match = _TIP_CATEGORY_RE.search(prompt)
+        category = match.group(1).lower() if match else "general"
+        return [{"tip": f"Set aside {minutes} minutes a day for {category}.",
+                 "category": category, "difficulty": rng.choice(["easy", "medium"])}
+                for minutes in rng.sample(range(5, 35, 5), 3)]
+
+    def _job_description(self, rng, prompt):
+        skills = self._skills_in(rng, prompt, 6)
+        responsibilities = [f"Own delivery of {skill} work" for skill in skills[:3]]
+        if "role_definition" in prompt:
+            return {
+                "role_definition": {"Job_Title": "Specialist", "Summary": "Drives key initiatives.",
+                                    "Mission": "Deliver measurable impact."},
+                "responsibilities": responsibilities,
+                "must_have_skills": skills[:3],
+                "nice_to_have_skills": skills[3:6],
+                "tools": skills[:2],
+                "benefits": ["Health insurance", "Remote friendly"],
+                "structured_text": "\n".join(responsibilities),
+            }
+        return {
+            "job_title": "Specialist",
+            "company_name": rng.choice(_COMPANIES),
+            "location": "Remote",
+            "employment_type": "Full-time",
+            "salary_range": f"${rng.randint(60, 90)},000 - ${rng.randint(100, 150)},000",
+            "role_summary": "Drives key initiatives across the team.",
+            "responsibilities": responsibilities,
+            "minimum_qualifications": [f"Experience with {skill}" for skill in skills[:3]],
+            "preferred_qualifications": [f"Exposure to {skill}" for skill in skills[3:6]],
+            "about_team": "A collaborative, cross-functional team.",
+            "benefits": ["Health insurance", "Remote friendly"],
+        }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "fake": FakeLLMBackend.from_env,
+}
+
+
+def get_backend() -> LLMBackend:
+    """Return the process-wide backend, chosen by LLM_BACKEND on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                # GEMINI_API_KEY / LLM_BACKEND may only be set in backend/.env
+                load_dotenv(ENV_PATH)
+                name = os.getenv("LLM_BACKEND", "gemini").lower()
+                if name not in BACKENDS:
+                    print(f"⚠️ Unknown LLM_BACKEND '{name}', using gemini")
+                    name = "gemini"
+                _backend = BACKENDS[name]()
+    return _backend
+
+
+def set_backend(backend: Optional[LLMBackend]) -> Optional[LLMBackend]:
+    """Swap the process-wide backend (None re-reads LLM_BACKEND); returns the previous one"""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
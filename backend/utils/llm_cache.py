@@ -0,0 +1,282 @@
+"""
+LLM Response Cache
+Content-addressed cache for Gemini responses shared by every utils/ai_* module.
+
+Entries are keyed by a SHA-256 of (model, normalized prompt, generation config) and
+stored in a chain of tiers: an in-process LRU in front of a persistent SQLite file.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "instance" / "llm_cache.db"
+
+# Lifetime given to entries promoted from a slower tier into a faster one
+PROMOTED_TTL_SECONDS = 600
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so cosmetic prompt differences hash to the same key"""
+    return " ".join((prompt or "").split())
+
+
+def make_cache_key(model_name: str, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the content hash used as the cache key.
+
+    Args:
+        model_name: Gemini model name (e.g. gemini-2.5-flash)
+        prompt: Prompt text sent to the model
+        generation_config: Optional generation parameters (temperature, etc.)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps({
+        "model": model_name,
+        "prompt": normalize_prompt(prompt),
+        "config": generation_config or {}
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheTier:
+    """Interface every cache tier implements"""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, expires_at: float, call_site: str = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def delete_call_site(self, call_site: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryLRUTier(CacheTier):
+    """Thread-safe in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at, call_site)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _ = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at, call_site=None):
+        with self._lock:
+            self._entries[key] = (value, expires_at, call_site)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_call_site(self, call_site):
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v[2] == call_site]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteTier(CacheTier):
+    """
+    Persistent tier backed by a standalone SQLite file (independent of DATABASE_URL).
+    Expired rows are purged when the tier opens and every `purge_every` writes, which also
+    trims the file to the newest `max_rows` entries (0 = no cap), so unique prompts do not
+    grow it without bound.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_rows: int = 50000, purge_every: int = 500):
+        self.path = str(path)
+        self.max_rows = max_rows
+        self.purge_every = max(1, purge_every)
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    call_site TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_call_site ON llm_cache (call_site)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_expires_at ON llm_cache (expires_at)")
+        self.purge_expired()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, expires_at FROM llm_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+                return None
+            return row[0]
+
+    def set(self, key, value, expires_at, call_site=None):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (cache_key, call_site, response, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, call_site, value, time.time(), expires_at)
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                self._purge(conn)
+
+    def delete(self, key):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+
+    def delete_call_site(self, call_site):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache WHERE call_site = ?", (call_site,))
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def purge_expired(self):
+        """Drop expired rows, then the oldest ones beyond max_rows; returns the number removed"""
+        with self._lock, self._connect() as conn:
+            return self._purge(conn)
+
+    def _purge(self, conn):
+        removed = conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        if self.max_rows:
+            excess = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_rows
+            if excess > 0:
+                removed += conn.execute(
+                    "DELETE FROM llm_cache WHERE cache_key IN "
+                    "(SELECT cache_key FROM llm_cache ORDER BY created_at LIMIT ?)", (excess,)
+                ).rowcount
+        return removed
+
+
+class LLMResponseCache:
+    """
+    Read-through chain of cache tiers.
+    A hit in a slower tier is promoted into the faster tiers in front of it.
+    """
+
+    def __init__(self, tiers):
+        self.tiers = list(tiers)
+
+    def get(self, key: str, call_site: str = None) -> Optional[str]:
+        for index, tier in enumerate(self.tiers):
+            try:
+                value = tier.get(key)
+            except Exception as e:
+                print(f"⚠️ LLM cache read error ({type(tier).__name__}): {e}")
+                continue
+            if value is not None:
+                # Remaining lifetime is unknown to faster tiers; give them a short one
+                for faster in self.tiers[:index]:
+                    faster.set(key, value, time.time() + PROMOTED_TTL_SECONDS, call_site)
+                return value
+        return None
+
+    def set(self, key: str, value: str, ttl: int, call_site: str = None) -> None:
+        expires_at = time.time() + ttl
+        for tier in self.tiers:
+            try:
+                tier.set(key, value, expires_at, call_site)
+            except Exception as e:
+                print(f"⚠️ LLM cache write error ({type(tier).__name__}): {e}")
+
+    def invalidate(self, key: str) -> None:
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def invalidate_call_site(self, call_site: str) -> None:
+        for tier in self.tiers:
+            tier.delete_call_site(call_site)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[LLMResponseCache]:
+    """
+    Return the process-wide cache, building it from environment settings on first use.
+
+    LLM_CACHE_ENABLED      - "false" disables caching entirely (default: true)
+    LLM_CACHE_MAX_ENTRIES  - size of the in-process LRU (default: 512)
+    LLM_CACHE_PATH         - SQLite file for the persistent tier; "" disables it
+    LLM_CACHE_MAX_ROWS     - newest entries kept in the persistent tier; 0 = no cap (default: 50000)
+    LLM_CACHE_PURGE_EVERY  - persistent-tier writes between purges of expired / excess rows (default: 500)
+    """
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                tiers = [MemoryLRUTier(int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")))]
+                cache_path = os.getenv("LLM_CACHE_PATH", str(DEFAULT_CACHE_PATH))
+                if cache_path:
+                    try:
+                        tiers.append(SQLiteTier(cache_path,
+                                                max_rows=int(os.getenv("LLM_CACHE_MAX_ROWS", "50000")),
+                                                purge_every=int(os.getenv("LLM_CACHE_PURGE_EVERY", "500"))))
+                    except Exception as e:
+                        print(f"⚠️ LLM cache: persistent tier disabled ({e})")
+                _cache = LLMResponseCache(tiers)
+    return _cache
+
+
+def set_cache(cache: Optional[LLMResponseCache]) -> None:
+    """Swap the process-wide cache (e.g. for a Redis-backed tier chain)"""
+    global _cache
+    _cache = cache
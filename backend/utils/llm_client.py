@@ -0,0 +1,186 @@
+"""
+LLM Client
+Single entry point for Gemini text generation used by every utils/ai_* module.
+Responses are served from the shared content-addressed cache (utils/llm_cache.py)
+when an identical (model, prompt, generation config) was answered before.
+Calls go to the backend selected by LLM_BACKEND (utils/llm_backends.py) and
+are recorded per call site by utils/llm_telemetry.py. stream_text is the
+streaming counterpart of generate_text, for answers shown as they are produced.
+Callers that cannot use a response report it with reject_response, which evicts it.
+"""
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from utils.llm_backends import get_backend
+from utils.llm_cache import get_cache, make_cache_key
+from utils import llm_telemetry
+
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+DEFAULT_TTL = 60 * 60  # 1 hour
+
+# Cache lifetime (seconds) per call site. 0 disables caching for that site.
+CALL_SITE_TTLS = {
+    "resume_scoring": 7 * 24 * 3600,
+    "resume_scoring_batch": 7 * 24 * 3600,
+    "resume_parsing": 30 * 24 * 3600,
+    "interview_questions": 7 * 24 * 3600,
+    "learning_path": 7 * 24 * 3600,
+    "skill_recommendations": 24 * 3600,
+    "trending_skills": 24 * 3600,
+    "sentiment_analysis": 24 * 3600,
+    "reference_letter": 24 * 3600,
+    "policy_document": 60 * 60,
+    "job_description": 60 * 60,
+    "wellness_tips": 60 * 60,
+    "hr_chatbot": 15 * 60,
+    "chat_summary": 0,  # every fold is over new messages
+}
+
+
+def llm_available() -> bool:
+    """True when the configured backend can serve calls (Gemini needs GEMINI_API_KEY)"""
+    return get_backend().available
+
+
+def active_model_name(model_name: str = DEFAULT_MODEL) -> str:
+    """Model name to record next to stored results, so fake-backend output is never reused for Gemini"""
+    return get_backend().cache_model_name(model_name)
+
+
+def generate_text(prompt: str, call_site: str, model_name: str = DEFAULT_MODEL,
+                  generation_config: Optional[Dict[str, Any]] = None,
+                  ttl: Optional[int] = None, use_cache: bool = True) -> str:
+    """
+    Generate text with the configured backend, serving repeated prompts from the response cache.
+
+    Args:
+        prompt: Prompt text
+        call_site: Logical caller name (selects the TTL, used for invalidation)
+        model_name: Gemini model name
+        generation_config: Optional generation parameters passed to Gemini
+        ttl: Override the call site's cache lifetime in seconds
+        use_cache: False forces a fresh Gemini call (the result is still stored)
+
+    Returns:
+        Raw response text ("" when the model returns nothing). Backend errors propagate.
+    """
+    if ttl is None:
+        ttl = CALL_SITE_TTLS.get(call_site, DEFAULT_TTL)
+
+    backend = get_backend()
+    cache = get_cache() if ttl > 0 else None
+    key = make_cache_key(active_model_name(model_name), prompt, generation_config) if cache else None
+    started = time.perf_counter()
+
+    if cache and use_cache:
+        cached = cache.get(key, call_site)
+        if cached is not None:
+            llm_telemetry.record_call(call_site, model_name, prompt, cached,
+                                      (time.perf_counter() - started) * 1000.0, "hit", "ok")
+            return cached
+
+    lookup = "miss" if cache and use_cache else "bypass"
+    try:
+        text = backend.generate(prompt, call_site, model_name, generation_config) or ""
+    except Exception as e:
+        llm_telemetry.record_call(call_site, model_name, prompt, None, (time.perf_counter() - started) * 1000.0,
+                                  lookup, llm_telemetry.error_kind(e), usage=backend.last_usage(), error=e)
+        raise
+    llm_telemetry.record_call(call_site, model_name, prompt, text, (time.perf_counter() - started) * 1000.0,
+                              lookup, "ok" if text.strip() else "empty", usage=backend.last_usage())
+
+    # Only successful, non-empty answers are worth replaying
+    if cache and text.strip():
+        cache.set(key, text, ttl, call_site)
+
+    return text
+
+
+def stream_text(prompt: str, call_site: str, model_name: str = DEFAULT_MODEL,
+                generation_config: Optional[Dict[str, Any]] = None,
+                ttl: Optional[int] = None, use_cache: bool = True) -> Iterator[str]:
+    """
+    Like generate_text, but yields the response in chunks as the backend produces them.
+    A cached response is yielded as a single chunk. The joined chunks are cached once the
+    stream completes; a stream the consumer abandons is recorded as "cancelled" and not cached.
+    Backend errors propagate from the iterator, possibly after some chunks were yielded.
+    """
+    if ttl is None:
+        ttl = CALL_SITE_TTLS.get(call_site, DEFAULT_TTL)
+
+    backend = get_backend()
+    cache = get_cache() if ttl > 0 else None
+    key = make_cache_key(active_model_name(model_name), prompt, generation_config) if cache else None
+    started = time.perf_counter()
+
+    if cache and use_cache:
+        cached = cache.get(key, call_site)
+        if cached is not None:
+            llm_telemetry.record_call(call_site, model_name, prompt, cached,
+                                      (time.perf_counter() - started) * 1000.0, "hit", "ok")
+            yield cached
+            return
+
+    lookup = "miss" if cache and use_cache else "bypass"
+    chunks = []
+    first_chunk_ms = None
+    try:
+        for chunk in backend.generate_stream(prompt, call_site, model_name, generation_config):
+            if not chunk:
+                continue
+            if first_chunk_ms is None:
+                first_chunk_ms = (time.perf_counter() - started) * 1000.0
+            chunks.append(chunk)
+            yield chunk
+    except GeneratorExit:
+        llm_telemetry.record_call(call_site, model_name, prompt, "".join(chunks),
+                                  (time.perf_counter() - started) * 1000.0, lookup, "cancelled",
+                                  first_chunk_ms=first_chunk_ms)
+        raise
+    except Exception as e:
+        llm_telemetry.record_call(call_site, model_name, prompt, "".join(chunks) or None,
+                                  (time.perf_counter() - started) * 1000.0, lookup, llm_telemetry.error_kind(e),
+                                  usage=backend.last_usage(), error=e, first_chunk_ms=first_chunk_ms)
+        raise
+
+    text = "".join(chunks)
+    llm_telemetry.record_call(call_site, model_name, prompt, text, (time.perf_counter() - started) * 1000.0,
+                              lookup, "ok" if text.strip() else "empty", usage=backend.last_usage(),
+                              first_chunk_ms=first_chunk_ms)
+    if cache and text.strip():
+        cache.set(key, text, ttl, call_site)
+
+
+def invalidate_prompt(prompt: str, model_name: str = DEFAULT_MODEL,
+                      generation_config: Optional[Dict[str, Any]] = None) -> None:
+    """Drop the cached response for one exact prompt"""
+    cache = get_cache()
+    if cache:
+        cache.invalidate(make_cache_key(active_model_name(model_name), prompt, generation_config))
+
+
+def reject_response(prompt: str, call_site: str, kind: str = "json_error", model_name: str = DEFAULT_MODEL,
+                    generation_config: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Report that the response to a prompt was unusable (e.g. not valid JSON): counts a parse
+    failure in LLM telemetry and drops the cached response, so a retry asks the model again
+    instead of replaying the bad answer for the call site's whole TTL.
+    """
+    llm_telemetry.record_parse_failure(call_site, kind)
+    invalidate_prompt(prompt, model_name, generation_config)
+
+
+def invalidate_call_site(call_site: str) -> None:
+    """Drop every cached response produced by a call site (e.g. after a prompt change)"""
+    cache = get_cache()
+    if cache:
+        cache.invalidate_call_site(call_site)
+
+
+def clear_cache() -> None:
+    """Drop every cached LLM response"""
+    cache = get_cache()
+    if cache:
+        cache.clear()
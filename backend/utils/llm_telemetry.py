@@ -0,0 +1,300 @@
+"""
+LLM Telemetry
+Per-call-site metrics for every generate_text call (utils/llm_client.py).
+
+Each call records wall time, prompt / response characters and tokens, cache
+hit or miss, outcome and an estimated cost; streamed calls (stream_text) also
+record the time to their first chunk. The ai_* modules report JSON parse
+failures and the scoring engine reports rate-limit retries against the same
+call site. Aggregates (counters plus latency / token histograms) are served by
+LlmMetricsResource at /api/metrics/llm.
+
+Token counts come from the backend when it reports usage (Gemini
+usage_metadata) and are estimated at ~4 characters per token otherwise.
+
+LLM_TELEMETRY_ENABLED       - "false" turns recording off (default: on)
+LLM_TELEMETRY_PERSIST       - "true" also writes an AIInteractionLog row per call
+                              made inside an authenticated request (default: off)
+LLM_PRICE_INPUT_PER_1M      - USD per 1M prompt tokens for cost estimates (default: 0.30)
+LLM_PRICE_OUTPUT_PER_1M     - USD per 1M response tokens (default: 2.50)
+"""
+import json
+import os
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+LLM_TELEMETRY_ENABLED = os.getenv("LLM_TELEMETRY_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_TELEMETRY_PERSIST = os.getenv("LLM_TELEMETRY_PERSIST", "false").lower() in ("1", "true", "yes")
+LLM_PRICE_INPUT_PER_1M = float(os.getenv("LLM_PRICE_INPUT_PER_1M", "0.30"))
+LLM_PRICE_OUTPUT_PER_1M = float(os.getenv("LLM_PRICE_OUTPUT_PER_1M", "2.50"))
+
+CHARS_PER_TOKEN = 4
+
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+TOKEN_BUCKETS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000]
+
+_PERSIST_TEXT_CHARS = 4000
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count for backends that do not report usage"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def error_kind(error: BaseException) -> str:
+    """Classify a backend error as rate_limited, timeout or error"""
+    message = str(error)
+    if "429" in message or "RESOURCE_EXHAUSTED" in message or "rate limit" in message.lower():
+        return "rate_limited"
+    if isinstance(error, TimeoutError) or "DEADLINE_EXCEEDED" in message:
+        return "timeout"
+    return "error"
+
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are bucket upper bounds, capped at the observed max"""
+
+    def __init__(self, bounds: List[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(float(self.bounds[index]), self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound}": n for bound, n in zip(self.bounds, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 2) if self.count else 0,
+            "p50": round(self.percentile(50), 2),
+            "p95": round(self.percentile(95), 2),
+            "p99": round(self.percentile(99), 2),
+            "max": round(self.max, 2),
+            "buckets": buckets,
+        }
+
+
+class CallSiteStats:
+    """Running totals for one call site"""
+
+    def __init__(self):
+        self.calls = 0
+        self.outcomes = Counter()  # ok / empty / error / rate_limited / timeout / cancelled
+        self.cache = Counter()  # hit / miss / bypass
+        self.parse_failures = Counter()  # json_error / no_json / fallback
+        self.retries = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self.estimated_tokens = 0  # calls whose token counts were estimated
+        self.cost_usd = 0.0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)  # backend calls only
+        self.cache_hit_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.first_chunk_ms = Histogram(LATENCY_BUCKETS_MS)  # streamed backend calls only
+        self.prompt_token_hist = Histogram(TOKEN_BUCKETS)
+        self.response_token_hist = Histogram(TOKEN_BUCKETS)
+        self.last_error = None
+
+    def to_dict(self, call_site: str) -> Dict[str, Any]:
+        lookups = self.cache["hit"] + self.cache["miss"]
+        return {
+            "call_site": call_site,
+            "calls": self.calls,
+            "outcomes": dict(self.outcomes),
+            "cache": dict(self.cache),
+            "cache_hit_rate": round(self.cache["hit"] / lookups, 3) if lookups else 0,
+            "parse_failures": dict(self.parse_failures),
+            "retries": self.retries,
+            "prompt_chars": self.prompt_chars,
+            "response_chars": self.response_chars,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "estimated_token_calls": self.estimated_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "latency_ms": self.latency_ms.to_dict(),
+            "cache_hit_latency_ms": self.cache_hit_ms.to_dict(),
+            "first_chunk_ms": self.first_chunk_ms.to_dict(),
+            "prompt_tokens_hist": self.prompt_token_hist.to_dict(),
+            "response_tokens_hist": self.response_token_hist.to_dict(),
+            "last_error": self.last_error,
+        }
+
+
+_sites = {}  # call_site -> CallSiteStats
+_sites_lock = threading.Lock()
+
+
+def _stats(call_site: str) -> CallSiteStats:
+    stats = _sites.get(call_site)
+    if stats is None:
+        stats = _sites.setdefault(call_site, CallSiteStats())
+    return stats
+
+
+# ==================== RECORDING ====================
+
+def record_call(call_site: str, model_name: str, prompt: str, response: Optional[str],
+                latency_ms: float, cache: str, outcome: str,
+                usage: Optional[Dict[str, int]] = None, error: Optional[BaseException] = None,
+                first_chunk_ms: Optional[float] = None) -> None:
+    """
+    Record one generate_text call.
+
+    Args:
+        call_site: Logical caller name
+        model_name: Requested model (used for the persisted log only)
+        prompt: Prompt text
+        response: Response text (None when the call failed)
+        latency_ms: Wall time of the whole call, cache lookup included
+        cache: "hit", "miss" or "bypass"
+        outcome: "ok", "empty", "error", "rate_limited", "timeout" or "cancelled"
+            (a stream the consumer stopped reading)
+        usage: {"prompt_tokens", "response_tokens"} reported by the backend, if any
+        error: The backend exception for failed calls
+        first_chunk_ms: Time to the first streamed chunk, for streamed backend calls
+    """
+    if not LLM_TELEMETRY_ENABLED:
+        return
+
+    response = response or ""
+    if usage:
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        response_tokens = int(usage.get("response_tokens") or 0)
+    else:
+        prompt_tokens, response_tokens = estimate_tokens(prompt), estimate_tokens(response)
+    billed = cache != "hit" and outcome in ("ok", "empty", "cancelled")
+    cost = (prompt_tokens * LLM_PRICE_INPUT_PER_1M + response_tokens * LLM_PRICE_OUTPUT_PER_1M) / 1e6 if billed else 0.0
+
+    with _sites_lock:
+        stats = _stats(call_site)
+        stats.calls += 1
+        stats.outcomes[outcome] += 1
+        stats.cache[cache] += 1
+        stats.prompt_chars += len(prompt)
+        stats.response_chars += len(response)
+        if cache == "hit":
+            stats.cache_hit_ms.observe(latency_ms)
+        else:
+            stats.latency_ms.observe(latency_ms)
+        if first_chunk_ms is not None:
+            stats.first_chunk_ms.observe(first_chunk_ms)
+        if billed:
+            stats.prompt_tokens += prompt_tokens
+            stats.response_tokens += response_tokens
+            stats.prompt_token_hist.observe(prompt_tokens)
+            stats.response_token_hist.observe(response_tokens)
+            if not usage:
+                stats.estimated_tokens += 1
+        stats.cost_usd += cost
+        if error is not None:
+            stats.last_error = str(error)[:300]
+
+    if LLM_TELEMETRY_PERSIST:
+        _persist(call_site, model_name, prompt, response, {
+            "latency_ms": round(latency_ms, 2), "cache": cache, "outcome": outcome,
+            "prompt_tokens": prompt_tokens, "response_tokens": response_tokens,
+            "cost_usd": round(cost, 6), "model": model_name,
+        })
+
+
+def record_parse_failure(call_site: str, kind: str = "json_error") -> None:
+    """Count a response the caller could not parse ("json_error", "no_json", "no_valid_items") or only parsed leniently ("fallback")"""
+    if not LLM_TELEMETRY_ENABLED:
+        return
+    with _sites_lock:
+        _stats(call_site).parse_failures[kind] += 1
+
+
+def record_retry(call_site: str) -> None:
+    """Count a caller-side retry of a failed call"""
+    if not LLM_TELEMETRY_ENABLED:
+        return
+    with _sites_lock:
+        _stats(call_site).retries += 1
+
+
+def _current_user_id() -> Optional[int]:
+    """User of the authenticated request on this thread, or None"""
+    try:
+        from flask import has_request_context
+        from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+        if not has_request_context():
+            return None
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        return int(identity) if identity is not None else None
+    except Exception:
+        return None
+
+
+def _persist(call_site: str, model_name: str, prompt: str, response: str, context: Dict[str, Any]) -> None:
+    """Write an AIInteractionLog row in its own session, so the caller's unit of work is untouched"""
+    user_id = _current_user_id()
+    if user_id is None:
+        return
+    try:
+        from sqlalchemy.orm import Session
+        from models import db, AIInteractionLog
+
+        with Session(db.engine) as session:
+            session.add(AIInteractionLog(
+                user_id=user_id,
+                interaction_type=call_site,
+                query=prompt[:_PERSIST_TEXT_CHARS],
+                response=response[:_PERSIST_TEXT_CHARS],
+                context=json.dumps(context),
+            ))
+            session.commit()
+    except Exception as e:
+        print(f"⚠️ LLM telemetry persist failed for {call_site}: {e}")
+
+
+# ==================== READS ====================
+
+def call_site_stats(call_site: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Per-call-site aggregates, most expensive first"""
+    with _sites_lock:
+        rows = [stats.to_dict(site) for site, stats in _sites.items()
+                if call_site is None or site == call_site]
+    return sorted(rows, key=lambda row: (row["cost_usd"], row["calls"]), reverse=True)
+
+
+def totals() -> Dict[str, Any]:
+    """Calls, tokens and cost summed over every call site"""
+    rows = call_site_stats()
+    return {
+        "calls": sum(row["calls"] for row in rows),
+        "prompt_tokens": sum(row["prompt_tokens"] for row in rows),
+        "response_tokens": sum(row["response_tokens"] for row in rows),
+        "cost_usd": round(sum(row["cost_usd"] for row in rows), 6),
+        "parse_failures": sum(sum(row["parse_failures"].values()) for row in rows),
+        "retries": sum(row["retries"] for row in rows),
+    }
+
+
+def reset() -> None:
+    with _sites_lock:
+        _sites.clear()
@@ -0,0 +1,68 @@
+"""
+Pagination Helpers
+Opaque keyset cursors shared by the paginated listing endpoints.
+
+A cursor carries the sort key and primary key of the last row of a page; the
+next page starts strictly after that pair, so each page is an index range scan
+whatever its depth, unlike OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+
+
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 500
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque URL-safe cursor for the given key values (datetimes are stored as ISO strings)"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> List[Any]:
+    """Key values from encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_sort(raw: Optional[str], allowed: Dict[str, Any], default: str) -> Tuple[str, bool]:
+    """
+    Parse "?sort=field" / "?sort=-field" (descending).
+
+    Returns:
+        (field, descending); raises ValueError for a field not in allowed
+    """
+    raw = (raw or default).strip()
+    descending = raw.startswith("-")
+    field = raw.lstrip("-")
+    if field not in allowed:
+        raise ValueError(f"Unsupported sort '{field}', expected one of: {', '.join(sorted(allowed))}")
+    return field, descending
+
+
+def page_size(raw: Optional[int], default: Optional[int] = PAGE_SIZE_DEFAULT) -> Optional[int]:
+    """Clamp a requested page size; None (no limit) when neither a size nor a default is given"""
+    if raw is None:
+        return default
+    return max(1, min(raw, PAGE_SIZE_MAX))
+
+
+def apply_keyset(query, columns: Sequence[Any], cursor: Optional[List[Any]], descending: bool):
+    """Order by columns (the last one unique) and start after the cursor row"""
+    if cursor is not None:
+        if len(cursor) != len(columns):
+            raise ValueError("Invalid cursor")
+        after = tuple_(*columns) < tuple_(*cursor) if descending else tuple_(*columns) > tuple_(*cursor)
+        query = query.filter(after)
+    return query.order_by(*[column.desc() if descending else column.asc() for column in columns])
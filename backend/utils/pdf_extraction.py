@@ -0,0 +1,142 @@
+"""
+PDF Text Extraction
+Page-by-page resume text extraction with PyPDF2, falling back to pdfplumber only
+for pages PyPDF2 returns empty. Large documents are split into page ranges and
+extracted in a process pool. Page and byte caps keep huge or scanned files cheap.
+PyPDF2 and pdfplumber are imported on first use, not at app startup.
+"""
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))  # 10 MB
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Below this many pages a process pool costs more than it saves
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "8"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Callers are worker threads and forking a threaded process is unsafe,
+            # so workers are forked from a fork server that has this module and PyPDF2 preloaded
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload([__name__, "PyPDF2"])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS, mp_context=context)
+        return _pool
+
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> List[Dict[str, Any]]:
+    """
+    Extract pages [start, stop) of a PDF held in memory.
+    Runs in worker processes, so it takes raw bytes and returns plain dicts.
+    """
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    plumber_pdf = None
+    pages = []
+    try:
+        for index in range(start, stop):
+            started = time.perf_counter()
+            method = "pypdf2"
+            try:
+                text = reader.pages[index].extract_text() or ""
+            except Exception:
+                text = ""
+
+            if not text.strip():
+                # Imported lazily: only needed for pages PyPDF2 cannot read
+                try:
+                    if plumber_pdf is None:
+                        import pdfplumber
+                        plumber_pdf = pdfplumber.open(io.BytesIO(data))
+                    text = plumber_pdf.pages[index].extract_text() or ""
+                    method = "pdfplumber"
+                except Exception:
+                    text = ""
+
+            pages.append({
+                "page": index + 1,
+                "text": text,
+                "method": method,
+                "seconds": round(time.perf_counter() - started, 4),
+            })
+    finally:
+        if plumber_pdf is not None:
+            plumber_pdf.close()
+    return pages
+
+
+def extract_pdf(file_path: str, max_pages: int = None, max_bytes: int = None) -> Dict[str, Any]:
+    """
+    Extract text from a PDF, one pass per page.
+
+    Args:
+        file_path: Path to the PDF
+        max_pages: Pages beyond this are skipped (default PDF_MAX_PAGES)
+        max_bytes: Larger files are rejected (default PDF_MAX_BYTES)
+
+    Returns:
+        {"text": str, "page_count": int, "pages_extracted": int, "truncated": bool,
+         "pages": [{"page", "chars", "method", "seconds"}], "seconds": float}
+
+    Raises:
+        ValueError: File too large or not a readable PDF
+    """
+    max_pages = max_pages or PDF_MAX_PAGES
+    max_bytes = max_bytes or PDF_MAX_BYTES
+
+    size = os.path.getsize(file_path)
+    if size > max_bytes:
+        raise ValueError(f"File is too large ({size // 1024} KB, limit {max_bytes // 1024} KB)")
+
+    started = time.perf_counter()
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    from PyPDF2 import PdfReader
+
+    try:
+        page_count = len(PdfReader(io.BytesIO(data)).pages)
+    except Exception as e:
+        raise ValueError(f"Failed to read PDF: {str(e)}")
+    limit = min(page_count, max_pages)
+
+    if limit >= PARALLEL_PAGE_THRESHOLD and PDF_EXTRACT_WORKERS > 1:
+        chunk = -(-limit // PDF_EXTRACT_WORKERS)  # ceil division
+        ranges = [(start, min(start + chunk, limit)) for start in range(0, limit, chunk)]
+        try:
+            futures = [_get_pool().submit(_extract_page_range, data, start, stop) for start, stop in ranges]
+            pages = [page for future in futures for page in future.result()]
+        except Exception as e:
+            print(f"⚠️ Parallel PDF extraction failed, extracting in-process: {e}")
+            pages = _extract_page_range(data, 0, limit)
+    else:
+        pages = _extract_page_range(data, 0, limit)
+
+    return {
+        "text": "\n".join(p["text"] for p in pages if p["text"]),
+        "page_count": page_count,
+        "pages_extracted": limit,
+        "truncated": page_count > limit,
+        "pages": [
+            {"page": p["page"], "chars": len(p["text"]), "method": p["method"], "seconds": p["seconds"]}
+            for p in pages
+        ],
+        "seconds": round(time.perf_counter() - started, 4),
+    }
@@ -0,0 +1,210 @@
+"""
+Policy Retrieval Index
+BM25 index over chunks of Policy.content for the HR chatbot. Only the top-k chunks
+relevant to a question go into the prompt, so prompt size no longer grows with the
+policy library. The index lives in memory and is refreshed incrementally: a refresh
+compares cheap per-policy signatures and re-chunks only new or changed policies.
+Searches refresh only after a committed write to the policies table in this process
+or, for writes by other workers, once POLICY_INDEX_RECHECK_SECONDS have passed.
+"""
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import db, Policy
+from utils import response_cache
+
+
+POLICY_TOP_K = int(os.getenv("POLICY_TOP_K", "5"))
+POLICY_CHUNK_WORDS = int(os.getenv("POLICY_CHUNK_WORDS", "180"))
+POLICY_CHUNK_OVERLAP = int(os.getenv("POLICY_CHUNK_OVERLAP", "30"))
+POLICY_INDEX_RECHECK_SECONDS = int(os.getenv("POLICY_INDEX_RECHECK_SECONDS", "300"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Title and category words count this many times in every chunk of the policy
+TITLE_BOOST = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from",
+    "how", "i", "if", "in", "is", "it", "its", "me", "my", "of", "on", "or", "our", "should",
+    "that", "the", "their", "this", "to", "was", "we", "what", "when", "where", "which",
+    "who", "will", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def chunk_text(text: str, max_words: int = POLICY_CHUNK_WORDS,
+               overlap: int = POLICY_CHUNK_OVERLAP) -> List[str]:
+    """
+    Split policy text into chunks of at most max_words words.
+    Paragraphs are kept together where they fit; longer ones are cut into
+    overlapping windows so a clause is never split without context.
+    """
+    chunks, current = [], []
+    for paragraph in _PARAGRAPH_RE.split(text or ""):
+        words = paragraph.split()
+        if not words:
+            continue
+        if len(words) > max_words:
+            if current:
+                chunks.append(" ".join(current))
+                current = []
+            step = max(1, max_words - overlap)
+            for start in range(0, len(words), step):
+                chunks.append(" ".join(words[start:start + max_words]))
+                if start + max_words >= len(words):
+                    break
+            continue
+        if current and len(current) + len(words) > max_words:
+            chunks.append(" ".join(current))
+            current = []
+        current.extend(words)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class PolicyIndex:
+    """
+    Chunk-level BM25 index keyed by (policy_id, chunk number).
+    Policies are added and removed individually, so a changed policy only
+    re-chunks itself.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)  # token -> {chunk_id: term frequency}
+        self.chunks = {}  # chunk_id -> {"policy_id", "title", "category", "text"}
+        self.chunk_lengths = {}
+        self.policy_chunks = {}  # policy_id -> [chunk_id]
+        self.policy_tokens = {}  # policy_id -> tokens it has postings under
+        self.signatures = {}  # policy_id -> signature the policy was indexed at
+        self.total_length = 0
+        self._lock = threading.RLock()
+
+    def remove_policy(self, policy_id: int) -> None:
+        with self._lock:
+            for chunk_id in self.policy_chunks.pop(policy_id, []):
+                self.total_length -= self.chunk_lengths.pop(chunk_id, 0)
+                self.chunks.pop(chunk_id, None)
+            for token in self.policy_tokens.pop(policy_id, ()):
+                docs = self.postings.get(token, {})
+                for chunk_id in [cid for cid in docs if cid[0] == policy_id]:
+                    del docs[chunk_id]
+                if not docs:
+                    self.postings.pop(token, None)
+            self.signatures.pop(policy_id, None)
+
+    def add_policy(self, policy: Policy, signature: Tuple) -> None:
+        with self._lock:
+            self.remove_policy(policy.policy_id)
+            heading_tokens = tokenize(f"{policy.title or ''} {policy.category or ''}") * TITLE_BOOST
+            chunk_ids, tokens = [], set()
+            for number, text in enumerate(chunk_text(policy.content)):
+                chunk_id = (policy.policy_id, number)
+                counts = Counter(tokenize(text) + heading_tokens)
+                self.chunks[chunk_id] = {
+                    "policy_id": policy.policy_id,
+                    "title": policy.title,
+                    "category": policy.category,
+                    "text": text
+                }
+                self.chunk_lengths[chunk_id] = sum(counts.values())
+                self.total_length += self.chunk_lengths[chunk_id]
+                for token, tf in counts.items():
+                    self.postings[token][chunk_id] = tf
+                tokens.update(counts)
+                chunk_ids.append(chunk_id)
+            self.policy_chunks[policy.policy_id] = chunk_ids
+            self.policy_tokens[policy.policy_id] = tokens
+            self.signatures[policy.policy_id] = signature
+
+    def search(self, query: str, top_k: int = POLICY_TOP_K) -> List[Dict[str, Any]]:
+        """Top-k chunks for a question, best first, as {"title", "category", "content", "score"}"""
+        with self._lock:
+            chunk_count = len(self.chunk_lengths)
+            if not chunk_count:
+                return []
+            avg_length = self.total_length / chunk_count
+            scores = defaultdict(float)
+            for token in set(tokenize(query)):
+                postings = self.postings.get(token)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (chunk_count - df + 0.5) / (df + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = 1 - BM25_B + BM25_B * (self.chunk_lengths[chunk_id] / (avg_length or 1))
+                    scores[chunk_id] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            return [{
+                "title": self.chunks[chunk_id]["title"],
+                "category": self.chunks[chunk_id]["category"],
+                "content": self.chunks[chunk_id]["text"],
+                "score": round(score, 4)
+            } for chunk_id, score in best]
+
+
+_index = PolicyIndex()
+_refresh_lock = threading.Lock()
+_policy_writes = [0]  # committed writes to the policies table seen by this process
+_checked = {"at": 0.0, "writes": 0}  # last refresh: time and _policy_writes at that point
+
+
+def refresh_index() -> PolicyIndex:
+    """
+    Bring the shared index in line with the policies table.
+    Reads only (id, updated_at, version, content length) for every policy and loads
+    full content just for policies that are new or changed since they were indexed.
+    Skipped while no policy was written and the last refresh is recent.
+    """
+    if _checked["writes"] == _policy_writes[0] and time.time() - _checked["at"] < POLICY_INDEX_RECHECK_SECONDS:
+        return _index
+
+    with _refresh_lock:
+        writes = _policy_writes[0]
+        rows = db.session.query(
+            Policy.policy_id, Policy.updated_at, Policy.version, db.func.length(Policy.content)
+        ).all()
+        current = {row[0]: tuple(row[1:]) for row in rows}
+
+        for policy_id in set(_index.signatures) - set(current):
+            _index.remove_policy(policy_id)
+
+        stale = [pid for pid, signature in current.items() if _index.signatures.get(pid) != signature]
+        if stale:
+            for policy in Policy.query.filter(Policy.policy_id.in_(stale)).all():
+                _index.add_policy(policy, current[policy.policy_id])
+        _checked.update(at=time.time(), writes=writes)
+    return _index
+
+
+def _on_tables_changed(tables) -> None:
+    if Policy.__tablename__ in tables:
+        _policy_writes[0] += 1
+
+
+response_cache.subscribe(_on_tables_changed)
+
+
+def search_policies(question: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Policy chunks most relevant to the question, for the chatbot prompt"""
+    try:
+        return refresh_index().search(question, top_k or POLICY_TOP_K)
+    except Exception as e:
+        print(f"Error searching policies: {e}")
+        return []
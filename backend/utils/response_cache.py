@@ -0,0 +1,165 @@
+"""
+Response Cache
+Short-lived cache of serialized JSON responses for read-heavy Flask-RESTful GETs.
+
+Each cached endpoint declares the models it reads. SQLAlchemy session events record
+which models a transaction touched and, after it commits, drop every cached response
+that depends on one of them. Responses carry an ETag, so a client that sends a
+matching If-None-Match gets a bodyless 304.
+
+The cache is per process; the TTL bounds staleness from writes made by other workers.
+Other in-process caches can subscribe() to the same commit-time table invalidations.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from flask import Response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+_entries = {}  # key -> (body bytes, etag, expires_at, tables)
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0}
+_generation = [0]  # bumped on every invalidation
+_subscribers = []  # callback(tables) run after every invalidation
+
+_CHANGED = "response_cache_changed_tables"
+
+
+def _table_names(models: Iterable) -> frozenset:
+    return frozenset(getattr(m, "__tablename__", m) for m in models)
+
+
+def invalidate_tables(tables: Iterable[str]) -> int:
+    """Drop cached responses that depend on any of the given tables"""
+    tables = set(tables)
+    if not tables:
+        return 0
+    with _lock:
+        _generation[0] += 1
+        stale = [key for key, entry in _entries.items() if entry[3] & tables]
+        for key in stale:
+            del _entries[key]
+        _stats["invalidations"] += len(stale)
+    for callback in _subscribers:
+        callback(tables)
+    return len(stale)
+
+
+def subscribe(callback: Callable[[set], None]) -> None:
+    """Call callback(tables) whenever committed writes (or invalidate_tables) touch tables"""
+    _subscribers.append(callback)
+
+
+def clear() -> None:
+    with _lock:
+        _generation[0] += 1
+        _entries.clear()
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "entries": len(_entries)}
+
+
+def _etag_matches(etag: str) -> bool:
+    header = request.headers.get("If-None-Match", "")
+    return etag in [tag.strip() for tag in header.split(",")] or header.strip() == "*"
+
+
+def _response(body: bytes, etag: str, ttl: int, status: int = 200) -> Response:
+    response = Response(body if status == 200 else b"", status=status, mimetype="application/json")
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"private, max-age={ttl}"
+    return response
+
+
+def cached_response(*models, ttl: Optional[int] = None):
+    """
+    Cache a Resource.get() JSON response until `ttl` seconds pass or one of
+    `models` is written. Only 200 responses are cached.
+
+    Usage:
+        class TrainingAnalytics(Resource):
+            @cached_response(Training, EmployeeTraining)
+            def get(self):
+                ...
+    """
+    tables = _table_names(models)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            lifetime = RESPONSE_CACHE_TTL if ttl is None else ttl
+            key = f"{fn.__qualname__}:{request.full_path}"
+            now = time.time()
+
+            with _lock:
+                entry = _entries.get(key)
+                if entry and entry[2] <= now:
+                    del _entries[key]
+                    entry = None
+                if entry:
+                    _stats["hits"] += 1
+                generation = _generation[0]
+
+            if entry is None:
+                result = fn(*args, **kwargs)
+                data, status = (result[0], result[1]) if isinstance(result, tuple) else (result, 200)
+                if status != 200:
+                    return result
+                with _lock:
+                    _stats["misses"] += 1
+                body = json.dumps(data, default=str).encode("utf-8")
+                entry = (body, f'"{hashlib.sha1(body).hexdigest()}"', now + lifetime, tables)
+                with _lock:
+                    # Skip storing if a commit invalidated the cache while this was computed
+                    if _generation[0] == generation:
+                        _entries[key] = entry
+
+            body, etag = entry[0], entry[1]
+            if _etag_matches(etag):
+                with _lock:
+                    _stats["not_modified"] += 1
+                return _response(body, etag, lifetime, status=304)
+            return _response(body, etag, lifetime)
+        return wrapper
+    return decorator
+
+
+# ==================== INVALIDATION ====================
+
+def _record(session, tables) -> None:
+    session.info.setdefault(_CHANGED, set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    objects = list(session.new) + list(session.dirty) + list(session.deleted)
+    _record(session, {obj.__table__.name for obj in objects if hasattr(obj, "__table__")})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_bulk_write(orm_execute_state):
+    # Query.update() / Query.delete() bypass the flush
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is not None:
+        _record(orm_execute_state.session, {orm_execute_state.bind_mapper.local_table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    invalidate_tables(session.info.pop(_CHANGED, ()))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_rollback(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop(_CHANGED, None)
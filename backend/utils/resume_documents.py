@@ -0,0 +1,173 @@
+"""
+Resume Document Store
+Uploaded resumes are stored once per SHA-256 of their bytes (uploads/resumes/<hash>.<ext>).
+The extracted text, the Gemini parse and its ResumeSchema form are kept per hash, so a
+candidate re-uploading the same PDF for another job costs no disk, extraction or LLM call.
+"""
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, ResumeDocument
+from utils.llm_client import active_model_name
+
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_storage) -> str:
+    """SHA-256 of an uploaded file's bytes; the stream is rewound afterwards"""
+    digest = hashlib.sha256()
+    stream = file_storage.stream
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def save_upload(file_storage, upload_folder: str, ext: str) -> ResumeDocument:
+    """
+    Store an uploaded file under its content hash and return its ResumeDocument.
+    Repeat uploads of identical bytes reuse the existing file and row. Does not commit.
+    """
+    content_hash = file_sha256(file_storage)
+    file_path = os.path.join(upload_folder, f"{content_hash}.{ext}")
+    if not os.path.exists(file_path):
+        # Write next to the target and rename, so a concurrent upload never sees half a file
+        # (the temp name is unique per call: threads of one worker share a pid)
+        partial_path = f"{file_path}.{uuid.uuid4().hex}.part"
+        file_storage.save(partial_path)
+        os.replace(partial_path, file_path)
+
+    document = ResumeDocument.query.get(content_hash)
+    if document is not None:
+        document.upload_count = (document.upload_count or 0) + 1
+        document.last_uploaded_at = datetime.utcnow()
+        return document
+
+    try:
+        with db.session.begin_nested():
+            document = ResumeDocument(content_hash=content_hash, file_path=file_path,
+                                      file_size=os.path.getsize(file_path))
+            db.session.add(document)
+    except IntegrityError:
+        # Another request stored the same bytes first
+        document = ResumeDocument.query.get(content_hash)
+        document.upload_count = (document.upload_count or 0) + 1
+        document.last_uploaded_at = datetime.utcnow()
+    return document
+
+
+def cached_text(document: Optional[ResumeDocument]) -> Optional[str]:
+    if document is not None and document.extracted_text and document.extracted_text.strip():
+        return document.extracted_text
+    return None
+
+
+def cached_parse(document: Optional[ResumeDocument]) -> Optional[Dict[str, Any]]:
+    """The stored parse, unless it was produced by a different model than the current one"""
+    if document is None or not document.is_parsed or document.model_name != active_model_name():
+        return None
+    return document.get_parsed()
+
+
+def record_extraction(document: ResumeDocument, text: str) -> None:
+    """Store the extracted text for a document. Does not commit."""
+    document.extracted_text = text
+
+
+def record_parse(document: ResumeDocument, parsed: Dict[str, Any]) -> None:
+    """Store a successful parse_resume_text result and its ResumeSchema form. Does not commit."""
+    stored = {k: v for k, v in parsed.items() if k != "raw_text"}
+    document.parsed_data = json.dumps(stored)
+    schema = to_resume_schema(stored)
+    document.schema_data = json.dumps(schema) if schema is not None else None
+    document.model_name = active_model_name()
+    if parsed.get("raw_text") and not document.extracted_text:
+        document.extracted_text = parsed["raw_text"]
+
+
+def to_resume_schema(parsed: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map the parser's JSON onto utils.resume_schema.ResumeSchema.
+    Returns the validated dict, or None when the parse does not fit the schema.
+    """
+    from utils.resume_schema import ResumeSchema
+
+    personal_info = dict(parsed.get("personal_info") or {})
+    personal_info.setdefault("summary", parsed.get("summary"))
+
+    experience = []
+    for item in parsed.get("experience") or []:
+        if not isinstance(item, dict):
+            continue
+        responsibilities = item.get("responsibilities") or []
+        experience.append({
+            "company": item.get("company"),
+            "title": item.get("title") or item.get("position"),
+            "duration": item.get("duration"),
+            "description": item.get("description") or "\n".join(str(r) for r in responsibilities) or None
+        })
+
+    education = []
+    for item in parsed.get("education") or []:
+        if not isinstance(item, dict):
+            continue
+        education.append({
+            "level": item.get("level") or item.get("degree"),
+            "field": item.get("field"),
+            "institution": item.get("institution"),
+            "end_year": item.get("end_year") or item.get("year")
+        })
+
+    certifications = [
+        cert if isinstance(cert, dict) else {"name": str(cert)}
+        for cert in parsed.get("certifications") or []
+    ]
+
+    try:
+        return ResumeSchema(
+            personal_info=personal_info,
+            skills=parsed.get("skills") or [],
+            experience=experience,
+            education=education,
+            projects=[p for p in parsed.get("projects") or [] if isinstance(p, dict)],
+            certifications=certifications,
+            languages=parsed.get("languages") or [],
+            awards=parsed.get("awards") or []
+        ).dict()
+    except Exception as e:
+        print(f"⚠️ Resume schema validation failed: {e}")
+        return None
+
+
+def parse_document(document: ResumeDocument) -> Dict[str, Any]:
+    """
+    Parse result for a stored document, calling Gemini only when no usable parse is stored.
+    Failures come back as {"error": ...} like parse_resume_text. Does not commit.
+    """
+    # Imported here: ai_resume_parser configures the Gemini client on import
+    from utils.ai_resume_parser import extract_resume_text, parse_resume_text
+
+    parsed = cached_parse(document)
+    if parsed is not None:
+        return parsed
+
+    text = cached_text(document)
+    if text is None:
+        try:
+            text = extract_resume_text(document.file_path)
+        except ValueError as e:
+            return {"error": str(e), "raw_text": ""}
+        record_extraction(document, text)
+
+    parsed = parse_resume_text(text)
+    if "error" not in parsed:
+        record_parse(document, parsed)
+    return parsed
@@ -0,0 +1,389 @@
+"""
+Resume Ingestion Pipeline
+Background processing for uploaded resumes so the upload request returns at once.
+
+Every file moves through three stages, each on its own worker pool:
+    extract (PDF -> text) -> parse (Gemini -> structured resume) -> score (Gemini vs. JD)
+Progress is written to ResumeIngestionFile rows, which the status endpoint reads.
+Files whose bytes were uploaded before reuse the stored text and parse (utils.resume_documents)
+and go straight to scoring. An applicant whose score stage fails keeps a NULL score and is
+retried on the score pool by schedule_job_rescore, with exponential backoff per (job, resume);
+after SCORE_RETRY_MAX_ATTEMPTS failures it stays unscored until the process restarts.
+Listings never trigger scoring.
+
+The pools are in-process, so work queued or running when the process exits is lost and
+its rows stay queued/running. recover_stale_ingestions requeues such rows once they have
+not moved for INGESTION_STALE_MINUTES; each process runs it on its first upload or status
+poll (ensure_recovered), so nothing is recovered until the new process sees ingestion
+traffic. A live backlog idle for longer than the threshold is queued twice; a stage task
+for a file that has already finished is skipped. A file picked up again restarts
+from extraction (text and parse are reused from the document store) or, once its applicant
+exists, from scoring. Rows that cannot be resumed are marked as errors.
+
+INGESTION_EXTRACT_WORKERS   - PDF extraction threads (default: 2)
+INGESTION_LLM_WORKERS       - parse and score threads per stage (default: 4)
+INGESTION_STALE_MINUTES     - idle time after which a queued/running file counts as lost (default: 30)
+SCORE_RETRY_BASE_SECONDS    - delay before the first retry of a failed score, doubled per failure (default: 60)
+SCORE_RETRY_MAX_ATTEMPTS    - failed scores of one (job, resume) before retries stop (default: 5)
+"""
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Applicant, Job, Resume, ResumeDocument, ResumeIngestion, ResumeIngestionFile, User
+from utils.ai_resume_parser import parse_resume_text
+from utils.pdf_extraction import extract_pdf
+from utils.ai_ranking import score_with_gemini
+from utils.score_store import record_scores, score_resumes_for_job
+from utils.job_queries import unscored_resumes
+from utils.resume_documents import cached_parse, cached_text, record_extraction, record_parse
+
+
+INGESTION_EXTRACT_WORKERS = int(os.getenv("INGESTION_EXTRACT_WORKERS", "2"))
+INGESTION_LLM_WORKERS = int(os.getenv("INGESTION_LLM_WORKERS", "4"))
+INGESTION_STALE_MINUTES = float(os.getenv("INGESTION_STALE_MINUTES", "30"))
+SCORE_RETRY_BASE_SECONDS = float(os.getenv("SCORE_RETRY_BASE_SECONDS", "60"))
+SCORE_RETRY_MAX_ATTEMPTS = int(os.getenv("SCORE_RETRY_MAX_ATTEMPTS", "5"))
+
+_pools = {}
+_pools_lock = threading.Lock()
+_rescoring = set()  # job ids with a queued or running rescore
+_score_failures = {}  # (job_id, resume_id) -> (failed attempts, monotonic time of the next allowed attempt)
+_recovered = False  # recover_stale_ingestions already ran in this process
+
+
+def _pool(stage: str) -> ThreadPoolExecutor:
+    """Lazily created executor per stage (extract / parse / score)"""
+    with _pools_lock:
+        if stage not in _pools:
+            workers = INGESTION_EXTRACT_WORKERS if stage == "extract" else INGESTION_LLM_WORKERS
+            _pools[stage] = ThreadPoolExecutor(max_workers=max(1, workers),
+                                               thread_name_prefix=f"ingest-{stage}")
+        return _pools[stage]
+
+
+def submit_ingestion(app, ingestion_id: str) -> None:
+    """Queue every file of an ingestion for background processing"""
+    ensure_recovered(app)
+    ingestion = ResumeIngestion.query.get(ingestion_id)
+    for file_row in ingestion.files:
+        _pool("extract").submit(_run_stage, app, _extract_stage, file_row.id)
+
+
+# ==================== RESTART RECOVERY ====================
+
+def recover_stale_ingestions(app, stale_minutes: float = None) -> dict:
+    """
+    Requeue files left queued/running by a previous process (idle for stale_minutes,
+    default INGESTION_STALE_MINUTES). Call inside an app context.
+
+    Returns:
+        {"requeued": int, "failed": int}
+    """
+    stale_minutes = INGESTION_STALE_MINUTES if stale_minutes is None else stale_minutes
+    cutoff = datetime.utcnow() - timedelta(minutes=stale_minutes)
+    stale = (ResumeIngestionFile.query
+             .filter(ResumeIngestionFile.status.in_(("queued", "running")),
+                     ResumeIngestionFile.updated_at < cutoff)
+             .all())
+
+    submissions, failed = [], 0
+    for file_row in stale:
+        if file_row.stage == "scoring" and file_row.resume_id and file_row.applicant_id:
+            file_row.status = "queued"
+            submissions.append(("score", _score_stage, file_row.id))
+        elif file_row.stage in ("queued", "extracting", "parsing") and file_row.file_path \
+                and os.path.exists(file_row.file_path):
+            # Parsing commits its applicant together with the move to scoring, so none exists yet
+            file_row.stage = "queued"
+            file_row.status = "queued"
+            submissions.append(("extract", _extract_stage, file_row.id))
+        else:
+            file_row.status = "error"
+            file_row.error = "Processing was interrupted by a server restart; please upload the resume again."
+            failed += 1
+        file_row.updated_at = datetime.utcnow()
+    db.session.commit()
+
+    for stage, stage_fn, file_id in submissions:
+        _pool(stage).submit(_run_stage, app, stage_fn, file_id)
+    if stale:
+        print(f"⚠️ Resume ingestion recovery: {len(submissions)} file(s) requeued, {failed} failed")
+    return {"requeued": len(submissions), "failed": failed}
+
+
+def ensure_recovered(app) -> None:
+    """Run recover_stale_ingestions once per process"""
+    global _recovered
+    with _pools_lock:
+        if _recovered:
+            return
+        _recovered = True
+    try:
+        recover_stale_ingestions(app)
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Resume ingestion recovery failed: {e}")
+        traceback.print_exc()
+
+
+def _run_stage(app, stage_fn, file_id, *args):
+    """Run one stage inside an app context; any uncaught error fails the file"""
+    with app.app_context():
+        file_row = ResumeIngestionFile.query.get(file_id)
+        if file_row is None or file_row.status in ("success", "error"):
+            return  # Finished by a duplicate task (see recover_stale_ingestions)
+        try:
+            stage_fn(app, file_id, *args)
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Resume ingestion error (file {file_id}): {e}")
+            traceback.print_exc()
+            _fail(file_id, str(e))
+
+
+def _start(file_id: int, stage: str) -> ResumeIngestionFile:
+    file_row = ResumeIngestionFile.query.get(file_id)
+    file_row.stage = stage
+    file_row.status = "running"
+    db.session.commit()
+    return file_row
+
+
+def _fail(file_id: int, message: str) -> None:
+    file_row = ResumeIngestionFile.query.get(file_id)
+    if file_row:
+        file_row.status = "error"
+        file_row.error = message
+        db.session.commit()
+
+
+def _document(file_row: ResumeIngestionFile):
+    return ResumeDocument.query.get(file_row.content_hash) if file_row.content_hash else None
+
+
+def _extract_stage(app, file_id):
+    file_row = _start(file_id, "extracting")
+    document = _document(file_row)
+    started = time.monotonic()
+    text = cached_text(document)
+    if text is None:
+        try:
+            extraction = extract_pdf(file_row.file_path)
+        except ValueError as e:
+            _fail(file_id, str(e))
+            return
+        text = extraction["text"]
+        file_row.set_page_timings(extraction["pages"])
+        if not text.strip():
+            _fail(file_id, "Empty PDF or no text extracted")
+            return
+        if document is not None:
+            record_extraction(document, text)
+    file_row.set_stage_timing("extract", time.monotonic() - started)
+    file_row.stage = "parsing"
+    file_row.status = "queued"
+    db.session.commit()
+
+    _pool("parse").submit(_run_stage, app, _parse_stage, file_id, text)
+
+
+def _parse_stage(app, file_id, text):
+    file_row = _start(file_id, "parsing")
+    ingestion = file_row.ingestion
+    user = User.query.get(ingestion.user_id)
+
+    started = time.monotonic()
+    document = _document(file_row)
+    parsed_dict = cached_parse(document)
+    if parsed_dict is not None:
+        file_row.reused = True
+    else:
+        parsed_dict = parse_resume_text(text)
+        if "error" in parsed_dict:
+            _fail(file_id, parsed_dict.get("error", "Parsing failed"))
+            return
+        if document is not None:
+            record_parse(document, parsed_dict)
+
+    # Flatten the structure for easier frontend consumption
+    personal_info = parsed_dict.get("personal_info", {})
+    flattened_parsed_data = {
+        "name": user.name,
+        "email": user.email,
+        "phone": personal_info.get("phone", ""),
+        "location": personal_info.get("location", ""),
+        "linkedin": personal_info.get("linkedin", ""),
+        "github": personal_info.get("github", ""),
+        "summary": parsed_dict.get("summary", ""),
+        "skills": parsed_dict.get("skills", []),
+        "experience": parsed_dict.get("experience", []),
+        "education": parsed_dict.get("education", []),
+        "certifications": parsed_dict.get("certifications", []),
+        "projects": parsed_dict.get("projects", []),
+        "raw_text": parsed_dict.get("raw_text", "")
+    }
+
+    # Another upload may have created the application while this file was queued
+    if Applicant.query.filter_by(user_id=user.user_id, job_id=ingestion.job_id).first():
+        _fail(file_id, "You have already applied for this position.")
+        return
+
+    # score stays NULL (unscored) until the score stage succeeds. The check above is only a
+    # shortcut: another parse thread can insert between it and here, and the unique
+    # (user_id, job_id) index turns that race into an IntegrityError
+    applicant = Applicant(user_id=user.user_id, job_id=ingestion.job_id, status="Applied", score=None)
+    try:
+        with db.session.begin_nested():
+            db.session.add(applicant)
+    except IntegrityError:
+        _fail(file_id, "You have already applied for this position.")
+        return
+
+    resume = Resume(
+        applicant_id=applicant.applicant_id,
+        file_url=file_row.file_path,
+        parsed_text=flattened_parsed_data.get("raw_text", ""),
+        extracted_skills=json.dumps(flattened_parsed_data.get("skills", [])),
+        extracted_experience=json.dumps(flattened_parsed_data.get("experience", [])),
+        contact_info=json.dumps({
+            "email": user.email,
+            "phone": flattened_parsed_data.get("phone", ""),
+            "location": flattened_parsed_data.get("location", "")
+        })
+    )
+    db.session.add(resume)
+    db.session.flush()
+
+    file_row.applicant_id = applicant.applicant_id
+    file_row.resume_id = resume.resume_id
+    file_row.parsed_data = json.dumps(flattened_parsed_data)
+    file_row.set_stage_timing("parse", time.monotonic() - started)
+    file_row.stage = "scoring"
+    file_row.status = "queued"
+    db.session.commit()
+
+    _pool("score").submit(_run_stage, app, _score_stage, file_id)
+
+
+def _score_stage(app, file_id):
+    file_row = _start(file_id, "scoring")
+    job = Job.query.get(file_row.ingestion.job_id)
+    resume = Resume.query.get(file_row.resume_id)
+
+    started = time.monotonic()
+    ranking_score = None
+    if job and job.jd_text and resume.parsed_text:
+        scores = score_with_gemini(job.title, job.jd_text, resume.parsed_text)
+        if scores:
+            ranking_score = scores.get("overall") or 0
+            # Persist the full score breakdown so listings never rescore it
+            record_scores(job.job_id, resume.resume_id, job.jd_text, resume.parsed_text, scores)
+
+    # A failed score leaves the applicant unscored (NULL) for schedule_job_rescore, not a score of 0
+    if ranking_score is not None:
+        Applicant.query.get(file_row.applicant_id).score = ranking_score
+    file_row.ranking_score = ranking_score
+    file_row.set_stage_timing("score", time.monotonic() - started)
+    file_row.stage = "done"
+    file_row.status = "success"
+    db.session.commit()
+
+    if ranking_score is None and job and job.jd_text and resume.parsed_text:
+        delay = _record_score_failure(job.job_id, resume.resume_id)
+        if delay is not None:
+            schedule_job_rescore(app, job.job_id, delay)
+
+
+# ==================== RESCORING ====================
+
+def schedule_job_rescore(app, job_id: int, delay: float = 0.0) -> None:
+    """
+    Queue scoring of a job's unscored applicants on the score pool after `delay` seconds
+    (one queued or running per job; a job already queued keeps its earlier schedule).
+    """
+    with _pools_lock:
+        if job_id in _rescoring:
+            return
+        _rescoring.add(job_id)
+    if delay > 0:
+        timer = threading.Timer(delay, lambda: _pool("score").submit(_rescore_job, app, job_id))
+        timer.daemon = True
+        timer.start()
+    else:
+        _pool("score").submit(_rescore_job, app, job_id)
+
+
+def _record_score_failure(job_id: int, resume_id: int):
+    """Count a failed score; returns seconds until the next attempt, or None once retries are used up"""
+    with _pools_lock:
+        attempts = _score_failures.get((job_id, resume_id), (0, 0.0))[0] + 1
+        delay = SCORE_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+        _score_failures[(job_id, resume_id)] = (attempts, time.monotonic() + delay)
+    if attempts >= SCORE_RETRY_MAX_ATTEMPTS:
+        print(f"⚠️ Giving up scoring resume {resume_id} for job {job_id} after {attempts} failures")
+        return None
+    return delay
+
+
+def _retry_due(job_id: int, resume_id: int, now: float) -> bool:
+    attempts, next_at = _score_failures.get((job_id, resume_id), (0, 0.0))
+    return attempts < SCORE_RETRY_MAX_ATTEMPTS and now >= next_at
+
+
+def _rescore_job(app, job_id):
+    delay = None
+    try:
+        delay = _rescore_unscored(app, job_id)
+    finally:
+        with _pools_lock:
+            _rescoring.discard(job_id)
+    if delay is not None:
+        schedule_job_rescore(app, job_id, delay)
+
+
+def _rescore_unscored(app, job_id):
+    """Score the job's unscored applicants whose backoff has expired; returns seconds until the next retry, or None"""
+    with app.app_context():
+        try:
+            now = time.monotonic()
+            unscored = unscored_resumes(job_id)
+            due = [(resume_id, text) for resume_id, text in unscored if _retry_due(job_id, resume_id, now)]
+            job = Job.query.get(job_id) if due else None
+            if not (job and job.jd_text):
+                return None
+            # Scores come from the score store when the JD/resume text is unchanged
+            stored = score_resumes_for_job(job.job_id, job.title, job.jd_text, due)
+            scored = {resume_id: scores.get('overall') or 0 for resume_id, scores in stored["scores"].items()}
+            changed = []
+            if scored:
+                # Only rows whose score actually changes are written
+                current = (db.session.query(Resume.resume_id, Applicant.applicant_id, Applicant.score)
+                           .join(Applicant, Applicant.applicant_id == Resume.applicant_id)
+                           .filter(Resume.resume_id.in_(list(scored))).all())
+                changed = [{"applicant_id": applicant_id, "score": scored[resume_id]}
+                           for resume_id, applicant_id, score in current if score != scored[resume_id]]
+                if changed:
+                    db.session.execute(update(Applicant), changed)
+            # Nothing written means no commit, so the response cache stays valid
+            if changed or stored["rescored"]:
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Applicant scoring error for job {job_id}: {e}")
+            traceback.print_exc()
+            return None
+
+        with _pools_lock:
+            for resume_id in scored:
+                _score_failures.pop((job_id, resume_id), None)
+        delays = [_record_score_failure(job_id, resume_id) for resume_id in stored["failed"] + stored["timed_out"]]
+        delays = [delay for delay in delays if delay is not None]
+        return min(delays) if delays else None
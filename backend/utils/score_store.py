@@ -0,0 +1,115 @@
+"""
+Score Store
+Persistent per-(job, resume) AI scores with fingerprint-based invalidation.
+A stored score is reused until the JD text, the resume text or the scoring model
+changes, so repeated applicant listings and re-rankings are plain DB reads.
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import insert, update
+
+from models import db, ResumeJobScore
+from utils.llm_client import active_model_name
+
+
+def content_hash(text: Optional[str]) -> str:
+    """SHA-256 fingerprint of a JD or resume text"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _is_fresh(row: ResumeJobScore, jd_hash: str, resume_hash: str) -> bool:
+    return row.jd_hash == jd_hash and row.resume_hash == resume_hash and row.model_name == active_model_name()
+
+
+def record_scores(job_id: int, resume_id: int, jd_text: str, resume_text: str,
+                  scores: Dict[str, Any], row: Optional[ResumeJobScore] = None,
+                  lookup: bool = True) -> ResumeJobScore:
+    """
+    Insert or update the stored score for (job_id, resume_id). Does not commit.
+    lookup=False skips the existing-row query when the caller already knows there is none.
+    """
+    if row is None and lookup:
+        row = ResumeJobScore.query.filter_by(job_id=job_id, resume_id=resume_id).first()
+    if row is None:
+        row = ResumeJobScore(job_id=job_id, resume_id=resume_id)
+        db.session.add(row)
+
+    row.set_scores(scores)
+    row.model_name = active_model_name()
+    row.jd_hash = content_hash(jd_text)
+    row.resume_hash = content_hash(resume_text)
+    return row
+
+
+def score_resumes_for_job(job_id: int, job_title: str, jd_text: str,
+                          resumes: Iterable[Tuple[int, str]],
+                          max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Return scores for (resume_id, resume_text) pairs against a job, computing only
+    the missing or stale ones (concurrently, via utils.scoring_engine).
+
+    New and refreshed rows are written in bulk in the current transaction; the caller commits
+    (result["rescored"] is empty when nothing was written).
+
+    Returns:
+        {"scores": {resume_id: scores}, "reused": [ids], "rescored": [ids],
+         "failed": [ids], "timed_out": [ids], "partial": bool}
+    """
+    # Imported here: scoring_engine pulls in the Gemini client
+    from utils.scoring_engine import score_candidates
+
+    resumes = [(resume_id, text or "") for resume_id, text in resumes]
+    jd_hash = content_hash(jd_text)
+    result = {"scores": {}, "reused": [], "rescored": [], "failed": [], "timed_out": [], "partial": False}
+    if not resumes:
+        return result
+
+    resume_ids = [resume_id for resume_id, _ in resumes]
+    existing = {
+        row.resume_id: row
+        for row in ResumeJobScore.query.filter(
+            ResumeJobScore.job_id == job_id,
+            ResumeJobScore.resume_id.in_(resume_ids)
+        ).all()
+    }
+
+    to_score = []
+    for resume_id, text in resumes:
+        row = existing.get(resume_id)
+        if row is not None and _is_fresh(row, jd_hash, content_hash(text)):
+            result["scores"][resume_id] = row.get_scores()
+            result["reused"].append(resume_id)
+        else:
+            to_score.append((resume_id, text))
+
+    if not to_score:
+        return result
+
+    outcome = score_candidates(job_title, jd_text, to_score, max_workers=max_workers)
+    texts = dict(to_score)
+    model_name = active_model_name()
+    now = datetime.utcnow()
+    inserts, updates = [], []
+    for resume_id, scores in outcome["scores"].items():
+        values = dict(ResumeJobScore.score_columns(scores), model_name=model_name, jd_hash=jd_hash,
+                      resume_hash=content_hash(texts[resume_id]), updated_at=now)
+        row = existing.get(resume_id)
+        if row is None:
+            inserts.append(dict(values, job_id=job_id, resume_id=resume_id, created_at=now))
+        else:
+            updates.append(dict(values, id=row.id))
+        result["scores"][resume_id] = scores
+        result["rescored"].append(resume_id)
+
+    # One multi-row INSERT and one executemany UPDATE per job instead of a statement per row
+    if inserts:
+        db.session.execute(insert(ResumeJobScore), inserts)
+    if updates:
+        db.session.execute(update(ResumeJobScore), updates)
+
+    result["failed"] = outcome["failed"]
+    result["timed_out"] = outcome["timed_out"]
+    result["partial"] = outcome["partial"]
+    return result
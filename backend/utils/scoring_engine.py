@@ -0,0 +1,258 @@
+"""
+Concurrent Scoring Engine
+Scores many resumes against one job description with bounded parallelism,
+a shared Gemini rate limiter, per-candidate timeouts and partial results.
+
+Resumes are packed into batches that share one prompt (the JD is sent once per
+batch). Candidates a batch answer leaves out or garbles are re-split into smaller
+batches, down to single-resume calls.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.ai_ranking import score_with_gemini, score_batch_with_gemini
+from utils.llm_telemetry import record_retry
+
+
+SCORING_MAX_WORKERS = int(os.getenv("SCORING_MAX_WORKERS", "8"))
+SCORING_RATE_LIMIT_PER_MINUTE = int(os.getenv("SCORING_RATE_LIMIT_PER_MINUTE", "300"))  # 0 = unlimited
+SCORING_CANDIDATE_TIMEOUT = float(os.getenv("SCORING_CANDIDATE_TIMEOUT", "45"))
+SCORING_BATCH_TIMEOUT = float(os.getenv("SCORING_BATCH_TIMEOUT", "240"))
+SCORING_MAX_RETRIES = int(os.getenv("SCORING_MAX_RETRIES", "2"))
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "8"))  # 1 = one resume per call
+SCORING_BATCH_PROMPT_CHARS = int(os.getenv("SCORING_BATCH_PROMPT_CHARS", "48000"))
+
+# Prompt characters outside the JD and resumes (instructions, markers per candidate)
+BATCH_PROMPT_OVERHEAD_CHARS = 1200
+BATCH_ITEM_OVERHEAD_CHARS = 60
+
+# Pause applied to every worker after Gemini answers 429 / RESOURCE_EXHAUSTED
+RATE_LIMIT_BACKOFF_SECONDS = 5.0
+
+
+class _DeadlineExceeded(Exception):
+    """The batch deadline passed while waiting for the rate limiter (scorer timeouts are ordinary failures)"""
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all scoring threads.
+    `penalize` pushes the next allowed call into the future after a 429.
+    """
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.capacity = max(1, per_minute // 6) if per_minute else 0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Block until a call is allowed; False if the deadline passes first"""
+        if not self.per_minute:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.per_minute / 60.0)
+                self._updated = now
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_for = max(self._blocked_until - now, (1 - self._tokens) * 60.0 / self.per_minute)
+            if deadline is not None and time.monotonic() + wait_for > deadline:
+                return False
+            time.sleep(min(wait_for, 1.0))
+
+    def penalize(self, seconds: float) -> None:
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+_rate_limiter = RateLimiter(SCORING_RATE_LIMIT_PER_MINUTE)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    text = f"{type(error).__name__} {error}".lower()
+    return "resourceexhausted" in text or "429" in text or "rate limit" in text or "quota" in text
+
+
+def plan_batches(jd_text: str, candidates: List[Tuple[Any, str]], max_items: int,
+                 max_chars: int = SCORING_BATCH_PROMPT_CHARS) -> List[List[Tuple[Any, str]]]:
+    """
+    Greedily pack candidates into batches of at most max_items whose prompt
+    (JD + resumes + overhead) stays within max_chars. A resume too large to share
+    a prompt gets a batch of its own.
+    """
+    budget = max_chars - len(jd_text or "") - BATCH_PROMPT_OVERHEAD_CHARS
+    batches, current, used = [], [], 0
+    for candidate in candidates:
+        size = len(candidate[1]) + BATCH_ITEM_OVERHEAD_CHARS
+        if current and (len(current) >= max_items or used + size > budget):
+            batches.append(current)
+            current, used = [], 0
+        current.append(candidate)
+        used += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def score_candidates(job_title: str, jd_text: str, candidates: Iterable[Tuple[Any, str]],
+                     max_workers: Optional[int] = None,
+                     candidate_timeout: Optional[float] = None,
+                     batch_timeout: Optional[float] = None,
+                     scorer: Optional[Callable[..., Optional[Dict[str, float]]]] = None,
+                     batch_size: Optional[int] = None,
+                     batch_scorer: Optional[Callable[..., Dict[str, Dict[str, float]]]] = None) -> Dict[str, Any]:
+    """
+    Score (candidate_id, resume_text) pairs against one job description in parallel.
+
+    Workers never touch the database, so callers must load resume text up front.
+    Candidates with empty resume text are skipped.
+
+    Args:
+        job_title: Role title used in the scoring prompt
+        jd_text: Job description text
+        candidates: Iterable of (candidate_id, resume_text)
+        max_workers: Parallelism limit (default SCORING_MAX_WORKERS)
+        candidate_timeout: Seconds one candidate may run before it is given up on
+            (a batch gets this per resume it carries)
+        batch_timeout: Seconds for the whole batch; unfinished candidates time out
+        scorer: Single-resume scoring function (default score_with_gemini with raise_on_error=True)
+        batch_size: Most resumes per prompt (default SCORING_BATCH_SIZE; 1 disables batching)
+        batch_scorer: Multi-resume scoring function returning {str(candidate_id): scores}
+            (default score_batch_with_gemini; batching is off when only `scorer` is given)
+
+    Returns:
+        {"scores": {candidate_id: scores}, "failed": [ids], "timed_out": [ids],
+         "partial": bool, "elapsed_seconds": float, "llm_calls": int}
+    """
+    candidates = [(cid, text) for cid, text in candidates if text and text.strip()]
+    candidate_timeout = candidate_timeout or SCORING_CANDIDATE_TIMEOUT
+    batch_timeout = batch_timeout or SCORING_BATCH_TIMEOUT
+    if batch_scorer is None and scorer is None:
+        batch_scorer = lambda title, jd, resumes: score_batch_with_gemini(title, jd, resumes, raise_on_error=True)
+    if batch_scorer is None:
+        batch_size = 1
+    scorer = scorer or (lambda title, jd, text: score_with_gemini(title, jd, text, raise_on_error=True))
+    batch_size = max(1, batch_size or SCORING_BATCH_SIZE)
+
+    started = time.monotonic()
+    deadline = started + batch_timeout
+    result = {"scores": {}, "failed": [], "timed_out": [], "partial": False,
+              "elapsed_seconds": 0.0, "llm_calls": 0}
+    if not candidates:
+        return result
+
+    units = plan_batches(jd_text, candidates, batch_size)
+    max_workers = max(1, min(max_workers or SCORING_MAX_WORKERS, len(units)))
+    start_times = {}
+    unit_scores = {}  # unit index -> scores collected so far, also read for units given up on
+    calls_lock = threading.Lock()
+
+    def _call(fn, *args):
+        for attempt in range(SCORING_MAX_RETRIES + 1):
+            if not _rate_limiter.acquire(deadline):
+                raise _DeadlineExceeded("Rate limiter wait exceeded batch deadline")
+            with calls_lock:
+                result["llm_calls"] += 1
+            try:
+                return fn(job_title, jd_text, *args)
+            except Exception as e:
+                if _is_rate_limit_error(e) and attempt < SCORING_MAX_RETRIES:
+                    record_retry("resume_scoring_batch" if fn is batch_scorer else "resume_scoring")
+                    _rate_limiter.penalize(RATE_LIMIT_BACKOFF_SECONDS * (attempt + 1))
+                    continue
+                raise
+
+    def _work(unit_index, unit):
+        """
+        Score one batch; candidates it leaves unscored are retried in halves.
+        Returns (scores, timed_out); at the deadline the scores collected so far are kept.
+        """
+        start_times[unit_index] = time.monotonic()
+        scores, queue = unit_scores.setdefault(unit_index, {}), [unit]
+        while queue:
+            chunk = queue.pop()
+            if len(chunk) == 1:
+                cid, text = chunk[0]
+                try:
+                    scores[cid] = _call(scorer, text)
+                except _DeadlineExceeded:
+                    return scores, True
+                except Exception as e:
+                    print(f"⚠️ Scoring failed for candidate {cid}: {e}")
+                continue
+            by_key = {str(cid): cid for cid, _ in chunk}
+            try:
+                answered = _call(batch_scorer, [(str(cid), text) for cid, text in chunk]) or {}
+            except _DeadlineExceeded:
+                return scores, True
+            except Exception as e:
+                print(f"⚠️ Batch scoring failed for {len(chunk)} candidates, retrying smaller batches: {e}")
+                answered = {}
+            for key, value in answered.items():
+                if key in by_key:
+                    scores[by_key[key]] = value
+            missing = [c for c in chunk if c[0] not in scores]
+            if missing:
+                middle = (len(missing) + 1) // 2
+                queue.extend(part for part in (missing[:middle], missing[middle:]) if part)
+        return scores, False
+
+    def _settle(unit, scores, timed_out):
+        """Keep the unit's scored candidates; the rest timed out or failed"""
+        for cid, _ in unit:
+            if scores.get(cid):
+                result["scores"][cid] = scores[cid]
+            elif timed_out:
+                result["timed_out"].append(cid)
+            else:
+                result["failed"].append(cid)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scoring")
+    futures = {executor.submit(_work, i, unit): (i, unit) for i, unit in enumerate(units)}
+    pending = set(futures)
+
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wait_for = min(deadline - now, 0.5)
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index, unit = futures[future]
+                try:
+                    scores, timed_out = future.result()
+                except Exception as e:
+                    print(f"⚠️ Scoring failed for candidates {[cid for cid, _ in unit]}: {e}")
+                    scores, timed_out = unit_scores.get(index, {}), False
+                _settle(unit, scores, timed_out)
+
+            # Give up on batches that have been running too long (keeping what they already scored)
+            now = time.monotonic()
+            for future in list(pending):
+                index, unit = futures[future]
+                if index in start_times and now - start_times[index] > candidate_timeout * len(unit):
+                    future.cancel()
+                    pending.discard(future)
+                    _settle(unit, unit_scores.get(index, {}), True)
+    finally:
+        for future in pending:
+            future.cancel()
+            index, unit = futures[future]
+            _settle(unit, unit_scores.get(index, {}), True)
+        # Do not block the request on stragglers; their results are simply dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    result["partial"] = bool(result["failed"] or result["timed_out"])
+    result["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return result
@@ -0,0 +1,195 @@
+"""
+SQL Profiler
+Opt-in per-request SQL instrumentation (SQL_PROFILER_ENABLED=true).
+
+SQLAlchemy cursor events time every statement; Flask request hooks attribute
+them to the current request. Each response carries its query count, DB time
+and number of repeated statement shapes (the N+1 signature) as headers, and
+per-endpoint aggregates with the slowest and most repeated statements are
+served by SqlMetricsResource at /api/metrics/sql.
+
+SQL_PROFILER_ENABLED  - "true" turns the profiler on (default: off)
+SQL_SLOW_QUERY_MS     - statements slower than this are logged (default: 100)
+SQL_PROFILER_TOP_N    - slowest / repeated statements kept per endpoint (default: 5)
+"""
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from flask import request
+from sqlalchemy import event
+
+
+SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "false").lower() in ("1", "true", "yes")
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+SQL_PROFILER_TOP_N = int(os.getenv("SQL_PROFILER_TOP_N", "5"))
+
+_STATEMENT_MAX_CHARS = 300
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*(\?|%\(\w+\)s|:\w+)(\s*,\s*(\?|%\(\w+\)s|:\w+))+\s*\)")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|:\w+\b")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+_SELECT_LIST_RE = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+
+_local = threading.local()
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with whitespace, literals, IN-list lengths and the select list collapsed, for grouping repeats"""
+    shape = _SPACE_RE.sub(" ", statement).strip()
+    shape = _SELECT_LIST_RE.sub("SELECT ... FROM ", shape)
+    shape = _PLACEHOLDER_LIST_RE.sub("(?...)", shape)
+    shape = _PLACEHOLDER_RE.sub("?", shape)
+    shape = _LITERAL_RE.sub("?", shape)
+    return shape[:_STATEMENT_MAX_CHARS]
+
+
+class RequestProfile:
+    """Statements issued while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+        self.slowest = []  # [(ms, shape)] best first, at most SQL_PROFILER_TOP_N
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        shape = statement_shape(statement)
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[shape] += 1
+        if len(self.slowest) < SQL_PROFILER_TOP_N or elapsed_ms > self.slowest[-1][0]:
+            self.slowest = sorted(self.slowest + [(elapsed_ms, shape)], reverse=True)[:SQL_PROFILER_TOP_N]
+
+    @property
+    def duplicates(self) -> int:
+        """Statements that repeated an earlier shape within the request"""
+        return sum(n - 1 for n in self.shapes.values() if n > 1)
+
+
+class EndpointStats:
+    """Running totals for one METHOD + route"""
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_ms = 0.0
+        self.duplicates = 0
+        self.slowest = []  # [(ms, shape)]
+        self.repeated = {}  # shape -> most repeats seen in one request
+
+    def add(self, profile: RequestProfile) -> None:
+        self.requests += 1
+        self.queries += profile.count
+        self.max_queries = max(self.max_queries, profile.count)
+        self.db_ms += profile.total_ms
+        self.duplicates += profile.duplicates
+        self.slowest = sorted(self.slowest + profile.slowest, reverse=True)[:SQL_PROFILER_TOP_N]
+        for shape, n in profile.shapes.items():
+            if n > 1 and n > self.repeated.get(shape, 0):
+                self.repeated[shape] = n
+        if len(self.repeated) > SQL_PROFILER_TOP_N * 4:
+            keep = sorted(self.repeated.items(), key=lambda item: item[1], reverse=True)[:SQL_PROFILER_TOP_N]
+            self.repeated = dict(keep)
+
+    def to_dict(self, endpoint: str) -> Dict[str, Any]:
+        return {
+            "endpoint": endpoint,
+            "requests": self.requests,
+            "queries_total": self.queries,
+            "queries_avg": round(self.queries / self.requests, 1) if self.requests else 0,
+            "queries_max": self.max_queries,
+            "db_ms_total": round(self.db_ms, 2),
+            "db_ms_avg": round(self.db_ms / self.requests, 2) if self.requests else 0,
+            "duplicate_queries_total": self.duplicates,
+            "slowest": [{"ms": round(ms, 2), "statement": shape} for ms, shape in self.slowest],
+            "most_repeated": [
+                {"statement": shape, "max_per_request": n}
+                for shape, n in sorted(self.repeated.items(), key=lambda item: item[1], reverse=True)[:SQL_PROFILER_TOP_N]
+            ],
+        }
+
+
+_endpoints = {}  # "GET /api/employees" -> EndpointStats
+_endpoints_lock = threading.Lock()
+
+
+# ==================== HOOKS ====================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("sql_profiler_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000.0
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        profile.record(statement, elapsed_ms)
+    if elapsed_ms >= SQL_SLOW_QUERY_MS:
+        where = f" on {_endpoint_key()}" if profile is not None else ""
+        print(f"⚠️ Slow query ({elapsed_ms:.1f} ms){where}: {statement_shape(statement)}")
+
+
+def _endpoint_key() -> str:
+    rule = request.url_rule.rule if request.url_rule is not None else request.path
+    return f"{request.method} {rule}"
+
+
+def _start_request():
+    _local.profile = RequestProfile()
+
+
+def _add_headers(response):
+    profile = getattr(_local, "profile", None)
+    if profile is not None:
+        response.headers["X-DB-Query-Count"] = str(profile.count)
+        response.headers["X-DB-Time-Ms"] = f"{profile.total_ms:.2f}"
+        response.headers["X-DB-Duplicate-Queries"] = str(profile.duplicates)
+    return response
+
+
+def _finish_request(exc=None):
+    profile = getattr(_local, "profile", None)
+    _local.profile = None
+    if profile is None:
+        return
+    key = _endpoint_key()
+    with _endpoints_lock:
+        _endpoints.setdefault(key, EndpointStats()).add(profile)
+
+
+def init_sql_profiler(app, db) -> bool:
+    """Attach the profiler to the app and its engine when SQL_PROFILER_ENABLED is set"""
+    if not SQL_PROFILER_ENABLED:
+        return False
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_add_headers)
+    app.teardown_request(_finish_request)
+    print(f"SQL profiler enabled (slow query threshold {SQL_SLOW_QUERY_MS:.0f} ms)")
+    return True
+
+
+# ==================== READS ====================
+
+def endpoint_stats(endpoint: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Per-endpoint aggregates, busiest (by total queries) first"""
+    with _endpoints_lock:
+        rows = [stats.to_dict(key) for key, stats in _endpoints.items()
+                if endpoint is None or endpoint in key]
+    return sorted(rows, key=lambda row: row["queries_total"], reverse=True)
+
+
+def reset() -> None:
+    with _endpoints_lock:
+        _endpoints.clear()
@@ -1,48 +1,123 @@
 """
 Swagger Parser Utility
 Parses swagger.yaml to extract API capabilities for the AI Chatbot context.
+The parsed endpoint list and formatted summary are kept in memory and only
+rebuilt when the file's mtime changes. The spec is parsed on the first call,
+with libyaml's C loader when PyYAML was built with it.
 """
-import yaml
 import os
+import re
+import threading
 
-def get_api_capabilities(swagger_path="swagger.yaml"):
+SWAGGER_TOP_K = int(os.getenv("SWAGGER_TOP_K", "15"))
+
+_HTTP_METHODS = ['get', 'post', 'put', 'delete', 'patch']
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "api", "are", "can", "do", "for", "how", "i", "in", "is", "it", "me",
+    "my", "of", "on", "or", "the", "to", "what", "with", "you", "your",
+}
+
+# swagger path -> {"mtime": float, "endpoints": [...], "summary": str}
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _resolve_path(swagger_path):
+    # Resolve absolute path if needed, assuming it's in the backend root or passed correctly
+    if not os.path.isabs(swagger_path):
+        # Try to find it relative to this file's parent (backend/utils -> backend/)
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        swagger_path = os.path.join(base_dir, swagger_path)
+    return swagger_path
+
+
+def _tokens(text):
+    return {t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS}
+
+
+def _format(endpoints):
+    summary = "Available System Capabilities (API Endpoints):\n"
+    for endpoint in endpoints:
+        summary += f"- {endpoint['line']}\n"
+    return summary
+
+
+def _parse(swagger_path):
+    """Load the spec and build the endpoint list used for summaries and filtering"""
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(swagger_path, 'r') as f:
+        spec = yaml.load(f, Loader=loader)
+
+    endpoints = []
+    paths = spec.get('paths', {})
+    for path, methods in paths.items():
+        for method, details in methods.items():
+            # Skip if it's not a standard HTTP method
+            if method.lower() not in _HTTP_METHODS:
+                continue
+
+            description = details.get('summary', details.get('description', 'No description'))
+            # Truncate long descriptions
+            if len(description) > 100:
+                description = description[:97] + "..."
+
+            endpoints.append({
+                "line": f"{method.upper()} {path}: {description}",
+                "tokens": _tokens(f"{path.replace('-', ' ')} {description} {' '.join(details.get('tags', []))}")
+            })
+    return endpoints
+
+
+def _load(swagger_path):
+    """Cached entry for the spec, re-parsed only when the file's mtime changed"""
+    mtime = os.path.getmtime(swagger_path)
+    entry = _cache.get(swagger_path)
+    if entry and entry["mtime"] == mtime:
+        return entry
+
+    with _cache_lock:
+        entry = _cache.get(swagger_path)
+        if entry and entry["mtime"] == mtime:
+            return entry
+        endpoints = _parse(swagger_path)
+        entry = {"mtime": mtime, "endpoints": endpoints, "summary": _format(endpoints)}
+        _cache[swagger_path] = entry
+        return entry
+
+
+def get_api_capabilities(swagger_path="swagger.yaml", question=None, top_k=None):
     """
     Parses the swagger.yaml file and returns a summary of available API endpoints.
-    
+
+    Args:
+        swagger_path (str): Spec location, relative to the backend root by default.
+        question (str): When given, only the endpoints sharing the most words with the
+            question are listed (up to top_k); falls back to the full list if none match.
+        top_k (int): Maximum endpoints listed for a question (SWAGGER_TOP_K by default).
+
     Returns:
         str: A formatted string listing endpoints and their descriptions.
     """
     try:
-        # Resolve absolute path if needed, assuming it's in the backend root or passed correctly
-        if not os.path.isabs(swagger_path):
-            # Try to find it relative to this file's parent (backend/utils -> backend/)
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            swagger_path = os.path.join(base_dir, swagger_path)
-            
+        swagger_path = _resolve_path(swagger_path)
         if not os.path.exists(swagger_path):
             return "API capabilities documentation not found."
 
-        with open(swagger_path, 'r') as f:
-            spec = yaml.safe_load(f)
-            
-        summary = "Available System Capabilities (API Endpoints):\n"
-        
-        paths = spec.get('paths', {})
-        for path, methods in paths.items():
-            for method, details in methods.items():
-                # Skip if it's not a standard HTTP method
-                if method.lower() not in ['get', 'post', 'put', 'delete', 'patch']:
-                    continue
-                    
-                description = details.get('summary', details.get('description', 'No description'))
-                # Truncate long descriptions
-                if len(description) > 100:
-                    description = description[:97] + "..."
-                    
-                summary += f"- {method.upper()} {path}: {description}\n"
-                
-        return summary
-        
+        entry = _load(swagger_path)
+        if not question:
+            return entry["summary"]
+
+        query = _tokens(question)
+        scored = [(len(query & e["tokens"]), i) for i, e in enumerate(entry["endpoints"])]
+        matches = sorted((s for s in scored if s[0] > 0), key=lambda s: (-s[0], s[1]))[:top_k or SWAGGER_TOP_K]
+        if not matches:
+            return entry["summary"]
+        # Keep spec order so related endpoints stay together
+        return _format([entry["endpoints"][i] for _, i in sorted(matches, key=lambda s: s[1])])
+
     except Exception as e:
         print(f"Error parsing swagger.yaml: {e}")
         return "Error loading system capabilities."
@@ -20,7 +20,7 @@ def verify_context_generation():
         if not user:
             print("User ID 1 not found. Skipping data fetcher test.")
         else:
-            context = get_employee_context(1)
+            context = get_employee_context(1, "How many days of annual leave do I get?")
             print("User Info:", context['user_info'])
             print("Leave Stats:", context['leave_stats'])
             print("Policies Count:", len(context['policies']))
@@ -42,6 +42,7 @@ export const API_ENDPOINTS = {
 
   // HR Chatbot
   CHAT_SEND: '/api/askhr/chat',
+  CHAT_STREAM: '/api/askhr/chat/stream',
   CHAT_HISTORY: '/api/chat/history',
 
   // Learning & Development
@@ -6,66 +6,121 @@ export const useChatbotStore = defineStore('chatbot', () => {
   // State
   const messages = ref([])
   const chatHistory = ref([])
+  const historyCursor = ref(null) // next_cursor for older history, null when none
   const loading = ref(false)
   const error = ref(null)
 
   // Actions
+  // Streams the answer from /api/askhr/chat/stream (Server-Sent Events), so it
+  // appears as it is generated instead of after the whole answer is ready
   async function sendMessage(message, userId = 1) {
     loading.value = true
     error.value = null
+
+    messages.value.push({
+      role: 'user',
+      content: message,
+      timestamp: new Date().toISOString()
+    })
+    messages.value.push({
+      role: 'assistant',
+      content: '',
+      timestamp: new Date().toISOString()
+    })
+    // Mutate through the reactive array so the view updates per chunk
+    const answer = messages.value[messages.value.length - 1]
+
     try {
-      const response = await apiClient.post('/api/askhr/chat', {
-        message,
-        user_id: userId
+      const token = localStorage.getItem('token') || localStorage.getItem('jwt_token')
+      const response = await fetch(`${apiClient.defaults.baseURL}/api/askhr/chat/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...(token ? { Authorization: `Bearer ${token}` } : {})
+        },
+        body: JSON.stringify({ message, user_id: userId })
       })
 
-      const data = response.data
+      if (!response.ok) {
+        const data = await response.json().catch(() => ({}))
+        throw new Error(data.error || data.message || `Request failed (${response.status})`)
+      }
 
-      // Add user message and bot response to messages array
-      messages.value.push({
-        role: 'user',
-        content: message,
-        timestamp: new Date().toISOString()
-      })
-      messages.value.push({
-        role: 'assistant',
-        content: data.response,
-        timestamp: data.timestamp || new Date().toISOString()
-      })
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      const additionalMessages = []
+      let result = null
+      let buffer = ''
+
+      const handleEvent = (frame) => {
+        let event = 'message'
+        let data = ''
+        frame.split('\n').forEach(line => {
+          if (line.startsWith('event: ')) event = line.slice(7)
+          else if (line.startsWith('data: ')) data += line.slice(6)
+        })
+        if (!data) return
+        const payload = JSON.parse(data)
 
-      // Handle additional messages (e.g., leave cards)
-      if (data.additional_messages && Array.isArray(data.additional_messages)) {
-        data.additional_messages.forEach(msg => {
+        if (event === 'chunk') {
+          // The first chunk replaces the "Thinking..." indicator
+          loading.value = false
+          answer.content += payload.text
+        } else if (event === 'message') {
+          // Additional messages (e.g., leave cards)
+          additionalMessages.push(payload)
           messages.value.push({
             role: 'assistant', // Map 'ai'/'assistant' to 'assistant'
-            content: msg.text,
-            type: msg.type,
-            data: msg.data,
-            timestamp: msg.timestamp
+            content: payload.text,
+            type: payload.type,
+            data: payload.data,
+            timestamp: payload.timestamp
           })
-        })
+        } else if (event === 'done') {
+          answer.content = payload.response
+          answer.timestamp = payload.timestamp || answer.timestamp
+          result = { ...payload, additional_messages: additionalMessages }
+        } else if (event === 'error') {
+          throw new Error(payload.error)
+        }
+      }
+
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        let boundary
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          handleEvent(buffer.slice(0, boundary))
+          buffer = buffer.slice(boundary + 2)
+        }
       }
 
-      return data
+      if (!result) {
+        throw new Error('The response ended unexpectedly')
+      }
+      return result
     } catch (err) {
-      error.value = err.response?.data?.message || err.message
+      error.value = err.message
       throw err
     } finally {
       loading.value = false
     }
   }
 
-  async function fetchChatHistory(userId = 1, limit = 50) {
+  async function fetchChatHistory(userId = 1, limit = 50, cursor = null) {
     loading.value = true
     error.value = null
     try {
-      const response = await apiClient.get('/api/chat/history', {
-        params: { user_id: userId, limit }
-      })
+      const params = { user_id: userId, limit }
+      if (cursor) params.cursor = cursor
+      const response = await apiClient.get('/api/chat/history', { params })
 
-      chatHistory.value = response.data.history
+      // Older pages (cursor given) are appended after the newer ones already loaded
+      chatHistory.value = cursor ? [...chatHistory.value, ...response.data.history] : response.data.history
+      historyCursor.value = response.data.next_cursor
       // Populate messages for the view
-      messages.value = response.data.history
+      messages.value = chatHistory.value
       console.log("ChatbotStore: History loaded", messages.value.length, "messages")
       return response.data.history
     } catch (err) {
@@ -108,6 +163,7 @@ export const useChatbotStore = defineStore('chatbot', () => {
     // State
     messages,
     chatHistory,
+    historyCursor,
     loading,
     error,
     // Actions